@@ -1,3 +1,236 @@
-from django.contrib import admin
+import csv
+import itertools
 
-# Register your models here.
+from django.contrib import admin, messages
+from django.contrib.auth.admin import UserAdmin
+from django.core.paginator import Paginator
+from django.db.models import Count, Max, Q
+from django.http import StreamingHttpResponse
+from django.utils.functional import cached_property
+from rest_framework.exceptions import APIException
+
+from . import live, purge, reconcile
+from .models import (
+    User, Quiz, Question, LiveSession, Participant, LiveQuestion, ParticipantAnswer, Feedback
+)
+
+
+# ─── Changelists That Stay Cheap ─────────────────────────────
+#
+# The admin runs against the live database, so its pages must not scan the
+# big tables. Every list selects the related rows its columns and its
+# __str__ (the row checkbox's label) read, with list_select_related, so no
+# list costs a query per row. Foreign keys are edited through raw id
+# widgets rather than <select>s of every row, and the participant and
+# answer tables page on an estimated count: an unfiltered list counts
+# MAX(id), which is an index lookup, instead of COUNT(*). After deletes the
+# estimate is an upper bound, so the last pages may be empty. Quizzes and
+# sessions are deleted by the chunked background purge (core/purge.py), not
+# the admin's cascade.
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+class EstimatedCountPaginator(Paginator):
+
+    @cached_property
+    def count(self):
+        query = self.object_list.query
+        if query.where or query.distinct:
+            return super().count
+        return self.object_list.model.objects.aggregate(n=Max('pk'))['n'] or 0
+
+
+class CSVExportMixin:
+    export_exclude = ()
+
+    @admin.action(description="Export selected as CSV")
+    def export_csv(self, request, queryset):
+        fields = [
+            field.attname for field in self.model._meta.concrete_fields
+            if field.name not in self.export_exclude
+        ]
+        rows = queryset.order_by('pk').values_list(*fields).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        return csv_response(self.model._meta.model_name, itertools.chain([fields], rows))
+
+
+class CoreAdmin(CSVExportMixin, admin.ModelAdmin):
+    show_full_result_count = False      # no second COUNT(*) beside a filtered one
+    list_per_page = 50
+    actions = ['export_csv']
+
+    @admin.display(description='Question', ordering='question_id')
+    def question_ref(self, obj):
+        # The id column; listing 'question_id' itself renders the related row.
+        return obj.question_id
+
+
+class PurgeOnDeleteMixin:
+    """Delete through core/purge.py; the confirmation page lists only the objects."""
+
+    make_purge = None       # purge.purge_quiz or purge.purge_session
+
+    def get_deleted_objects(self, objs, request):
+        # The default walks every related row to list it, which is the
+        # cascade the purge exists to avoid.
+        return [str(obj) for obj in objs], {}, set(), []
+
+    def delete_model(self, request, obj):
+        job = purge.worker.submit(self.make_purge(obj, request.user.id))
+        self.message_user(request, f"Purge {job.id} of {job.kind} {job.label} queued.")
+
+    def delete_queryset(self, request, queryset):
+        for obj in queryset:
+            self.delete_model(request, obj)
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def csv_response(name, rows):
+    """Stream rows as a CSV download, a chunk of rows in memory at a time."""
+    writer = csv.writer(_Echo())
+    response = StreamingHttpResponse((writer.writerow(row) for row in rows), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{name}.csv"'
+    return response
+
+
+# ─── Hosts and Quizzes ───────────────────────────────────────
+
+@admin.register(User)
+class HostAdmin(CSVExportMixin, UserAdmin):
+    list_display = ('username', 'email', 'is_host', 'is_staff', 'is_active', 'date_joined')
+    list_filter = ('is_host', 'is_staff', 'is_superuser', 'is_active')
+    fieldsets = UserAdmin.fieldsets + (('Quiz', {'fields': ('is_host',)}),)
+    show_full_result_count = False
+    actions = ['export_csv']
+    export_exclude = ('password',)
+
+
+@admin.register(Quiz)
+class QuizAdmin(PurgeOnDeleteMixin, CoreAdmin):
+    list_display = ('id', 'title', 'created_by', 'created_at')
+    list_select_related = ('created_by',)
+    raw_id_fields = ('created_by',)
+    search_fields = ('title',)
+    make_purge = staticmethod(purge.purge_quiz)
+
+
+@admin.register(Question)
+class QuestionAdmin(CoreAdmin):
+    list_display = ('id', 'short_text', 'quiz', 'correct_option', 'is_true_false')
+    list_select_related = ('quiz',)
+    raw_id_fields = ('quiz',)
+    search_fields = ('text',)
+
+    @admin.display(description='Text')
+    def short_text(self, obj):
+        return obj.text[:60]
+
+
+# ─── Live Sessions ───────────────────────────────────────────
+
+@admin.register(LiveSession)
+class LiveSessionAdmin(PurgeOnDeleteMixin, CoreAdmin):
+    list_display = ('session_code', 'quiz', 'host', 'is_active', 'started_at', 'ended_at')
+    list_select_related = ('quiz', 'host')
+    list_filter = ('is_active',)
+    raw_id_fields = ('quiz', 'host')
+    search_fields = ('=session_code', 'quiz__title')
+    actions = CoreAdmin.actions + ['end_sessions', 'recompute_scores', 'export_results']
+    make_purge = staticmethod(purge.purge_session)
+
+    @admin.action(description="End selected sessions")
+    def end_sessions(self, request, queryset):
+        # Through the session actor, so players get session_ended and any
+        # reveal timer is cancelled.
+        ended = 0
+        for code in queryset.filter(is_active=True).values_list('session_code', flat=True):
+            try:
+                live.ask_sync(code, 'end')
+            except APIException as e:
+                self.message_user(request, f"{code}: {e.detail}", messages.WARNING)
+            else:
+                ended += 1
+        self.message_user(request, f"Ended {ended} session(s).")
+
+    @admin.action(description="Recompute scores from answers (ended sessions)")
+    def recompute_scores(self, request, queryset):
+        # In the background (core/reconcile.py), which leaves active sessions alone.
+        job = reconcile.worker.submit(reconcile.Reconciliation(
+            list(queryset.values_list('id', flat=True)), owner_id=request.user.id,
+        ))
+        self.message_user(request, f"Reconciliation {job.id} queued; see /api/reconciliations/{job.id}/.")
+
+    @admin.action(description="Export results of selected sessions as CSV")
+    def export_results(self, request, queryset):
+        rows = Participant.objects.filter(session__in=queryset).annotate(
+            correct_count=Count('participantanswer', filter=Q(participantanswer__is_correct=True)),
+            answer_count=Count('participantanswer'),
+        ).order_by('session_id', '-score', 'id').values_list(
+            'session__session_code', 'id', 'name', 'score', 'correct_count', 'answer_count',
+        ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        header = ('session', 'participant', 'name', 'score', 'correct', 'answers')
+        return csv_response('session-results', itertools.chain([header], rows))
+
+
+@admin.register(LiveQuestion)
+class LiveQuestionAdmin(CoreAdmin):
+    list_display = ('id', 'session_code', 'question_ref', 'displayed_at', 'duration_seconds')
+    list_select_related = ('session', 'question')     # both are in its __str__
+    raw_id_fields = ('session', 'question')
+    search_fields = ('=session__session_code',)
+    paginator = EstimatedCountPaginator
+
+    @admin.display(description='Session', ordering='session__session_code')
+    def session_code(self, obj):
+        return obj.session.session_code
+
+
+# ─── Players, Answers and Feedback ───────────────────────────
+
+@admin.register(Participant)
+class ParticipantAdmin(CoreAdmin):
+    list_display = ('id', 'name', 'session_code', 'score', 'joined_at')
+    list_select_related = ('session',)
+    raw_id_fields = ('session',)
+    search_fields = ('name', '=session__session_code')
+    paginator = EstimatedCountPaginator
+
+    @admin.display(description='Session', ordering='session__session_code')
+    def session_code(self, obj):
+        return obj.session.session_code
+
+
+@admin.register(ParticipantAnswer)
+class ParticipantAnswerAdmin(CoreAdmin):
+    list_display = ('id', 'participant_name', 'session_code', 'question_ref', 'selected_option',
+                    'is_correct', 'answered_at')
+    list_select_related = ('participant__session',)
+    list_filter = ('is_correct',)
+    raw_id_fields = ('participant', 'question')
+    search_fields = ('=participant__session__session_code',)
+    paginator = EstimatedCountPaginator
+
+    @admin.display(description='Participant')
+    def participant_name(self, obj):
+        return obj.participant.name
+
+    @admin.display(description='Session')
+    def session_code(self, obj):
+        return obj.participant.session.session_code
+
+
+@admin.register(Feedback)
+class FeedbackAdmin(CoreAdmin):
+    list_display = ('id', 'participant_name', 'rating', 'comments')
+    list_select_related = ('participant',)
+    list_filter = ('rating',)
+    raw_id_fields = ('participant',)
+    paginator = EstimatedCountPaginator
+
+    @admin.display(description='Participant')
+    def participant_name(self, obj):
+        return obj.participant.name
@@ -0,0 +1,339 @@
+import datetime
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from .models import LiveQuestion, ParticipantAnswer, Question
+
+_numpy = None
+
+
+def load_numpy():
+    """Import NumPy on first use; None if it isn't installed."""
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:  # optional: analytics are unavailable without it
+            numpy = False
+        _numpy = numpy
+    return _numpy or None
+
+
+# ─── Question Analytics ──────────────────────────────────────
+#
+# A quiz's answers, across every session, are held as parallel NumPy
+# columns and all per-question statistics are computed with grouped
+# array operations (bincount, lexsort) rather than per-row Python. The
+# columns are cached per quiz; a report only fetches answers newer than the
+# last one it has seen, and reloads from scratch if rows were deleted.
+
+OPTIONS = 'ABCD'
+NO_OPTION = len(OPTIONS)        # anything that isn't A-D
+GROUP_FRACTION = 0.27           # upper/lower groups for the discrimination index
+TOO_HARD = 0.3                  # p-value below this: most players get it wrong
+TOO_EASY = 0.9
+WEAK_DISCRIMINATION = 0.2
+
+
+# Answers and screenings are read with plain SQL straight into int64
+# chunks: every column (including the timestamp, as epoch milliseconds via
+# SQLite's julianday) comes back as an integer, so a chunk of rows converts
+# to an array in one call instead of going through per-row ORM conversion.
+# The SQL is SQLite's; other databases read the same columns through the
+# ORM and convert each row in Python, which is slower but portable.
+ANSWER_COLUMNS = ('id', 'participant', 'session', 'question', 'option', 'correct', 'answered_ms')
+ANSWERS_SQL = """
+    SELECT a.id, a.participant_id, p.session_id, a.question_id,
+           CASE upper(substr(a.selected_option, 1, 1))
+               WHEN 'A' THEN 0 WHEN 'B' THEN 1 WHEN 'C' THEN 2 WHEN 'D' THEN 3 ELSE 4
+           END,
+           a.is_correct,
+           CAST((julianday(a.answered_at) - 2440587.5) * 86400000 AS INTEGER)
+    FROM core_participantanswer a
+    JOIN core_participant p ON p.id = a.participant_id
+    JOIN core_question q ON q.id = a.question_id
+    WHERE q.quiz_id = %s AND a.id > %s
+    ORDER BY a.id
+"""
+SCREENING_COLUMNS = ('id', 'session', 'question', 'displayed_ms')
+SCREENINGS_SQL = """
+    SELECT l.id, l.session_id, l.question_id,
+           CAST((julianday(l.displayed_at) - 2440587.5) * 86400000 AS INTEGER)
+    FROM core_livequestion l
+    JOIN core_question q ON q.id = l.question_id
+    WHERE q.quiz_id = %s AND l.id > %s
+    ORDER BY l.id
+"""
+FETCH_SIZE = 50_000
+
+
+class Table:
+    """Append-only int64 rows kept as chunks and joined on demand."""
+
+    def __init__(self, np, names):
+        self.np = np
+        self.names = names
+        self.chunks = [np.zeros((0, len(names)), dtype=np.int64)]
+
+    def __len__(self):
+        return sum(len(chunk) for chunk in self.chunks)
+
+    def last_id(self):
+        chunk = self.chunks[-1]
+        return int(chunk[-1, 0]) if len(chunk) else 0
+
+    def load(self, chunks):
+        for rows in chunks:
+            self.chunks.append(self.np.array(rows, dtype=self.np.int64))
+            if len(self.chunks) > 1 and not len(self.chunks[0]):
+                self.chunks.pop(0)
+
+    def columns(self):
+        if len(self.chunks) > 1:
+            self.chunks = [self.np.concatenate(self.chunks)]
+        rows = self.chunks[0]
+        return {name: rows[:, i] for i, name in enumerate(self.names)}
+
+
+class QuizColumns:
+    """One quiz's answers and question screenings as columnar arrays."""
+
+    def __init__(self, np, quiz_id):
+        self.quiz_id = quiz_id
+        self.lock = threading.Lock()
+        self.answers = Table(np, ANSWER_COLUMNS)
+        self.screenings = Table(np, SCREENING_COLUMNS)
+        self.report = None
+        self.report_key = None
+
+    def refresh(self):
+        """Append the answers and screenings added since the last refresh."""
+        answers_after, screenings_after = self.answers.last_id(), self.screenings.last_id()
+        if connection.vendor == 'sqlite':
+            self.answers.load(_fetch_sql(ANSWERS_SQL, self.quiz_id, answers_after))
+            self.screenings.load(_fetch_sql(SCREENINGS_SQL, self.quiz_id, screenings_after))
+        else:
+            self.answers.load(_fetch_orm(
+                ParticipantAnswer.objects.filter(question__quiz_id=self.quiz_id, id__gt=answers_after)
+                .order_by('id')
+                .values_list('id', 'participant_id', 'participant__session_id', 'question_id',
+                             'selected_option', 'is_correct', 'answered_at'),
+                lambda row: (*row[:4], _option_index(row[4]), int(row[5]), _epoch_ms(row[6])),
+            ))
+            self.screenings.load(_fetch_orm(
+                LiveQuestion.objects.filter(question__quiz_id=self.quiz_id, id__gt=screenings_after)
+                .order_by('id')
+                .values_list('id', 'session_id', 'question_id', 'displayed_at'),
+                lambda row: (*row[:3], _epoch_ms(row[3])),
+            ))
+
+
+def _fetch_sql(sql, quiz_id, after):
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [quiz_id, after])
+        while True:
+            rows = cursor.fetchmany(FETCH_SIZE)
+            if not rows:
+                break
+            yield rows
+
+
+def _fetch_orm(queryset, convert):
+    rows = []
+    for row in queryset.iterator(chunk_size=FETCH_SIZE):
+        rows.append(convert(row))
+        if len(rows) == FETCH_SIZE:
+            yield rows
+            rows = []
+    if rows:
+        yield rows
+
+
+def _option_index(option):
+    letter = (option or '')[:1].upper()
+    return OPTIONS.index(letter) if letter and letter in OPTIONS else NO_OPTION
+
+
+def _epoch_ms(moment):
+    if timezone.is_naive(moment):
+        moment = moment.replace(tzinfo=datetime.timezone.utc)
+    return int(moment.timestamp() * 1000)
+
+
+def response_seconds(np, a, s):
+    """
+    Seconds from each answer's question being shown to the answer, using the
+    latest showing of that question in that session not after the answer.
+    NaN when no showing is found.
+    """
+    result = np.full(len(a['question']), np.nan)
+    if not len(s['question']) or not len(a['question']):
+        return result
+    # Dense ids for (session, question) pairs, then one sorted composite key
+    # (pair, time) so a single searchsorted finds every answer's showing.
+    stride = max(s['question'].max(), a['question'].max()) + 1
+    pairs = np.concatenate([s['session'] * stride + s['question'], a['session'] * stride + a['question']])
+    _, pair_ids = np.unique(pairs, return_inverse=True)
+    shown_pair, answer_pair = pair_ids[:len(s['question'])], pair_ids[len(s['question']):]
+
+    start = min(s['displayed_ms'].min(), a['answered_ms'].min())
+    span = max(s['displayed_ms'].max(), a['answered_ms'].max()) - start + 1
+    shown_key = shown_pair * span + (s['displayed_ms'] - start)
+    order = np.argsort(shown_key)
+    shown_key, shown_at = shown_key[order], s['displayed_ms'][order]
+    answer_key = answer_pair * span + (a['answered_ms'] - start)
+
+    index = np.searchsorted(shown_key, answer_key, side='right') - 1
+    found = index >= 0
+    found[found] = shown_key[index[found]] // span == answer_pair[found]
+    result[found] = (a['answered_ms'][found] - shown_at[index[found]]) / 1000
+    return result
+
+
+def grouped_median(np, groups, values, size):
+    """Median of ``values`` per group id in [0, size); NaN for empty groups."""
+    medians = np.full(size, np.nan)
+    keep = ~np.isnan(values)
+    groups, values = groups[keep], values[keep]
+    if not len(values):
+        return medians
+    order = np.lexsort((values, groups))
+    groups, values = groups[order], values[order]
+    counts = np.bincount(groups, minlength=size)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    present = counts > 0
+    low = starts[present] + (counts[present] - 1) // 2
+    high = starts[present] + counts[present] // 2
+    medians[present] = (values[low] + values[high]) / 2
+    return medians
+
+
+def compute(np, quiz_id, questions, a, s):
+    question_ids = np.array([qid for qid, _ in questions], dtype='q')
+    size = len(question_ids)
+
+    # Answers to questions since deleted from the quiz are ignored.
+    q_index = np.searchsorted(question_ids, a['question'])
+    q_index = np.minimum(q_index, max(size - 1, 0))
+    known = (question_ids[q_index] == a['question']) if size else np.zeros(len(q_index), bool)
+    a = {name: column[known] for name, column in a.items()}
+    q_index = q_index[known]
+    correct = a['correct'].astype(bool)
+    option = a['option']
+
+    attempts = np.bincount(q_index, minlength=size)
+    right = np.bincount(q_index, weights=correct, minlength=size)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        p_value = right / attempts
+
+    # Discrimination: p-value among the top 27% of participants (by correct
+    # answers in this quiz) minus p-value among the bottom 27%.
+    participants, p_index = np.unique(a['participant'], return_inverse=True)
+    p_index = p_index.reshape(-1)
+    totals = np.bincount(p_index, weights=correct, minlength=len(participants))
+    group = max(int(round(len(participants) * GROUP_FRACTION)), 1)
+    ranking = np.argsort(totals, kind='stable')
+    upper = np.zeros(len(participants), bool)
+    lower = np.zeros(len(participants), bool)
+    if len(participants) >= 2:
+        lower[ranking[:group]] = True
+        upper[ranking[-group:]] = True
+
+    def group_p(mask):
+        rows = mask[p_index]
+        n = np.bincount(q_index[rows], minlength=size)
+        k = np.bincount(q_index[rows], weights=correct[rows], minlength=size)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return k / n
+
+    discrimination = group_p(upper) - group_p(lower)
+
+    options = np.bincount(
+        q_index * (NO_OPTION + 1) + option, minlength=size * (NO_OPTION + 1)
+    ).reshape(size, NO_OPTION + 1)
+    median_seconds = grouped_median(np, q_index, response_seconds(np, a, s), size)
+
+    def number(value, digits=3):
+        return None if np.isnan(value) else round(float(value), digits)
+
+    report = []
+    for i, (qid, text) in enumerate(questions):
+        p = number(p_value[i])
+        d = number(discrimination[i])
+        flags = []
+        if p is not None and p < TOO_HARD:
+            flags.append('too_hard')
+        if p is not None and p > TOO_EASY:
+            flags.append('too_easy')
+        if d is not None and d < WEAK_DISCRIMINATION:
+            flags.append('weak_discrimination')
+        report.append({
+            'id': qid,
+            'text': text[:80],
+            'attempts': int(attempts[i]),
+            'correct': int(right[i]),
+            'p_value': p,
+            'difficulty': None if p is None else round(1 - p, 3),
+            'discrimination': d,
+            'options': {option: int(options[i, j]) for j, option in enumerate(OPTIONS)},
+            'median_response_seconds': number(median_seconds[i], 2),
+            'flags': flags,
+        })
+    return {
+        'quiz': quiz_id,
+        'answers': int(len(q_index)),
+        'participants': int(len(participants)),
+        'questions': report,
+    }
+
+
+# ─── Per-quiz Cache ──────────────────────────────────────────
+
+_quizzes = OrderedDict()   # quiz id -> QuizColumns
+_lock = threading.Lock()
+
+
+def _columns_for(np, quiz_id):
+    with _lock:
+        columns = _quizzes.get(quiz_id)
+        if columns is None:
+            columns = _quizzes[quiz_id] = QuizColumns(np, quiz_id)
+            if len(_quizzes) > getattr(settings, 'ANALYTICS_CACHE_QUIZZES', 64):
+                _quizzes.popitem(last=False)
+        else:
+            _quizzes.move_to_end(quiz_id)
+        return columns
+
+
+def quiz_report(quiz_id):
+    """Per-question statistics for a quiz; raises RuntimeError without NumPy."""
+    np = load_numpy()
+    if np is None:
+        raise RuntimeError("Question analytics need NumPy installed.")
+    started = time.perf_counter()
+    columns = _columns_for(np, quiz_id)
+    with columns.lock:
+        columns.refresh()
+        # Deleted answers (or a purge) leave the cache with rows the table no
+        # longer has; start over from an empty cache.
+        total = ParticipantAnswer.objects.filter(question__quiz_id=quiz_id).count()
+        if total != len(columns.answers):
+            columns = QuizColumns(np, quiz_id)
+            columns.refresh()
+            with _lock:
+                _quizzes[quiz_id] = columns
+        questions = tuple(Question.objects.filter(quiz_id=quiz_id).order_by('id').values_list('id', 'text'))
+        key = (columns.answers.last_id(), columns.screenings.last_id(), questions)
+        if columns.report_key != key:
+            columns.report = compute(
+                np, quiz_id, questions, columns.answers.columns(), columns.screenings.columns()
+            )
+            columns.report_key = key
+        report = dict(columns.report)
+    report['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    return report
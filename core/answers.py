@@ -0,0 +1,182 @@
+import atexit
+import logging
+import threading
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import results_cache
+from .journal import get_journal
+from .models import LiveSession, Participant, ParticipantAnswer
+
+logger = logging.getLogger(__name__)
+
+
+# ─── Write-behind Answers ────────────────────────────────────
+#
+# With the session journal enabled, an answer is accepted once its journal
+# record is fsynced, and is handed here then; a background thread writes
+# accepted answers and their points to the database in batches. Until then
+# the actor's in-memory state is the source of truth, and an actor that
+# reloads from the database merges in what is still pending.
+#
+# A batch that fails is retried whole on the next flush. After
+# ANSWER_MAX_ATTEMPTS failures it is written row by row instead, and rows
+# that still fail are logged in full and set aside in ``rejected``, so one
+# bad row can't hold up every answer behind it.
+
+class AnswerWriter:
+
+    def __init__(self, batch_size=None, flush_interval=None):
+        self.batch_size = batch_size or getattr(settings, 'ANSWER_BATCH_SIZE', 1000)
+        self.flush_interval = flush_interval or getattr(settings, 'ANSWER_FLUSH_INTERVAL', 0.25)
+        self.max_attempts = getattr(settings, 'ANSWER_MAX_ATTEMPTS', 3)
+        self.pending = []           # (ParticipantAnswer, session id, points, journal segment, failed attempts)
+        self.rejected = []          # pending entries that could not be written
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.thread = None
+
+    def submit(self, answer, session_id, points, segment):
+        with self.lock:
+            self.pending.append((answer, session_id, points, segment, 0))
+            full = len(self.pending) >= self.batch_size
+        self._ensure_thread()
+        if full:
+            self.wakeup.set()
+
+    def pending_for(self, session_id):
+        """
+        [(participant id, question id, is_correct, points)] not yet written.
+        Call with ``lock`` held, around the reads it is merged with.
+        """
+        return [
+            (answer.participant_id, answer.question_id, answer.is_correct, points)
+            for answer, pending_session, points, _, _ in self.pending
+            if pending_session == session_id
+        ]
+
+    def flush(self):
+        # Holding the lock across the write means an answer is always either
+        # pending or in the table, so reloading actors never miss or double it.
+        with self.lock:
+            batch, self.pending = self.pending, []
+            if not batch:
+                return 0
+            try:
+                self._write(batch)
+                done = batch
+            except Exception:
+                if max(entry[4] for entry in batch) + 1 < self.max_attempts:
+                    logger.exception("Answer flush failed; %d answers will be retried", len(batch))
+                    self.pending = [entry[:4] + (entry[4] + 1,) for entry in batch] + self.pending
+                    return 0
+                done = self._write_each(batch)
+        journal = get_journal()
+        if journal is not None:
+            journal.release(Counter(segment for _, _, _, segment, _ in batch if segment))
+        if done:
+            # Results polled since these answers were accepted were built without them.
+            session_ids = {entry[1] for entry in done}
+            for code in LiveSession.objects.filter(id__in=session_ids).values_list('session_code', flat=True):
+                results_cache.bump(code)
+        return len(done)
+
+    def _write(self, batch):
+        try:
+            with transaction.atomic():
+                ParticipantAnswer.objects.bulk_create([entry[0] for entry in batch])
+                points = Counter()
+                for answer, _, amount, _, _ in batch:
+                    points[answer.participant_id] += amount
+                add_points(+points)
+        except Exception:
+            for entry in batch:
+                entry[0].pk = None
+            raise
+
+    def _write_each(self, batch):
+        """Write a batch that keeps failing one row at a time; returns the rows written."""
+        written = []
+        for entry in batch:
+            try:
+                self._write([entry])
+            except Exception:
+                answer = entry[0]
+                logger.exception(
+                    "Answer rejected after %d attempts: participant %s, question %s, option %r, "
+                    "correct %s, points %s, answered at %s",
+                    self.max_attempts, answer.participant_id, answer.question_id,
+                    answer.selected_option, answer.is_correct, entry[2], answer.answered_at.isoformat(),
+                )
+                self.rejected.append(entry)
+            else:
+                written.append(entry)
+        return written
+
+    def _ensure_thread(self):
+        if self.thread is None or not self.thread.is_alive():
+            with self.lock:
+                if self.thread is None or not self.thread.is_alive():
+                    self.thread = threading.Thread(target=self._run, name='answer-writer', daemon=True)
+                    self.thread.start()
+
+    def _run(self):
+        while True:
+            self.wakeup.wait(self.flush_interval)
+            self.wakeup.clear()
+            close_old_connections()
+            self.flush()
+
+
+def add_points(points):
+    """Add {participant id: points} to scores, one UPDATE per distinct amount."""
+    by_amount = defaultdict(list)
+    for participant_id, amount in points.items():
+        by_amount[amount].append(participant_id)
+    for amount, participant_ids in by_amount.items():
+        Participant.objects.filter(id__in=participant_ids).update(score=F('score') + amount)
+
+
+def replay(records):
+    """
+    Write journaled answers the database doesn't have yet (recovery after a
+    crash). Answers already present are skipped, so replaying twice is safe.
+    """
+    if not records:
+        return 0
+    with transaction.atomic():
+        participant_ids = {record['participant'] for record in records}
+        existing = set(
+            ParticipantAnswer.objects.filter(participant_id__in=participant_ids)
+            .values_list('participant_id', 'question_id')
+        )
+        live_participants = set(
+            Participant.objects.filter(id__in=participant_ids).values_list('id', flat=True)
+        )
+        missing = [
+            record for record in records
+            if (record['participant'], record['question']) not in existing
+            and record['participant'] in live_participants
+        ]
+        ParticipantAnswer.objects.bulk_create([
+            ParticipantAnswer(
+                participant_id=record['participant'], question_id=record['question'],
+                selected_option=record['option'], is_correct=record['correct'],
+                answered_at=parse_datetime(record['at']) if 'at' in record else timezone.now(),
+            )
+            for record in missing
+        ], ignore_conflicts=True)
+        points = Counter()
+        for record in missing:
+            points[record['participant']] += record['points']
+        add_points(+points)
+    return len(missing)
+
+
+writer = AnswerWriter()
+atexit.register(writer.flush)
@@ -0,0 +1,174 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db.models.signals import post_delete, post_save
+from rest_framework.exceptions import AuthenticationFailed, NotAuthenticated
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from . import metrics
+from .models import User
+
+
+# ─── Verified Token Cache ────────────────────────────────────
+#
+# A host driving a live session sends a burst of authenticated requests
+# (push, reveal, extend, ...) with the same access token. Verifying the
+# signature and loading the user each time is the same work over and over,
+# so verified tokens are kept in a bounded LRU keyed by a hash of the token
+# (the token itself is never held as a key) for JWT_CACHE_TTL seconds, or
+# until the token's own exp if that is sooner. Saving or deleting a user
+# drops their entries in this process only: other worker processes keep
+# serving the cached user until the entry ages out, so deactivating a host
+# or changing their password takes up to JWT_CACHE_TTL seconds everywhere.
+
+class TokenCache:
+
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries or getattr(settings, 'JWT_CACHE_SIZE', 10000)
+        self.ttl = getattr(settings, 'JWT_CACHE_TTL', 30)
+        self.entries = OrderedDict()    # token hash -> (user, validated token, expires)
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(raw_token):
+        if isinstance(raw_token, str):
+            raw_token = raw_token.encode()
+        return hashlib.blake2b(raw_token, digest_size=16).digest()
+
+    def get(self, raw_token):
+        key = self.key(raw_token)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[2] <= time.time():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry[0], entry[1]
+
+    def put(self, raw_token, user, validated_token):
+        exp = validated_token.get('exp')
+        if exp is None:
+            return
+        expires = min(exp, time.time() + self.ttl)
+        with self.lock:
+            self.entries[self.key(raw_token)] = (user, validated_token, expires)
+            if len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def forget_user(self, user_id):
+        with self.lock:
+            for key in [key for key, (user, _, _) in self.entries.items() if user.pk == user_id]:
+                del self.entries[key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+token_cache = TokenCache()
+
+
+def _user_changed(sender, instance, **kwargs):
+    token_cache.forget_user(instance.pk)
+
+
+post_save.connect(_user_changed, sender=User, dispatch_uid='auth.user_saved')
+post_delete.connect(_user_changed, sender=User, dispatch_uid='auth.user_deleted')
+
+
+# ─── Authentication ──────────────────────────────────────────
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """SimpleJWT's JWTAuthentication with verified tokens served from ``token_cache``."""
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        return authenticate_token(raw_token, self)
+
+
+def authenticate_token(raw_token, auth=None):
+    """(user, validated token) for a raw access token; raises InvalidToken/AuthenticationFailed."""
+    cached = token_cache.get(raw_token)
+    if cached is not None:
+        metrics.incr('auth.token_cache_hits')
+        return cached
+    metrics.incr('auth.token_cache_misses')
+    auth = auth or JWTAuthentication()
+    validated_token = auth.get_validated_token(raw_token)
+    user = auth.get_user(validated_token)
+    token_cache.put(raw_token, user, validated_token)
+    return user, validated_token
+
+
+async def aauthenticate_token(raw_token):
+    """Async ``authenticate_token``: a cache hit never leaves the event loop."""
+    cached = token_cache.get(raw_token)
+    if cached is not None:
+        metrics.incr('auth.token_cache_hits')
+        return cached
+    return await database_sync_to_async(authenticate_token)(raw_token)
+
+
+async def authenticate(request):
+    """The JWT-authenticated user of a plain async Django view's request."""
+    auth = JWTAuthentication()
+    header = auth.get_header(request)
+    if header is None:
+        raise NotAuthenticated()
+    raw_token = auth.get_raw_token(header)
+    if raw_token is None:
+        raise NotAuthenticated()
+    user, _ = await aauthenticate_token(raw_token)
+    return user
+
+
+# ─── WebSocket Token Auth ────────────────────────────────────
+#
+# Browsers can't set headers on a WebSocket handshake, so the access token
+# comes in the query string (?token=...); other clients may send the usual
+# Authorization: Bearer header instead. Sockets without a valid token are
+# still accepted, as players, with an AnonymousUser.
+
+class JWTAuthMiddleware(BaseMiddleware):
+
+    async def __call__(self, scope, receive, send):
+        scope = dict(scope, user=await self.resolve_user(scope))
+        return await super().__call__(scope, receive, send)
+
+    async def resolve_user(self, scope):
+        raw_token = self.token_from_scope(scope)
+        if raw_token is None:
+            return AnonymousUser()
+        try:
+            user, _ = await aauthenticate_token(raw_token)
+        except (InvalidToken, TokenError, AuthenticationFailed):
+            return AnonymousUser()
+        return user
+
+    @staticmethod
+    def token_from_scope(scope):
+        query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+        if query.get('token'):
+            return query['token'][0].encode()
+        header = dict(scope.get('headers', [])).get(b'authorization', b'').split()
+        types = jwt_settings.AUTH_HEADER_TYPES
+        allowed = {name.encode() for name in ((types,) if isinstance(types, str) else types)}
+        if len(header) == 2 and header[0] in allowed:
+            return header[1]
+        return None
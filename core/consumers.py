@@ -1,16 +1,35 @@
-import json
+import logging
+import zlib
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
-from .models import LiveSession, LiveQuestion, Question, ParticipantAnswer, Participant
-import asyncio
-from django.db import models
+from django.contrib.auth.models import AnonymousUser
+from rest_framework.exceptions import APIException
+from django.conf import settings
+from .models import LiveSession
+from .outbound import OutboundQueue
+from . import eventlog, frames, live, sharding
+
+logger = logging.getLogger(__name__)
+
+# Client message type -> session actor host command
+HOST_CONTROL_MESSAGES = {
+    'push_question': 'push',
+    'reveal_answer': 'reveal',
+    'extend_question': 'extend',
+    'pause_question': 'pause',
+    'resume_question': 'resume',
+    'skip_question': 'skip',
+    'end_session': 'end',
+    'start_playlist': 'playlist',
+    'stop_playlist': 'stop_playlist',
+}
 
 
 class LiveSessionConsumer(AsyncWebsocketConsumer):
-    last_revealed_question_id = None
     async def connect(self):
-        print("🔌 WebSocket hit:", self.scope["path"])
+        eventlog.event(logger, 'ws.connect', logging.DEBUG, path=self.scope['path'])
         self.session_code = self.scope['url_route']['kwargs']['code']
+        sharding.observe(dict(self.scope.get('headers', [])).get(b'x-quiz-shards', b'').decode())
         self.group_name = f'session_{self.session_code}'
 
         try:
@@ -24,156 +43,105 @@ class LiveSessionConsumer(AsyncWebsocketConsumer):
                 return
 
             await self.channel_layer.group_add(self.group_name, self.channel_name)
-            await self.accept()
-        except Exception as e:
-            print(f"WebSocket connection error: {e}")
+            # JSON unless the client asked for the binary subprotocol
+            self.codec = frames.negotiate(self.scope.get('subprotocols', []))
+            await self.accept(subprotocol=self.codec.subprotocol)
+            self.outbound = OutboundQueue(self.send_data, settings.WS_SEND_QUEUE_LIMIT)
+            live.tell(self.session_code, 'connect')
+        except Exception:
+            logger.exception("WebSocket connection error")
             await self.close(code=4500)  # Custom close code for server error
 
     async def disconnect(self, close_code):
+        if hasattr(self, 'outbound'):
+            self.outbound.close()
         # Remove from group when disconnecting
         if hasattr(self, 'group_name'):
             await self.channel_layer.group_discard(self.group_name, self.channel_name)
 
-    async def send_leaderboard(self, event):
-        await self.send(text_data=json.dumps({
-            'type': 'leaderboard',
-            'leaderboard': event['leaderboard']
-        }))
-
-    async def send_question_with_leaderboard(self, event):
-        await self.send(text_data=json.dumps({
-            'type': 'question_with_leaderboard',
-            'question': event['question'],
-            'start_time': event['start_time'],
-            'duration': event['duration'],
-            'leaderboard': event['leaderboard']
-        }))
-
-    async def session_ended(self, event):
-        await self.send(text_data=json.dumps({
-            'type': 'session_ended',
-            'message': event['message']
-        }))
-
-    async def send_waiting_on(self, event):
-        await self.send(text_data=json.dumps({
-            'type': 'waiting_on',
-            'players': event['players']
-        }))
-
-    async def reveal_answer(self, event):
-        await self.send(text_data=json.dumps({
-            'type': 'reveal_answer',
-            'question_id': event['question_id'],
-            'correct_option': event['correct_option'],
-            'correct_participants': event['correct_participants'],
-            'total_answers': event['total_answers'],
-            'correct_count': event['correct_count']
-        }))
-
-    async def receive(self, text_data):
-        data = json.loads(text_data)
-        print("🟢 Received WebSocket message:", data)
-
-        msg_type = data.get('type')  # ✅ Now it's defined
-
-        if msg_type == 'push_question':
-            await self.handle_push_question(data['question'])
-
-        elif msg_type == 'reveal_answer':
-            await self.handle_reveal_answer(data['question_id'], data['correct_option'])
-
-        elif msg_type == 'end_session':
-            await self.channel_layer.group_send(self.group_name, {
-                'type': 'session_ended',
-                'message': data.get('message', 'Session ended')
-            })
-
-
-    async def handle_push_question(self, question_data):
-        question_id = question_data['id']
-        correct_option = question_data.get('correct_option')
-        duration = question_data.get('duration', 60)
-
-        session = await database_sync_to_async(
-            lambda: LiveSession.objects.get(session_code=self.session_code)
-        )()
-
-        # 🔧 Ensure LiveQuestion is created
-        await database_sync_to_async(LiveQuestion.objects.create)(
-            question_id=question_id,
-            session=session
-        )
-
-        leaderboard = await self.get_leaderboard()
+    # ── outbound frames ──
+
+    async def send_data(self, data):
+        if isinstance(data, bytes):
+            await self.send(bytes_data=data)
+        else:
+            await self.send(text_data=data)
+
+    async def send_frame(self, frame, frame_id=None):
+        """Queue a frame for this client, dropping the client if it is too far behind."""
+        parts = self.codec.encode(frame, frame_id)
+        # A frame that introduces names goes behind them, not into an earlier slot.
+        in_place = parts[0][0] != 'names'
+        for kind, data in parts:
+            if not self.outbound.push(kind, data, in_place):
+                eventlog.event(logger, 'ws.overflow', logging.WARNING, session=self.session_code)
+                self.outbound.close()
+                await self.close(code=4008)
+                return
 
-        await self.channel_layer.group_send(self.group_name, {
-            'type': 'send_question_with_leaderboard',
-            'question': question_data,
-            'start_time': str(asyncio.get_event_loop().time()),
-            'duration': duration,
-            'leaderboard': leaderboard
-        })
+    async def send_event(self, event):
+        await self.send_frame(frames.event_frame(event), event.get('frame_id'))
 
-        await asyncio.sleep(duration)
-        await self.handle_reveal_answer(question_id, correct_option)
+    # Group broadcast handlers; the frames they send are in frames.EVENT_FRAMES.
+    send_leaderboard = send_event
+    send_question_with_leaderboard = send_event
+    session_ended = send_event
+    send_waiting_on = send_event
+    reveal_answer = send_event
+    send_timer_update = send_event
+    question_skipped = send_event
 
-    async def handle_reveal_answer(self, question_id, correct_option):
-        if self.last_revealed_question_id == question_id:
-            print(f"⏩ Skipping duplicate reveal for question {question_id}")
+    async def receive(self, text_data=None, bytes_data=None):
+        try:
+            data = self.codec.decode(text_data if text_data is not None else bytes_data)
+        except (ValueError, zlib.error):
+            data = None
+        if not isinstance(data, dict):
+            eventlog.event(logger, 'ws.bad_message', logging.DEBUG, session=self.session_code)
+            await self.send_frame({'type': 'error', 'command': None, 'error': 'Malformed message.'})
+            return
+        msg_type = data.get('type')
+        eventlog.event(logger, 'ws.receive', logging.DEBUG, session=self.session_code, type=msg_type)
+
+        if msg_type in HOST_CONTROL_MESSAGES:
+            await self.handle_host_control(msg_type, data)
+
+    async def handle_host_control(self, msg_type, data):
+        command = HOST_CONTROL_MESSAGES[msg_type]
+        if command == 'push':
+            question = data.get('question') or {}
+            payload = {
+                'question_id': data.get('question_id', question.get('id')),
+                'duration': data.get('duration', question.get('duration', 60)),
+            }
+        elif command == 'reveal':
+            payload = {'question_id': data.get('question_id')}
+        elif command == 'extend':
+            payload = {'seconds': data.get('seconds', 10)}
+        elif command == 'end':
+            payload = {'message': data.get('message', 'Session ended')}
+        elif command == 'playlist':
+            payload = {
+                key: data[key] for key in ('duration', 'reveal_seconds', 'end_when_done') if key in data
+            }
+            payload['items'] = data.get('items')
+        else:
+            payload = {}
+
+        # The actor applies the command and schedules any timers in the
+        # background, so the host's socket is free again straight away.
+        try:
+            user = self.scope.get('user') or AnonymousUser()
+            await live.control(self.session_code, user, command, **payload)
+        except APIException as e:
+            await self.send_frame({
+                'type': 'error',
+                'command': msg_type,
+                'error': str(e.detail)
+            })
             return
 
-        self.last_revealed_question_id = question_id
-
-        # ✅ Correct filtering using foreign key field 'participant'
-        correct_participants = await database_sync_to_async(
-            lambda: list(
-                ParticipantAnswer.objects
-                .filter(question_id=question_id, selected_option=correct_option)
-                .select_related('participant')  # optimize
-                .values_list('participant__name', flat=True)
-            )
-        )()
-
-        total_answers = await database_sync_to_async(
-            lambda: ParticipantAnswer.objects.filter(question_id=question_id).count()
-        )()
-
-        await self.channel_layer.group_send(self.group_name, {
-            'type': 'reveal_answer',
-            'question_id': question_id,
-            'correct_option': correct_option,
-            'correct_participants': correct_participants,
-            'total_answers': total_answers,
-            'correct_count': len(correct_participants)
-        })
-
-        # ✅ Only get participants in this session
-        list_of_player_names = await database_sync_to_async(
-            lambda: list(
-                Participant.objects
-                .filter(session__session_code=self.session_code)
-                .values_list('name', flat=True)
-            )
-        )()
-
-        await self.channel_layer.group_send(self.group_name, {
-            'type': 'send_waiting_on',
-            'players': list_of_player_names
+        await self.send_frame({
+            'type': 'control_ack',
+            'command': msg_type
         })
-
-    async def get_leaderboard(self):
-        leaderboard_data = await database_sync_to_async(
-            lambda: list(
-                Participant.objects.filter(session__session_code=self.session_code)
-                .annotate(correct_count=models.Count(
-                    'participantanswer',
-                    filter=models.Q(
-                        participantanswer__selected_option=models.F('participantanswer__question__correct_option')
-                    )
-                ))
-                .values('name', 'correct_count')
-                .order_by('-correct_count')
-            )
-        )()
-        return leaderboard_data
@@ -0,0 +1,112 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+NS_PER_MS = 1_000_000
+NS_PER_SECOND = 1_000_000_000
+
+
+# ─── Question Deadlines ──────────────────────────────────────
+#
+# The actor keeps the live question's deadline as a monotonic instant in
+# nanoseconds, so wall-clock adjustments (NTP steps, DST) can't shorten or
+# stretch a question. Answers are accepted until the deadline plus a small
+# grace window for network latency: a player who tapped at 0.0 s on their
+# screen still gets in. Everything that closes the question (reveal, skip,
+# pause, end) folds into one number, ``closes_at``, so accepting an answer
+# is a single integer compare.
+#
+# Clients can't use monotonic time, so broadcasts carry the server's epoch
+# milliseconds and the milliseconds remaining; a client computes its own
+# deadline as local_now + remaining_ms and can estimate clock offset from
+# server_time.
+
+CLOSED = 0
+
+
+def grace_ns():
+    return getattr(settings, 'LIVE_ANSWER_GRACE_MS', 500) * NS_PER_MS
+
+
+def server_time_ms():
+    """Epoch milliseconds, for clients to sync against."""
+    return time.time_ns() // NS_PER_MS
+
+
+class Deadline:
+    """One live question's timer: running, paused, or closed."""
+
+    __slots__ = ('ends_at', 'paused_ns', 'closes_at', 'grace')
+
+    def __init__(self):
+        self.ends_at = None         # monotonic ns the timer runs out, while running
+        self.paused_ns = None       # ns left, while paused
+        self.closes_at = CLOSED     # monotonic ns answers stop being accepted
+        self.grace = grace_ns()
+
+    # ── state changes ──
+
+    def start(self, seconds):
+        self.ends_at = time.monotonic_ns() + int(seconds * NS_PER_SECOND)
+        self.paused_ns = None
+        self.closes_at = self.ends_at + self.grace
+
+    def start_paused(self, seconds):
+        self.ends_at = None
+        self.paused_ns = int(seconds * NS_PER_SECOND)
+        self.closes_at = CLOSED
+
+    def restore(self, expires_at):
+        """Pick a running deadline back up from a wall-clock expiry (the database)."""
+        self.start((expires_at - timezone.now()).total_seconds())
+
+    def extend(self, seconds):
+        if self.paused_ns is not None:
+            self.paused_ns += int(seconds * NS_PER_SECOND)
+        else:
+            self.start(self.remaining_ns() / NS_PER_SECOND + seconds)
+
+    def pause(self):
+        self.paused_ns = self.remaining_ns()
+        self.ends_at = None
+        self.closes_at = CLOSED
+
+    def resume(self):
+        self.start(self.paused_ns / NS_PER_SECOND)
+
+    def close(self):
+        self.ends_at = None
+        self.paused_ns = None
+        self.closes_at = CLOSED
+
+    # ── reads ──
+
+    @property
+    def paused(self):
+        return self.paused_ns is not None
+
+    def accepts(self):
+        return time.monotonic_ns() < self.closes_at
+
+    def remaining_ns(self):
+        if self.paused_ns is not None:
+            return self.paused_ns
+        if self.ends_at is None:
+            return 0
+        return max(self.ends_at - time.monotonic_ns(), 0)
+
+    def remaining_ms(self):
+        return self.remaining_ns() // NS_PER_MS
+
+    def remaining_seconds(self):
+        return self.remaining_ns() / NS_PER_SECOND
+
+    def reveal_delay(self):
+        """Seconds until the reveal is due: the deadline plus the grace window."""
+        return (self.remaining_ns() + self.grace) / NS_PER_SECOND
+
+    def expires_at(self):
+        """The deadline as a wall-clock datetime, for persisting."""
+        return timezone.now() + timedelta(microseconds=self.remaining_ns() // 1000)
@@ -0,0 +1,99 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+
+from django.conf import settings
+
+
+# ─── Structured Events ───────────────────────────────────────
+#
+# Hot paths log through event() rather than logger.info(f"..."): nothing is
+# formatted unless the level is enabled and the event survives sampling,
+# and the actual formatting happens on the BackgroundHandler's thread.
+
+_sample_rates = None
+
+
+def sample_rate(name):
+    global _sample_rates
+    if _sample_rates is None:
+        _sample_rates = getattr(settings, 'EVENT_LOG_SAMPLING', {})
+    return _sample_rates.get(name, 1.0)
+
+
+class _Fields:
+    """key=value rendering of an event's fields, deferred until formatted."""
+
+    __slots__ = ('fields',)
+
+    def __init__(self, fields):
+        self.fields = fields
+
+    def __str__(self):
+        return ' '.join(f'{key}={value}' for key, value in self.fields.items())
+
+
+def event(logger, name, level=logging.INFO, **fields):
+    if not logger.isEnabledFor(level):
+        return
+    rate = sample_rate(name)
+    if rate < 1.0:
+        if random.random() >= rate:
+            return
+        fields['sample_rate'] = rate
+    logger.log(level, '%s %s', name, _Fields(fields), extra={'event': name, 'fields': fields})
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line; events keep their fields as real keys."""
+
+    def format(self, record):
+        data = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+        }
+        if hasattr(record, 'event'):
+            data['event'] = record.event
+            data.update(record.fields)
+        else:
+            data['message'] = record.getMessage()
+        if record.exc_info:
+            data['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(data, default=str)
+
+
+# ─── Background Handler ──────────────────────────────────────
+
+class BackgroundHandler(logging.handlers.QueueHandler):
+    """
+    Queue records on the calling thread and write them from a listener
+    thread. The queue is bounded; when it is full, records are dropped and
+    counted instead of blocking a request.
+    """
+
+    def __init__(self, stream=None, maxsize=10000):
+        super().__init__(queue.Queue(maxsize))
+        self.dropped = 0
+        self.target = logging.StreamHandler(stream)
+        self.listener = logging.handlers.QueueListener(self.queue, self.target)
+        self.listener.start()
+        atexit.register(self.listener.stop)
+
+    def setFormatter(self, fmt):
+        super().setFormatter(fmt)
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # QueueHandler formats here by default, on the request thread;
+        # leave that to the listener.
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
@@ -0,0 +1,174 @@
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Count
+
+from .models import Feedback
+
+logger = logging.getLogger(__name__)
+
+RATINGS = range(1, 6)
+
+
+# ─── Rating Aggregates ───────────────────────────────────────
+
+class RatingStats:
+    """Running histogram and average of one session's ratings."""
+
+    __slots__ = ('histogram', 'count', 'total')
+
+    def __init__(self):
+        self.histogram = dict.fromkeys(RATINGS, 0)
+        self.count = 0
+        self.total = 0
+
+    def add(self, rating, n=1):
+        self.histogram[rating] = self.histogram.get(rating, 0) + n
+        self.count += n
+        self.total += rating * n
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'average': round(self.total / self.count, 2) if self.count else None,
+            'histogram': {str(r): n for r, n in self.histogram.items()},
+        }
+
+
+# ─── Buffered Writer ─────────────────────────────────────────
+#
+# When a big session ends, every player submits feedback at once. Accepted
+# rows are queued in memory and written by a background thread with
+# bulk_create, either when a batch fills up or every flush interval.
+#
+# A batch that fails is rolled back and retried whole. After
+# FEEDBACK_MAX_ATTEMPTS failures it is written row by row instead, and rows
+# that still fail are logged, uncounted and set aside in ``rejected``.
+#
+# The rating aggregates in ``stats`` belong to this process: each is read
+# from the table once, then only sees what this process's writer accepts.
+# With several workers a session's stats miss ratings sent to the others
+# until the process restarts or the session is purged.
+
+class FeedbackWriter:
+
+    def __init__(self, batch_size=None, flush_interval=None):
+        self.batch_size = batch_size or getattr(settings, 'FEEDBACK_BATCH_SIZE', 500)
+        self.flush_interval = flush_interval or getattr(settings, 'FEEDBACK_FLUSH_INTERVAL', 1.0)
+        self.max_attempts = getattr(settings, 'FEEDBACK_MAX_ATTEMPTS', 3)
+        self.pending = []           # (Feedback, session id, failed attempts)
+        self.rejected = []          # pending entries that could not be written
+        self.stats = {}             # session id -> RatingStats, this process only
+        self.lock = threading.Lock()
+        self.flushing = threading.Lock()    # one flush at a time; taken before lock
+        self.wakeup = threading.Event()
+        self.thread = None
+
+    def submit(self, feedback, session_id):
+        """Queue an unsaved, validated Feedback and count its rating."""
+        with self.lock:
+            self.pending.append((feedback, session_id, 0))
+            if session_id in self.stats:
+                self.stats[session_id].add(feedback.rating)
+            full = len(self.pending) >= self.batch_size
+        self._ensure_thread()
+        if full:
+            self.wakeup.set()
+
+    def flush(self):
+        # The batch is taken under the lock but written outside it, so
+        # submit() never waits on the database.
+        with self.flushing:
+            with self.lock:
+                batch, self.pending = self.pending, []
+            if not batch:
+                return 0
+            try:
+                self._write(batch)
+            except Exception:
+                if max(attempts for _, _, attempts in batch) + 1 < self.max_attempts:
+                    logger.exception("Feedback flush failed; %d rows will be retried", len(batch))
+                    with self.lock:
+                        self.pending = [
+                            (feedback, session_id, attempts + 1) for feedback, session_id, attempts in batch
+                        ] + self.pending
+                    return 0
+                return self._write_each(batch)
+            return len(batch)
+
+    def _write(self, batch):
+        try:
+            with transaction.atomic():
+                Feedback.objects.bulk_create([entry[0] for entry in batch], batch_size=self.batch_size)
+        except Exception:
+            # Rows the failed insert gave a pk to must go in fresh next time.
+            for entry in batch:
+                entry[0].pk = None
+            raise
+
+    def _write_each(self, batch):
+        """Write a batch that keeps failing one row at a time; returns the rows written."""
+        written = 0
+        for entry in batch:
+            try:
+                self._write([entry])
+            except Exception:
+                feedback, session_id, _ = entry
+                logger.exception(
+                    "Feedback rejected after %d attempts: participant %s, session %s, rating %r, comments %r",
+                    self.max_attempts, feedback.participant_id, session_id, feedback.rating, feedback.comments,
+                )
+                with self.lock:
+                    if session_id in self.stats:
+                        self.stats[session_id].add(feedback.rating, -1)
+                    self.rejected.append(entry)
+            else:
+                written += 1
+        return written
+
+    def session_stats(self, session_id):
+        with self.lock:
+            stats = self.stats.get(session_id)
+            if stats is not None:
+                return stats.as_dict()
+        # Reading the table waits out any flush, so every row is counted
+        # once: either still pending or already written.
+        with self.flushing, self.lock:
+            stats = self.stats.get(session_id)
+            if stats is None:
+                stats = RatingStats()
+                counts = (
+                    Feedback.objects.filter(participant__session_id=session_id)
+                    .values_list('rating')
+                    .annotate(n=Count('id'))
+                )
+                for rating, n in counts:
+                    stats.add(rating, n)
+                for feedback, pending_session, _ in self.pending:
+                    if pending_session == session_id:
+                        stats.add(feedback.rating)
+                self.stats[session_id] = stats
+            return stats.as_dict()
+
+    def _ensure_thread(self):
+        if self.thread is None or not self.thread.is_alive():
+            with self.lock:
+                if self.thread is None or not self.thread.is_alive():
+                    self.thread = threading.Thread(
+                        target=self._run, name='feedback-writer', daemon=True
+                    )
+                    self.thread.start()
+
+    def _run(self):
+        while True:
+            self.wakeup.wait(self.flush_interval)
+            self.wakeup.clear()
+            close_old_connections()
+            self.flush()
+
+
+writer = FeedbackWriter()
+atexit.register(writer.flush)
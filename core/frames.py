@@ -0,0 +1,275 @@
+import json
+import uuid
+import zlib
+from collections import OrderedDict
+
+from . import metrics
+
+_msgpack = None
+
+
+def load_msgpack():
+    """Import msgpack on first use; None if it isn't installed."""
+    global _msgpack
+    if _msgpack is None:
+        try:
+            import msgpack
+        except ImportError:  # optional: without it only JSON frames are offered
+            msgpack = False
+        _msgpack = msgpack
+    return _msgpack or None
+
+
+# ─── Frame Codecs ────────────────────────────────────────────
+#
+# A codec turns one outbound frame dict into the (kind, data) pairs that go
+# on the wire. JSON is the default; clients that ask for the msgpack
+# subprotocol in the WebSocket handshake get compact binary frames instead.
+
+MSGPACK_SUBPROTOCOL = 'quiz.msgpack.v1'
+DEFLATE_SUBPROTOCOL = 'quiz.deflate.v1'
+
+
+# ─── Broadcast Events ────────────────────────────────────────
+#
+# Group broadcast event type -> (frame type, fields copied from the event).
+# WebSocket consumers and the event-stream view build frames from the same
+# broadcasts through this table, so both transports carry the same frames.
+
+EVENT_FRAMES = {
+    'send_question_with_leaderboard': (
+        'question_with_leaderboard',
+        ('question', 'start_time', 'duration', 'server_time', 'remaining_ms', 'leaderboard'),
+    ),
+    'reveal_answer': (
+        'reveal_answer',
+        ('question_id', 'correct_option', 'correct_participants', 'total_answers', 'correct_count'),
+    ),
+    'send_leaderboard': ('leaderboard', ('leaderboard',)),
+    'send_waiting_on': ('waiting_on', ('players',)),
+    'send_timer_update': (
+        'timer_update', ('question_id', 'state', 'remaining', 'duration', 'server_time', 'remaining_ms'),
+    ),
+    'question_skipped': ('question_skipped', ('question_id',)),
+    'session_ended': ('session_ended', ('message',)),
+}
+
+
+def event_frame(event):
+    """The client frame for a group broadcast event."""
+    frame_type, fields = EVENT_FRAMES[event['type']]
+    frame = {'type': frame_type}
+    for field in fields:
+        frame[field] = event[field]
+    if isinstance(frame.get('question'), bytes):
+        frame['question'] = RawJSON(frame['question'])
+    return frame
+
+
+# ─── Encode Once Per Broadcast ───────────────────────────────
+#
+# Group broadcasts carry a frame_id. Codecs whose output doesn't depend on
+# the connection cache their encoding under it, so a frame sent to a room of
+# thousands is serialized (and compressed) once rather than once per socket.
+
+_shared = OrderedDict()
+SHARED_CACHE_SIZE = 256
+
+
+def new_frame_id():
+    return uuid.uuid4().hex
+
+
+def encode_shared(codec_name, frame, frame_id, encode):
+    if frame_id is None:
+        return encode(frame)
+    key = (codec_name, frame_id, frame['type'])
+    data = _shared.get(key)
+    if data is None:
+        data = _shared[key] = encode(frame)
+        if len(_shared) > SHARED_CACHE_SIZE:
+            _shared.popitem(last=False)
+    else:
+        metrics.incr('ws.shared_encode_hits')
+    return data
+
+
+class RawJSON:
+    """A frame value that is already JSON-encoded bytes (see payloads.py)."""
+
+    __slots__ = ('data',)
+
+    def __init__(self, data):
+        self.data = data
+
+    def decode(self):
+        return json.loads(self.data)
+
+
+def dumps(frame):
+    """json.dumps for a flat frame whose values may be RawJSON."""
+    raw = [(key, value) for key, value in frame.items() if isinstance(value, RawJSON)]
+    if not raw:
+        return json.dumps(frame)
+    text = json.dumps({key: value for key, value in frame.items() if not isinstance(value, RawJSON)})
+    parts = [text[:-1]]
+    for key, value in raw:
+        parts.append(f', {json.dumps(key)}: {value.data.decode()}')
+    parts.append('}')
+    return ''.join(parts)
+
+
+class JSONCodec:
+    subprotocol = None
+
+    def encode(self, frame, frame_id=None):
+        return [(frame['type'], encode_shared('json', frame, frame_id, dumps))]
+
+    def decode(self, data):
+        return json.loads(data)
+
+
+# Deflate clients get the JSON frames as raw-deflate binary messages. Each
+# message is compressed on its own (so one encoding serves every socket)
+# against a preset dictionary of the keys and type names every frame
+# repeats; clients decompress with zlib.decompressobj(-15, zdict=...) using
+# the same bytes. Changing the dictionary means a new subprotocol version.
+DEFLATE_DICTIONARY = (
+    b'{"type": "question_skipped", "question_id": '
+    b'{"type": "timer_update", "state": "running", "state": "paused", "remaining": '
+    b'{"type": "session_ended", "message": "Session ended"}'
+    b'{"type": "waiting_on", "players": ["'
+    b'{"type": "control_ack", "command": "push_question"}'
+    b'{"type": "reveal_answer", "question_id": , "correct_option": "A", '
+    b'"correct_participants": [], "total_answers": , "correct_count": '
+    b'{"type": "question_with_leaderboard", "question": {"id": , "session": "", '
+    b'"question": {"id": , "quiz": , "text": "", "option_a": "", "option_b": "", '
+    b'"option_c": null, "option_d": null, "is_true_false": false}, '
+    b'"displayed_at": "", "duration_seconds": 60}, "start_time": "", "duration": 60, '
+    b'"leaderboard": [{"name": "", "score": 0}, {"name": "", "score": 10}, '
+    b'{"name": "", "score": 20}, {"name": "", "score": 30}]}'
+)
+DEFLATE_LEVEL = 6
+
+
+def deflate(text):
+    compressor = zlib.compressobj(DEFLATE_LEVEL, zlib.DEFLATED, -15, zdict=DEFLATE_DICTIONARY)
+    return compressor.compress(text.encode()) + compressor.flush()
+
+
+def inflate(data):
+    decompressor = zlib.decompressobj(-15, zdict=DEFLATE_DICTIONARY)
+    return (decompressor.decompress(data) + decompressor.flush()).decode()
+
+
+class DeflateCodec:
+    subprotocol = DEFLATE_SUBPROTOCOL
+
+    def encode(self, frame, frame_id=None):
+        return [(frame['type'], encode_shared('deflate', frame, frame_id, lambda f: deflate(dumps(f))))]
+
+    def decode(self, data):
+        if isinstance(data, bytes):
+            return json.loads(inflate(data))
+        return json.loads(data)
+
+
+# Binary frames are msgpack arrays: [type id, fields in a fixed order].
+# Player names are interned: the first time a connection needs a name it
+# gets a NAMES frame [0, [id, name, id, name, ...]] and from then on only
+# the id is sent. New fields are only ever appended to a layout, so older
+# clients keep reading the positions they know.
+NAMES = 0
+FRAME_IDS = {
+    'question_with_leaderboard': 1,
+    'reveal_answer': 2,
+    'waiting_on': 3,
+    'session_ended': 4,
+    'leaderboard': 5,
+    'timer_update': 6,
+    'question_skipped': 7,
+    'control_ack': 8,
+    'error': 9,
+}
+
+
+class MsgpackCodec:
+    subprotocol = MSGPACK_SUBPROTOCOL
+
+    def __init__(self, msgpack):
+        self.msgpack = msgpack
+        self.name_ids = {}
+
+    def decode(self, data):
+        # Inbound messages are the same maps as in JSON, as text or msgpack.
+        if isinstance(data, bytes):
+            return self.msgpack.unpackb(data)
+        return json.loads(data)
+
+    def encode(self, frame, frame_id=None):
+        # Interning makes the output per-connection, so frame_id is unused.
+        new_names = []
+
+        def intern(name):
+            name_id = self.name_ids.get(name)
+            if name_id is None:
+                name_id = self.name_ids[name] = len(self.name_ids)
+                new_names.extend((name_id, name))
+            return name_id
+
+        def ranking(entries):
+            flat = []
+            for entry in entries:
+                flat.append(intern(entry['name']))
+                flat.append(entry.get('score', entry.get('correct_count', 0)))
+            return flat
+
+        kind = frame['type']
+        if kind == 'question_with_leaderboard':
+            question = frame['question']
+            if isinstance(question, RawJSON):
+                question = question.decode()
+            fields = [
+                question, frame['start_time'], frame['duration'], ranking(frame['leaderboard']),
+                frame['server_time'], frame['remaining_ms'],
+            ]
+        elif kind == 'reveal_answer':
+            fields = [
+                frame['question_id'], frame['correct_option'],
+                [intern(name) for name in frame['correct_participants']],
+                frame['total_answers'], frame['correct_count'],
+            ]
+        elif kind == 'waiting_on':
+            fields = [[intern(name) for name in frame['players']]]
+        elif kind == 'session_ended':
+            fields = [frame['message']]
+        elif kind == 'leaderboard':
+            fields = [ranking(frame['leaderboard'])]
+        elif kind == 'timer_update':
+            fields = [
+                frame['question_id'], frame['state'], frame['remaining'], frame['duration'],
+                frame['server_time'], frame['remaining_ms'],
+            ]
+        elif kind == 'question_skipped':
+            fields = [frame['question_id']]
+        elif kind == 'control_ack':
+            fields = [frame['command']]
+        elif kind == 'error':
+            fields = [frame['command'], frame['error']]
+        else:
+            raise ValueError(f"No binary layout for frame type '{kind}'")
+
+        encoded = [(kind, self.msgpack.packb([FRAME_IDS[kind], *fields]))]
+        if new_names:
+            encoded.insert(0, ('names', self.msgpack.packb([NAMES, new_names])))
+        return encoded
+
+
+def negotiate(subprotocols):
+    """Pick a codec from the subprotocols offered in the handshake."""
+    for subprotocol in subprotocols:
+        if subprotocol == MSGPACK_SUBPROTOCOL and load_msgpack() is not None:
+            return MsgpackCodec(load_msgpack())
+        if subprotocol == DEFLATE_SUBPROTOCOL:
+            return DeflateCodec()
+    return JSONCodec()
@@ -0,0 +1,286 @@
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from concurrent.futures import Future
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+# ─── Session Journal ─────────────────────────────────────────
+#
+# An append-only local log of what the session actors do: pushes, accepted
+# answers, reveals, timer changes and ends. It is what lets answers be
+# acknowledged from memory and written to the database behind the request
+# (core/answers.py): an answer is accepted once its journal record is on
+# disk, and recovery at startup replays any the database never got.
+#
+# Records are appended to a buffer and written by one committer thread,
+# which fsyncs once for everything that arrived since its last fsync
+# (group commit), so a burst of answers costs a handful of fsyncs rather
+# than one each. Each line is "<crc32> <json>"; a torn or corrupt tail
+# (crash mid-write) ends the replay of that segment.
+#
+# Enabled by setting LIVE_JOURNAL_DIR (runshards gives every shard its own).
+
+SEGMENT_PREFIX = 'segment-'
+
+
+def _encode(record):
+    data = json.dumps(record, separators=(',', ':'))
+    return f'{zlib.crc32(data.encode()):08x} {data}\n'.encode()
+
+
+def _decode(line):
+    checksum, _, data = line.rstrip(b'\n').partition(b' ')
+    if len(checksum) != 8 or int(checksum, 16) != zlib.crc32(data):
+        raise ValueError("corrupt journal record")
+    return json.loads(data)
+
+
+def database_name():
+    return str(settings.DATABASES['default']['NAME'])
+
+
+class SessionState:
+    """What the journal knows about one session's live question."""
+
+    __slots__ = ('live_question', 'revealed', 'paused_remaining', 'ended')
+
+    def __init__(self):
+        self.live_question = None
+        self.revealed = True
+        self.paused_remaining = None
+        self.ended = False
+
+    def apply(self, record):
+        kind = record['kind']
+        if kind in ('push', 'snapshot'):
+            self.live_question = record.get('live_question')
+            self.revealed = record.get('revealed', False)
+            self.paused_remaining = record.get('paused_remaining')
+        elif kind in ('reveal', 'skip'):
+            if record.get('live_question') == self.live_question:
+                self.revealed = True
+                self.paused_remaining = None
+        elif kind == 'pause':
+            self.paused_remaining = record['remaining']
+        elif kind == 'resume':
+            self.paused_remaining = None
+        elif kind == 'end':
+            self.ended = True
+            self.revealed = True
+
+    def snapshot(self, session_code):
+        return {
+            'kind': 'snapshot', 'session': session_code,
+            'live_question': self.live_question, 'revealed': self.revealed,
+            'paused_remaining': self.paused_remaining,
+        }
+
+
+class Journal:
+
+    def __init__(self, directory, segment_bytes=None):
+        self.directory = directory
+        self.segment_bytes = segment_bytes or getattr(settings, 'LIVE_JOURNAL_SEGMENT_BYTES', 64 * 1024 * 1024)
+        self.sessions = {}          # session code -> SessionState
+        self.lock = threading.Lock()
+        self.ready = threading.Condition(self.lock)
+        self.buffer = []            # (segment, encoded record, Future)
+        self.segment = None         # file new records go to
+        self.size = 0
+        self.retired = []           # older segment files, deleted once drained
+        self.outstanding = {}       # segment path -> answers not yet in the database
+        self.writing = set()        # segment paths the committer is writing to
+        self.thread = None
+        self.commits = 0
+        self.records = 0
+
+    # ── segments ──
+
+    def segment_paths(self):
+        names = sorted(
+            name for name in os.listdir(self.directory) if name.startswith(SEGMENT_PREFIX)
+        )
+        return [os.path.join(self.directory, name) for name in names]
+
+    def read(self):
+        """Every intact record, oldest first, from segments of this database."""
+        for path in self.segment_paths():
+            with open(path, 'rb') as segment:
+                for number, line in enumerate(segment):
+                    try:
+                        record = _decode(line)
+                    except ValueError:
+                        logger.warning("Journal %s: stopping at corrupt record %d", path, number)
+                        break
+                    if number == 0:
+                        if record.get('kind') != 'header' or record.get('database') != database_name():
+                            logger.warning("Journal %s belongs to another database; skipped", path)
+                            break
+                        continue
+                    yield record
+
+    def _open_segment(self):
+        # Called with the lock held. The new segment starts with a snapshot of
+        # every open session, so older segments are only needed for answers
+        # that haven't reached the database yet.
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f'{SEGMENT_PREFIX}{time.time_ns():020d}.log')
+        segment = open(path, 'ab')
+        self.sessions = {code: state for code, state in self.sessions.items() if not state.ended}
+        records = [{'kind': 'header', 'database': database_name()}]
+        records += [state.snapshot(code) for code, state in self.sessions.items()]
+        segment.write(b''.join(_encode(record) for record in records))
+        segment.flush()
+        os.fsync(segment.fileno())
+        if self.segment is not None:
+            self.retired.append(self.segment)
+        self.segment = segment
+        self.size = segment.tell()
+
+    def _drop_drained(self):
+        # Called with the lock held.
+        for segment in list(self.retired):
+            busy = (
+                self.outstanding.get(segment.name)
+                or segment.name in self.writing
+                or any(pending is segment for pending, _, _ in self.buffer)
+            )
+            if not busy:
+                self.retired.remove(segment)
+                self.outstanding.pop(segment.name, None)
+                segment.close()
+                os.remove(segment.name)
+
+    def start_fresh(self):
+        """Open a new segment and delete every existing one (after recovery)."""
+        with self.lock:
+            stale = self.segment_paths() if os.path.isdir(self.directory) else []
+            self._open_segment()
+            self.retired = []
+        for path in stale:
+            os.remove(path)
+
+    # ── appending ──
+
+    def append(self, record):
+        """
+        Queue a record; the returned Future resolves once it is fsynced. An
+        answer's Future carries ``segment``, to pass to ``release`` once the
+        answer is in the database.
+        """
+        future = Future()
+        with self.lock:
+            if self.segment is None or self.size >= self.segment_bytes:
+                self._open_segment()
+            session = record.get('session')
+            if record['kind'] == 'answer':
+                future.segment = self.segment.name
+                self.outstanding[self.segment.name] = self.outstanding.get(self.segment.name, 0) + 1
+            elif session is not None:
+                self.sessions.setdefault(session, SessionState()).apply(record)
+            data = _encode(record)
+            self.size += len(data)
+            self.buffer.append((self.segment, data, future))
+            self.ready.notify()
+        self._ensure_thread()
+        return future
+
+    def release(self, segments):
+        """Mark answers as written to the database: {segment path: count}."""
+        with self.lock:
+            for path, count in segments.items():
+                if path in self.outstanding:
+                    self.outstanding[path] -= count
+            self._drop_drained()
+
+    def state(self, session_code):
+        with self.lock:
+            return self.sessions.get(session_code)
+
+    def _ensure_thread(self):
+        if self.thread is None or not self.thread.is_alive():
+            with self.lock:
+                if self.thread is None or not self.thread.is_alive():
+                    self.thread = threading.Thread(target=self._run, name='session-journal', daemon=True)
+                    self.thread.start()
+
+    def _run(self):
+        while True:
+            with self.lock:
+                while not self.buffer:
+                    self.ready.wait()
+                batch, self.buffer = self.buffer, []
+                segments = []
+                for segment, _, _ in batch:
+                    if segment not in segments:
+                        segments.append(segment)
+                self.writing = {segment.name for segment in segments}
+            try:
+                for segment in segments:
+                    segment.write(b''.join(data for target, data, _ in batch if target is segment))
+                    segment.flush()
+                    os.fsync(segment.fileno())
+            except Exception as exc:
+                logger.exception("Journal commit of %d records failed", len(batch))
+                for _, _, future in batch:
+                    future.set_exception(exc)
+            else:
+                for _, _, future in batch:
+                    future.set_result(None)
+            with self.lock:
+                self.writing = set()
+                self.commits += 1
+                self.records += len(batch)
+                self._drop_drained()
+
+
+_journal = None
+_journal_lock = threading.Lock()
+
+
+def get_journal():
+    """The process's journal, or None when LIVE_JOURNAL_DIR isn't set."""
+    global _journal
+    directory = getattr(settings, 'LIVE_JOURNAL_DIR', None)
+    if not directory:
+        return None
+    if _journal is None:
+        with _journal_lock:
+            if _journal is None:
+                _journal = Journal(str(directory))
+    return _journal
+
+
+# ─── Recovery ────────────────────────────────────────────────
+
+def recover():
+    """
+    Replay the journal after a restart: write journaled answers the database
+    is missing (adding their points), rebuild each session's live-question
+    state for the actors to pick up, then start a fresh segment.
+    Returns (answers replayed, sessions recovered).
+    """
+    from .answers import replay
+
+    journal = get_journal()
+    if journal is None or not os.path.isdir(journal.directory):
+        return 0, 0
+    answers = []
+    sessions = {}
+    for record in journal.read():
+        if record['kind'] == 'answer':
+            answers.append(record)
+        elif record.get('session') is not None:
+            sessions.setdefault(record['session'], SessionState()).apply(record)
+    replayed = replay(answers)
+    with journal.lock:
+        journal.sessions = sessions
+    journal.start_fresh()
+    return replayed, sum(1 for state in sessions.values() if not state.ended)
@@ -0,0 +1,830 @@
+import asyncio
+import concurrent.futures
+import contextvars
+import functools
+import logging
+import math
+import threading
+
+from asgiref.sync import AsyncToSync, SyncToAsync, async_to_sync
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+from rest_framework.exceptions import APIException, NotFound, ValidationError
+
+from . import frames, payloads, playlist, results_cache
+from .deadlines import Deadline, server_time_ms
+from .answers import writer as answer_writer
+from .journal import get_journal
+from .models import LiveSession, Participant, LiveQuestion, ParticipantAnswer
+from .registry import ParticipantRegistry
+
+logger = logging.getLogger(__name__)
+
+POINTS_PER_CORRECT_ANSWER = 10
+
+HOST_COMMANDS = {
+    'push', 'reveal', 'extend', 'pause', 'resume', 'skip', 'end', 'playlist', 'stop_playlist',
+}
+
+# What an actor hands its successor when it moves to another loop.
+HANDOFF_STATE = (
+    'session_id', 'quiz_id', 'host_id', 'is_active', 'live_question', 'correct_option', 'revealed',
+    'participants', 'unconfirmed', 'deadline', 'playlist', '_leaderboard',
+)
+
+
+# ─── Session Actor ───────────────────────────────────────────
+#
+# Every live session gets exactly one actor: an asyncio task reading from a
+# mailbox. The actor is the only thing that mutates the session's live state
+# (current question, reveal timer, answers, scores), so messages are applied
+# one at a time, in arrival order, without locks. Ending the session retires
+# the actor; anything sent to the session afterwards reloads it.
+
+class ActorStopped(APIException):
+    status_code = 503
+    default_detail = "The session is restarting; try again."
+
+
+def _positive_seconds(value, name):
+    # Checked here rather than in the views so the host's socket gets the
+    # same 400 as HTTP.
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        value = 0
+    if value <= 0:
+        raise ValidationError(f"{name} must be a positive number of seconds.")
+    return value
+
+
+class SessionActor:
+
+    def __init__(self, session_code, loop, predecessor=None):
+        self.session_code = session_code
+        self.group_name = f'session_{session_code}'
+        self.loop = loop
+        self.mailbox = asyncio.Queue()
+        self.loaded = False
+        self.retired = False        # stops taking messages after the current one
+        self.predecessor = predecessor  # actor on another loop whose state this one takes over
+        self.successor = None       # set once this actor has handed its state over
+
+        self.session_id = None
+        self.quiz_id = None
+        self.host_id = None
+        self.is_active = False
+
+        self.live_question = None   # LiveQuestion currently on screen
+        self.correct_option = None  # live_question's answer key
+        self.revealed = True        # has live_question's answer been revealed?
+        self.participants = ParticipantRegistry()   # names, scores, answered bitsets
+        self.unconfirmed = {}       # (participant, question) -> answer awaiting its journal fsync
+        self.timer = None
+        self.deadline = Deadline()  # live_question's timer; closed once revealed
+        self.playlist = None        # playlist.Playlist driving pushes, if any
+        self._leaderboard = None    # leaderboard(), until a score or name changes
+
+        # Run in an empty context so the actor never inherits the
+        # thread-sensitive executor of whichever request happened to start it.
+        self.task = loop.create_task(self._run(), context=contextvars.Context())
+
+    def alive(self):
+        return not self.retired and not self.task.done() and self.loop.is_running()
+
+    def stop(self):
+        # May be called from another thread (sharding handoff, purge).
+        def cancel():
+            self.retired = True
+            self._cancel_timer()
+            self.task.cancel()
+
+        if not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(cancel)
+
+    # ── mailbox ──
+
+    async def ask(self, msg_type, **payload):
+        """Send a message and wait for the handler's result."""
+        if self.successor is not None:
+            return await self.successor.ask(msg_type, **payload)
+        if asyncio.get_running_loop() is not self.loop:
+            return await asyncio.wrap_future(
+                asyncio.run_coroutine_threadsafe(self.ask(msg_type, **payload), self.loop)
+            )
+        if self.retired:
+            raise ActorStopped()
+        future = self.loop.create_future()
+        self.mailbox.put_nowait((msg_type, payload, contextvars.copy_context(), future))
+        return await future
+
+    def tell(self, msg_type, **payload):
+        """Send a message without waiting for it to be handled; safe from any thread."""
+        if self.successor is not None:
+            return self.successor.tell(msg_type, **payload)
+        message = (msg_type, payload, None, None)
+        try:
+            here = asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            here = False
+        if here:
+            self._post(message)
+        elif not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self._post, message)
+
+    def _post(self, message):
+        # Timers and journal confirmations still hold this actor after a
+        # handoff; what they send goes on to the successor.
+        if self.successor is not None:
+            msg_type, payload, *_ = message
+            self.successor.tell(msg_type, **payload)
+        else:
+            self.mailbox.put_nowait(message)
+
+    async def _run(self):
+        future = None
+        try:
+            while not self.retired:
+                msg_type, payload, context, future = await self.mailbox.get()
+                handled = self._handle(msg_type, payload, future)
+                # Handlers run in the sender's context so their DB calls land on
+                # the same connection the sender is using.
+                if context is not None:
+                    await self.loop.create_task(handled, context=context)
+                else:
+                    await handled
+        finally:
+            # Whoever is still waiting retries on the actor that replaces this one.
+            self.retired = True
+            if future is not None and not future.done():
+                future.set_exception(ActorStopped())
+            while not self.mailbox.empty():
+                msg_type, payload, _, waiting = self.mailbox.get_nowait()
+                if waiting is None:
+                    if self.successor is not None:
+                        self.successor.tell(msg_type, **payload)
+                elif not waiting.done():
+                    waiting.set_exception(ActorStopped())
+
+    async def _handle(self, msg_type, payload, future):
+        # Errors stop here, so the traceback a sender gets back never holds
+        # _run's suspended frame (clearing it would close the actor).
+        try:
+            result = await self._dispatch(msg_type, payload)
+        except Exception as exc:
+            if future is None:
+                logger.exception("Session %s: %s failed", self.session_code, msg_type)
+            elif not future.done():
+                future.set_exception(exc)
+        else:
+            if future is not None and not future.done():
+                future.set_result(result)
+
+    async def _dispatch(self, msg_type, payload):
+        if not self.loaded and msg_type != 'handoff':
+            await self._load()
+        return await getattr(self, f'on_{msg_type}')(**payload)
+
+    async def _load(self):
+        predecessor, self.predecessor = self.predecessor, None
+        if predecessor is not None:
+            try:
+                state = await predecessor.ask('handoff', successor=self)
+            except ActorStopped:
+                state = None
+            if state is not None:
+                self._adopt(state)
+                self.loaded = True
+                return
+        session, participants, live_q, answers, pending = await database_sync_to_async(self._fetch_state)()
+        self.session_id = session.id
+        self.quiz_id = session.quiz_id
+        self.host_id = session.host_id
+        self.is_active = session.is_active
+        for pid, name, score, correct_count in participants:
+            self.participants.add(pid, name, score, correct_count)
+        if live_q is not None:
+            for pid, is_correct in answers:
+                self.participants.mark_answered(pid, live_q.question_id, is_correct)
+        # Answers accepted but not yet written by the answer writer.
+        for pid, question_id, is_correct, points in pending:
+            self.participants.record_answer(pid, question_id, is_correct, points)
+        if live_q is not None:
+            self.live_question = live_q
+            self.correct_option = live_q.question.correct_option
+            self._restore_timer()
+        self.loaded = True
+
+    def _adopt(self, state):
+        """Take over a predecessor's state and restart its timer on this loop."""
+        advance_in = state.pop('advance_in')
+        for name, value in state.items():
+            setattr(self, name, value)
+        if not self.revealed and not self.deadline.paused:
+            self._schedule_reveal()
+        elif advance_in is not None:
+            self.timer = self.loop.call_later(
+                max(advance_in, 0), functools.partial(self.tell, 'advance', playlist=self.playlist)
+            )
+
+    def _restore_timer(self):
+        live_q = self.live_question
+        self.deadline.restore(live_q.expires_at)
+        if not self.is_active or live_q.closed_at is not None:
+            # Ended, or revealed/skipped before its deadline.
+            self.deadline.close()
+            return
+        journal = get_journal()
+        state = journal.state(self.session_code) if journal is not None else None
+        if state is None or state.live_question != live_q.id:
+            # No journal: all we know is what the actor saved to the database.
+            if live_q.paused_remaining is not None:
+                self.revealed = False
+                self.deadline.start_paused(live_q.paused_remaining)
+            elif self.deadline.remaining_ns() > 0:
+                self.revealed = False
+                self._schedule_reveal()
+            else:
+                self.deadline.close()
+            return
+        if state.revealed:
+            self.deadline.close()
+            return
+        self.revealed = False
+        if state.paused_remaining is not None:
+            self.deadline.start_paused(state.paused_remaining)
+        else:
+            # A reveal that came due while the worker was down goes out now.
+            self._schedule_reveal()
+
+    def _fetch_state(self):
+        session = LiveSession.objects.get(session_code=self.session_code)
+        if session.is_active:
+            payloads.for_quiz(session.quiz_id)
+        # Under the writer's lock every answer is either pending or in the
+        # table, never both or neither.
+        with answer_writer.lock:
+            participants = list(session.participants.annotate(
+                correct_count=Count('participantanswer', filter=Q(participantanswer__is_correct=True))
+            ).values_list('id', 'name', 'score', 'correct_count'))
+            live_q = (
+                LiveQuestion.objects.filter(session=session)
+                .select_related('question')
+                .order_by('-displayed_at', '-id')
+                .first()
+            )
+            answers = []
+            if live_q is not None:
+                answers = list(
+                    ParticipantAnswer.objects
+                    .filter(participant__session=session, question_id=live_q.question_id)
+                    .values_list('participant_id', 'is_correct')
+                )
+            pending = answer_writer.pending_for(session.id)
+        return session, participants, live_q, answers, pending
+
+    # ── helpers ──
+
+    def _journal(self, kind, **fields):
+        """Record a state change; returns the durability Future, or None."""
+        journal = get_journal()
+        if journal is None:
+            return None
+        return journal.append({'kind': kind, 'session': self.session_code, **fields})
+
+    def _schedule_reveal(self):
+        # Reveal once the grace window has passed too, so no answer the
+        # deadline still accepts arrives after the answer key is out.
+        self._cancel_timer()
+        self.timer = self.loop.call_later(
+            self.deadline.reveal_delay(), functools.partial(self.tell, 'reveal', live_question_id=self.live_question.id)
+        )
+
+    def _cancel_timer(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+    def leaderboard(self):
+        if self._leaderboard is None:
+            self._leaderboard = self.participants.leaderboard()
+        return self._leaderboard
+
+    async def group_send(self, event):
+        event['frame_id'] = frames.new_frame_id()
+        await get_channel_layer().group_send(self.group_name, event)
+
+    # ── handlers ──
+
+    async def on_connect(self):
+        """A socket joined: nothing to do beyond loading, which restores the reveal timer."""
+
+    async def on_handoff(self, successor):
+        """Retire in favour of an actor on another loop, returning the state it takes over."""
+        self.retired = True
+        self.successor = successor
+        if not self.loaded:
+            self._cancel_timer()
+            return None
+        state = {name: getattr(self, name) for name in HANDOFF_STATE}
+        # Between questions the timer is the playlist's pending advance.
+        advancing = self.revealed and self.playlist is not None and self.timer is not None
+        state['advance_in'] = self.timer.when() - self.loop.time() if advancing else None
+        self._cancel_timer()
+        return state
+
+    async def on_join(self, name):
+        if not self.is_active:
+            raise ValidationError("This quiz session has ended.")
+        participant = await database_sync_to_async(Participant.objects.create)(
+            session_id=self.session_id, name=name
+        )
+        self.participants.add(participant.id, participant.name, participant.score)
+        self._leaderboard = None
+        results_cache.bump(self.session_code)
+        return participant
+
+    async def on_control(self, user_id, command, **payload):
+        """Run a host command. Only the session's host may drive it."""
+        if user_id is None or user_id != self.host_id:
+            raise NotFound("Session not found or unauthorized.")
+        if command not in HOST_COMMANDS:
+            raise ValidationError(f"Unknown command '{command}'.")
+        return await getattr(self, f'on_{command}')(**payload)
+
+    async def on_push(self, question_id, duration=60):
+        if not self.is_active:
+            raise ValidationError("This quiz session has ended.")
+        try:
+            question_id = int(question_id)
+        except (TypeError, ValueError):
+            raise NotFound("Question not found in quiz.")
+        duration = _positive_seconds(duration, 'duration')
+        payload = await database_sync_to_async(payloads.get)(self.quiz_id, question_id)
+        if payload is None:
+            raise NotFound("Question not found in quiz.")
+        # The host has taken over from the playlist.
+        self.playlist = None
+        return await self._push(question_id, duration, payload)
+
+    async def _push(self, question_id, duration, payload):
+        if not self.revealed:
+            await self.on_reveal()
+
+        live_q = await database_sync_to_async(LiveQuestion.objects.create)(
+            session_id=self.session_id, question_id=question_id, duration_seconds=duration
+        )
+        self.live_question = live_q
+        self.correct_option = payload.correct_option
+        self.revealed = False
+        self.deadline.restore(live_q.expires_at)
+        self._journal('push', live_question=live_q.id)
+
+        await self.group_send({
+            'type': 'send_question_with_leaderboard',
+            'question': payloads.live_question(live_q, self.session_code, payload.player),
+            'start_time': live_q.displayed_at.isoformat(),
+            'duration': live_q.duration_seconds,
+            'server_time': server_time_ms(),
+            'remaining_ms': self.deadline.remaining_ms(),
+            'leaderboard': self.leaderboard(),
+        })
+        self._schedule_reveal()
+        return payloads.live_question(live_q, self.session_code, payload.host)
+
+    async def on_answer(self, participant_id, question_id, selected_option):
+        if not self.is_active:
+            raise ValidationError("This quiz session has ended. No more answers allowed.")
+
+        live_q = self.live_question
+        if live_q is None or live_q.question_id != question_id:
+            raise ValidationError("This question is not currently active.")
+        if not self.deadline.accepts():
+            if self.deadline.paused:
+                raise ValidationError("This question is paused.")
+            raise ValidationError("Time's up! You can no longer answer this question.")
+        if participant_id not in self.participants:
+            await self._load_participant(participant_id)
+        key = (participant_id, question_id)
+        if key in self.unconfirmed or self.participants.has_answered(participant_id, question_id):
+            raise ValidationError("You have already answered this question.")
+
+        is_correct = selected_option.upper() == self.correct_option.upper()
+        points = POINTS_PER_CORRECT_ANSWER if is_correct else 0
+        answered_ms = server_time_ms()
+        if get_journal() is None:
+            answer = await database_sync_to_async(self._save_answer)(
+                participant_id, question_id, selected_option, is_correct
+            )
+            self._record_answer(participant_id, question_id, is_correct, points, answered_ms)
+            return answer, None
+
+        # Journaled: the answer counts once its record is fsynced. Until then
+        # it only blocks a second answer, and the mailbox stays free, so
+        # answers to one question share fsyncs.
+        answer = ParticipantAnswer(
+            participant_id=participant_id, question_id=question_id,
+            selected_option=selected_option, is_correct=is_correct,
+            answered_at=timezone.now(),
+        )
+        durable = self._journal(
+            'answer', participant=participant_id, question=question_id,
+            option=selected_option, correct=is_correct, points=points, at=answer.answered_at.isoformat(),
+        )
+        confirmed = concurrent.futures.Future()
+        self.unconfirmed[key] = (durable, is_correct, points, answered_ms)
+        durable.add_done_callback(functools.partial(self._durable, answer, points, key, confirmed))
+        return answer, confirmed
+
+    def _durable(self, answer, points, key, confirmed, durable):
+        # On the journal's committer thread, once the record is on disk (or
+        # failed to get there): queue it for the table, have the actor count
+        # it, then let the caller acknowledge it.
+        error = durable.exception()
+        if error is None:
+            answer_writer.submit(answer, self.session_id, points, durable.segment)
+        self.tell('confirm', key=key)
+        if error is None:
+            confirmed.set_result(answer)
+        else:
+            confirmed.set_exception(error)
+
+    async def on_confirm(self, key):
+        entry = self.unconfirmed.pop(key, None)
+        if entry is None:
+            return      # already counted by a reveal
+        durable, is_correct, points, answered_ms = entry
+        if durable.exception() is None:
+            self._record_answer(*key, is_correct, points, answered_ms)
+
+    async def _confirm_pending(self):
+        """Wait out fsyncs still in flight, so a tally counts every accepted answer."""
+        if self.unconfirmed:
+            await asyncio.wait([asyncio.wrap_future(entry[0]) for entry in self.unconfirmed.values()])
+            for key in list(self.unconfirmed):
+                await self.on_confirm(key)
+
+    def _record_answer(self, participant_id, question_id, is_correct, points, answered_ms):
+        self.participants.record_answer(participant_id, question_id, is_correct, points, answered_ms)
+        if is_correct:
+            self._leaderboard = None
+        results_cache.bump(self.session_code)
+
+    async def _load_participant(self, participant_id):
+        # Joined through something other than this actor (another worker
+        # without sharding, or straight into the database).
+        row = await database_sync_to_async(
+            Participant.objects.filter(id=participant_id, session_id=self.session_id)
+            .values_list('name', 'score').first
+        )()
+        if row is None:
+            raise ValidationError("You are not in this session.")
+        self.participants.add(participant_id, *row)
+        self._leaderboard = None
+
+    def _save_answer(self, participant_id, question_id, selected_option, is_correct):
+        with transaction.atomic():
+            answer = ParticipantAnswer.objects.create(
+                participant_id=participant_id,
+                question_id=question_id,
+                selected_option=selected_option,
+                is_correct=is_correct,
+            )
+            if is_correct:
+                Participant.objects.filter(id=participant_id).update(
+                    score=F('score') + POINTS_PER_CORRECT_ANSWER
+                )
+        return answer
+
+    async def on_reveal(self, live_question_id=None, question_id=None):
+        live_q = self.live_question
+        if live_q is None or self.revealed:
+            return
+        # Stale timers and reveals for an earlier question are no-ops.
+        if live_question_id is not None and live_question_id != live_q.id:
+            return
+        if question_id is not None and question_id != live_q.question_id:
+            return
+
+        early = self.deadline.paused or self.deadline.remaining_ns() > 0
+        self.revealed = True
+        self.deadline.close()
+        self._cancel_timer()
+        await self._confirm_pending()
+        self._journal('reveal', live_question=live_q.id)
+        if early:
+            await self._save_closed()
+        results_cache.bump(self.session_code)
+
+        total_answers, correct_participants = self.participants.tally(live_q.question_id)
+        await self.group_send({
+            'type': 'reveal_answer',
+            'question_id': live_q.question_id,
+            'correct_option': self.correct_option,
+            'correct_participants': correct_participants,
+            'total_answers': total_answers,
+            'correct_count': len(correct_participants),
+        })
+        await self.group_send({
+            'type': 'send_waiting_on',
+            'players': self.participants.names(),
+        })
+        self._queue_next()
+
+    async def on_extend(self, seconds=10):
+        seconds = _positive_seconds(seconds, 'seconds')
+        self._require_open_question()
+        self.deadline.extend(seconds)
+        if self.deadline.paused:
+            self._journal('pause', remaining=self.deadline.remaining_seconds())
+        else:
+            self._schedule_reveal()
+        await self._save_deadline()
+        await self._send_timer_update()
+
+    async def on_pause(self):
+        self._require_open_question()
+        if not self.deadline.paused:
+            self.deadline.pause()
+            self._cancel_timer()
+            self._journal('pause', remaining=self.deadline.remaining_seconds())
+            await self._save_deadline()
+            await self._send_timer_update()
+
+    async def on_resume(self):
+        self._require_open_question()
+        if self.deadline.paused:
+            self.deadline.resume()
+            self._journal('resume')
+            self._schedule_reveal()
+            await self._save_deadline()
+            await self._send_timer_update()
+
+    async def on_skip(self):
+        """Close the current question without revealing its answer."""
+        self._require_open_question()
+        early = self.deadline.paused or self.deadline.remaining_ns() > 0
+        self.revealed = True
+        self.deadline.close()
+        self._cancel_timer()
+        self._journal('skip', live_question=self.live_question.id)
+        if early:
+            await self._save_closed()
+        await self.group_send({
+            'type': 'question_skipped',
+            'question_id': self.live_question.question_id,
+        })
+        self._queue_next()
+
+    async def on_end(self, message=None):
+        if self.is_active:
+            await database_sync_to_async(
+                LiveSession.objects.filter(id=self.session_id).update
+            )(is_active=False, ended_at=timezone.now())
+            self.is_active = False
+        self._cancel_timer()
+        self.playlist = None
+        self.revealed = True
+        self.deadline.close()
+        self._journal('end')
+        results_cache.bump(self.session_code)
+        await self.group_send({
+            'type': 'session_ended',
+            'message': message or f"Session {self.session_code} has ended.",
+        })
+        # Nothing is left to time; a later message reloads the ended session.
+        self.retired = True
+        _forget(self)
+
+    # ── playlists (see core/playlist.py) ──
+
+    async def on_playlist(self, items, duration=60, reveal_seconds=None, end_when_done=False):
+        """Start driving the session from a playlist; its first question goes out now."""
+        if not self.is_active:
+            raise ValidationError("This quiz session has ended.")
+        pending = playlist.parse(items, duration, reveal_seconds, end_when_done)
+        pending.attach(await database_sync_to_async(payloads.for_quiz)(self.quiz_id))
+        self.playlist = pending
+        await self.on_advance(pending)
+        return pending.progress()
+
+    async def on_stop_playlist(self):
+        stopped = self.playlist
+        self.playlist = None
+        if stopped is not None and self.revealed:
+            # Between questions the only timer is the pending advance.
+            self._cancel_timer()
+        return stopped.progress() if stopped is not None else None
+
+    async def on_advance(self, playlist):
+        if playlist is not self.playlist:
+            return      # stopped or replaced since this advance was queued
+        item = playlist.advance()
+        if item is None:
+            self.playlist = None
+            if playlist.end_when_done:
+                await self.on_end()
+            return
+        try:
+            await self._push(item.question_id, item.duration, item.payload)
+        except Exception:
+            self.playlist = None
+            raise
+
+    def _queue_next(self):
+        """Once a question closes, schedule the playlist's next push."""
+        if self.playlist is None:
+            return
+        self.leaderboard()      # prefetched while the reveal is on screen
+        self._cancel_timer()
+        self.timer = self.loop.call_later(
+            self.playlist.current.reveal_seconds, functools.partial(self.tell, 'advance', playlist=self.playlist)
+        )
+
+    def _require_open_question(self):
+        if self.live_question is None or self.revealed:
+            raise ValidationError("No question is currently open.")
+
+    async def _save_deadline(self):
+        # Keep duration_seconds (and the time left, while paused) in step
+        # with the deadline so a restarted actor picks the same timer back
+        # up from the DB. Rounded to the millisecond first so clock jitter
+        # doesn't add a second.
+        live_q = self.live_question
+        elapsed = (self.deadline.expires_at() - live_q.displayed_at).total_seconds()
+        live_q.duration_seconds = math.ceil(round(elapsed, 3))
+        live_q.paused_remaining = self.deadline.remaining_seconds() if self.deadline.paused else None
+        await database_sync_to_async(
+            LiveQuestion.objects.filter(id=live_q.id).update
+        )(duration_seconds=live_q.duration_seconds, paused_remaining=live_q.paused_remaining)
+
+    async def _save_closed(self):
+        """Record a question closed before its deadline, so a reload doesn't reopen it."""
+        live_q = self.live_question
+        live_q.closed_at = timezone.now()
+        live_q.paused_remaining = None
+        await database_sync_to_async(
+            LiveQuestion.objects.filter(id=live_q.id).update
+        )(closed_at=live_q.closed_at, paused_remaining=None)
+
+    async def _send_timer_update(self):
+        paused = self.deadline.paused
+        await self.group_send({
+            'type': 'send_timer_update',
+            'question_id': self.live_question.question_id,
+            'state': 'paused' if paused else 'running',
+            'remaining': round(self.deadline.remaining_seconds(), 1),
+            'remaining_ms': self.deadline.remaining_ms(),
+            'server_time': server_time_ms(),
+            'duration': self.live_question.duration_seconds,
+        })
+
+
+# ─── Actor Registry ──────────────────────────────────────────
+#
+# An actor lives on one event loop until its session ends, and its reveal
+# and playlist timers are call_later handles on that loop. Consumers, and
+# sync views under an ASGI server (which asgiref runs on the server's loop),
+# reach actors on the server's loop. Sync code with no loop of its own (WSGI
+# views, the test client, the admin, management commands) must not start
+# one under async_to_sync, whose loop closes when the call returns and takes
+# the timers with it; those callers use one background loop thread instead.
+# The first socket to reach an actor there moves it to the socket's loop,
+# because the in-memory channel layer only delivers broadcasts safely on
+# the loop its receivers wait on. The move is a handoff: the new actor
+# takes over the old one's state (playlist, pause, unconfirmed answers)
+# rather than reloading it from the database.
+
+_actors = {}
+_actors_lock = threading.Lock()
+_background = None
+
+
+def background_loop():
+    """The loop sync callers run actors on, started on first use."""
+    global _background
+    with _actors_lock:
+        if _background is None:
+            _background = asyncio.new_event_loop()
+            threading.Thread(target=_background.run_forever, name='session-actors', daemon=True).start()
+        return _background
+
+
+def get_actor(session_code):
+    """Return the actor for a session, starting one on the running loop if needed."""
+    loop = asyncio.get_running_loop()
+    with _actors_lock:
+        actor = _actors.get(session_code)
+        if actor is not None and actor.alive() and (actor.loop is loop or actor.loop is not _background):
+            return actor
+        if actor is not None and actor.alive():
+            actor = SessionActor(session_code, loop, predecessor=actor)
+        else:
+            if actor is not None:
+                actor.stop()
+            actor = SessionActor(session_code, loop)
+        _actors[session_code] = actor
+        return actor
+
+
+def _forget(actor):
+    with _actors_lock:
+        if _actors.get(actor.session_code) is actor:
+            del _actors[actor.session_code]
+
+
+def discard_actor(session_code):
+    with _actors_lock:
+        actor = _actors.pop(session_code, None)
+    if actor is not None:
+        actor.stop()
+
+
+def discard_actors(predicate):
+    """Drop every actor whose session code matches; they reload on next use."""
+    for session_code in [code for code in list(_actors) if predicate(code)]:
+        discard_actor(session_code)
+
+
+def tell(session_code, msg_type, **payload):
+    get_actor(session_code).tell(msg_type, **payload)
+
+
+async def ask(session_code, msg_type, **payload):
+    try:
+        try:
+            return await get_actor(session_code).ask(msg_type, **payload)
+        except ActorStopped:
+            # Ended or handed over mid-message; the next actor reloads.
+            return await get_actor(session_code).ask(msg_type, **payload)
+    except LiveSession.DoesNotExist:
+        discard_actor(session_code)
+        raise NotFound("Session not found or unauthorized.")
+
+
+async def _from_sync(func, session_code, *args, **kwargs):
+    # Runs under async_to_sync, on a loop that may close when the call
+    # returns, so the actor is looked up on (or started on) a loop that won't.
+    actor = _actors.get(session_code)
+    loop = actor.loop if actor is not None and actor.alive() else background_loop()
+    if loop is asyncio.get_running_loop():
+        return await func(session_code, *args, **kwargs)
+    # asgiref doesn't carry the caller's thread over to another loop; hand
+    # it across so the handler's DB calls still run on the caller's
+    # connection (and inside its transaction).
+    caller = getattr(AsyncToSync.executors, 'current', None)
+
+    async def there():
+        AsyncToSync.executors.current = caller
+        return await func(session_code, *args, **kwargs)
+
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(there(), loop))
+
+
+def _call_sync(func, session_code, *args, **kwargs):
+    # The handler's DB calls ran on this thread, which leaves asgiref
+    # sending this thread's later async_to_sync calls to the actor's loop.
+    local = SyncToAsync.threadlocal
+    saved = {name: getattr(local, name, None) for name in ('main_event_loop', 'main_event_loop_pid', 'task_context')}
+    try:
+        return async_to_sync(_from_sync)(func, session_code, *args, **kwargs)
+    finally:
+        for name, value in saved.items():
+            setattr(local, name, value)
+
+
+def ask_sync(session_code, msg_type, **payload):
+    """Entry point for sync views: hand the message to the actor and wait."""
+    return _call_sync(ask, session_code, msg_type, **payload)
+
+
+async def answer(session_code, participant_id, question_id, selected_option):
+    """Submit an answer; returns once it is durable (in the table or the journal)."""
+    answer, confirmed = await ask(
+        session_code, 'answer', participant_id=participant_id,
+        question_id=question_id, selected_option=selected_option,
+    )
+    if confirmed is not None:
+        await asyncio.wrap_future(confirmed)
+    return answer
+
+
+def answer_sync(session_code, participant_id, question_id, selected_option):
+    return _call_sync(answer, session_code, participant_id, question_id, selected_option)
+
+
+# ─── Host Control ────────────────────────────────────────────
+#
+# The HTTP endpoints and the host's WebSocket share these entry points, so
+# both paths run the same checks and cost the same.
+
+async def control(session_code, user, command, **payload):
+    user_id = user.id if user.is_authenticated else None
+    return await ask(session_code, 'control', user_id=user_id, command=command, **payload)
+
+
+def control_sync(session_code, user, command, **payload):
+    return _call_sync(control, session_code, user, command, **payload)
@@ -0,0 +1,82 @@
+import json
+import random
+import time
+import zlib
+
+from django.core.management.base import BaseCommand
+
+from core import frames
+
+
+class Command(BaseCommand):
+    help = "Compare bytes on the wire and encode cost of the WebSocket frame codecs."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--players', type=int, default=2000, help="Room size (leaderboard length).")
+        parser.add_argument('--recipients', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        frame = self.question_frame(options['players'])
+        recipients = options['recipients']
+        per_1k = 1000 / recipients
+
+        def per_socket(encode):
+            return lambda: [encode() for _ in range(recipients)]
+
+        def shared(codec_class):
+            def run():
+                frame_id = frames.new_frame_id()
+                return [codec_class().encode(frame, frame_id)[-1][1] for _ in range(recipients)]
+            return run
+
+        def msgpack_steady():
+            # Names already interned, as for every push after the first.
+            codec = frames.MsgpackCodec(frames.load_msgpack())
+            codec.encode(frame)
+            return [codec.encode(frame)[-1][1] for _ in range(recipients)]
+
+        cases = [
+            ('json, per socket', per_socket(lambda: json.dumps(frame))),
+            ('json, once per group', shared(frames.JSONCodec)),
+            ('permessage-deflate style, per socket', per_socket(lambda: zlib.compress(json.dumps(frame).encode(), 6))),
+            ('deflate+dictionary, per socket', per_socket(lambda: frames.deflate(json.dumps(frame)))),
+            ('deflate+dictionary, once per group', shared(frames.DeflateCodec)),
+        ]
+        if frames.load_msgpack() is not None:
+            cases.append(('msgpack, interned names', msgpack_steady))
+
+        self.stdout.write(
+            f"question_with_leaderboard, {options['players']} players, per 1k recipients\n"
+            f"{'codec':<40}{'bytes/frame':>12}{'KB on wire':>12}{'encode ms':>11}"
+        )
+        for label, run in cases:
+            start = time.perf_counter()
+            encoded = run()
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            size = len(encoded[0])
+            self.stdout.write(
+                f"{label:<40}{size:>12}{size * len(encoded) * per_1k / 1024:>12.0f}{elapsed_ms * per_1k:>11.1f}"
+            )
+
+    def question_frame(self, players):
+        rng = random.Random(0)
+        return {
+            'type': 'question_with_leaderboard',
+            'question': {
+                'id': 42, 'session': 'ABC123',
+                'question': {
+                    'id': 7, 'quiz': 3, 'text': 'Which planet has the most moons?',
+                    'option_a': 'Jupiter', 'option_b': 'Saturn', 'option_c': 'Uranus',
+                    'option_d': 'Neptune', 'is_true_false': False,
+                },
+                'displayed_at': '2026-01-01T12:00:00.000000Z', 'duration_seconds': 60,
+            },
+            'start_time': '2026-01-01T12:00:00.000000+00:00',
+            'duration': 60,
+            'server_time': 1767268800000,
+            'remaining_ms': 60000,
+            'leaderboard': sorted(
+                ({'name': f'player{i:05d}', 'score': rng.randrange(0, 200, 10)} for i in range(players)),
+                key=lambda entry: entry['score'], reverse=True,
+            ),
+        }
@@ -0,0 +1,80 @@
+import logging
+import os
+import time
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.management.base import BaseCommand
+from django.db import connection
+from rest_framework.test import APIRequestFactory
+
+from core import eventlog, live
+from core.eventlog import BackgroundHandler
+from core.models import User, Quiz, Question, LiveSession, Participant
+from core.views import ParticipantAnswerCreateView
+
+
+class Command(BaseCommand):
+    help = "Measure answer throughput with core logging off, sampled and unsampled."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--answers', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        # Runs against a throwaway test database, never the real one.
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        devnull = open(os.devnull, 'w')
+        for handler in logging.getLogger('core').handlers:
+            if isinstance(handler, BackgroundHandler):
+                handler.target.setStream(devnull)
+        try:
+            for mode in ('off', 'sampled', 'unsampled'):
+                elapsed = async_to_sync(self.run_mode)(mode, options['answers'])
+                self.stdout.write(
+                    f"logging {mode:<10} {options['answers'] / elapsed:10.0f} answers/s"
+                    f"  ({elapsed * 1000 / options['answers']:.3f} ms/answer)"
+                )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            devnull.close()
+
+    async def run_mode(self, mode, n):
+        session, question, participant_ids = await sync_to_async(self.setup_session)(mode, n)
+        await live.control(session.session_code, session.host, 'push', question_id=question.id, duration=3600)
+
+        factory = APIRequestFactory()
+        view = ParticipantAnswerCreateView.as_view()
+        requests = [
+            factory.post('/api/answers/', {
+                'participant': pid, 'question': question.id, 'selected_option': 'A',
+            }, format='json')
+            for pid in participant_ids
+        ]
+
+        saved_rates = eventlog._sample_rates
+        if mode == 'off':
+            logging.disable(logging.CRITICAL)
+        elif mode == 'unsampled':
+            eventlog._sample_rates = {}
+        try:
+            # Like Daphne: each sync view runs in a worker thread while the
+            # session actor lives on this event loop.
+            start = time.perf_counter()
+            for request in requests:
+                await sync_to_async(view)(request)
+            return time.perf_counter() - start
+        finally:
+            logging.disable(logging.NOTSET)
+            eventlog._sample_rates = saved_rates
+
+    def setup_session(self, mode, n):
+        host, _ = User.objects.get_or_create(username='bench-host', defaults={'is_host': True})
+        quiz = Quiz.objects.create(title=f'bench {mode}', created_by=host)
+        question = Question.objects.create(
+            quiz=quiz, text='?', option_a='a', option_b='b', correct_option='A'
+        )
+        session = LiveSession.objects.create(quiz=quiz, host=host, session_code=f'LOG{mode[:3].upper()}')
+        Participant.objects.bulk_create(
+            Participant(session=session, name=f'player {i}') for i in range(n)
+        )
+        participant_ids = list(session.participants.values_list('id', flat=True))
+        return session, question, participant_ids
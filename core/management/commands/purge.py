@@ -0,0 +1,55 @@
+import threading
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import purge
+from core.models import LiveSession, Quiz
+
+
+class Command(BaseCommand):
+    help = "Delete a session or a quiz (with all its sessions) in chunks, reporting progress."
+
+    def add_arguments(self, parser):
+        target = parser.add_mutually_exclusive_group(required=True)
+        target.add_argument('--session', metavar='CODE', help="Session code to purge.")
+        target.add_argument('--quiz', type=int, metavar='ID', help="Quiz id to purge.")
+        parser.add_argument('--chunk-size', type=int, help="Rows per DELETE (default: PURGE_CHUNK_SIZE).")
+        parser.add_argument('--pause', type=float, help="Seconds between chunks (default: PURGE_CHUNK_PAUSE).")
+        parser.add_argument('--interval', type=float, default=1.0, help="Seconds between progress lines.")
+
+    def handle(self, *args, **options):
+        tuning = {'chunk_size': options['chunk_size'], 'pause': options['pause']}
+        if options['session']:
+            session = LiveSession.objects.filter(session_code=options['session']).first()
+            if session is None:
+                raise CommandError(f"Session {options['session']} does not exist.")
+            job = purge.purge_session(session, **tuning)
+        else:
+            quiz = Quiz.objects.filter(id=options['quiz']).first()
+            if quiz is None:
+                raise CommandError(f"Quiz {options['quiz']} does not exist.")
+            job = purge.purge_quiz(quiz, **tuning)
+
+        runner = threading.Thread(target=purge.execute, args=(job,))
+        runner.start()
+        while runner.is_alive():
+            runner.join(options['interval'])
+            self.report(job.progress())
+
+        progress = job.progress()
+        if progress['state'] != 'done':
+            raise CommandError(f"Purge failed: {progress['error']}")
+        for label, rows in progress['deleted'].items():
+            self.stdout.write(f"  {label:<16} {rows:>10}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Purged {job.kind} {job.label}: {progress['rows_deleted']} rows in {progress['elapsed_ms']} ms"
+        ))
+
+    def report(self, progress):
+        total = progress['rows_total']
+        if total is None:
+            return
+        self.stdout.write(
+            f"{progress['state']:<8} {progress['rows_deleted']:>10}/{total} rows "
+            f"({progress['percent']}%) {progress['elapsed_ms']} ms"
+        )
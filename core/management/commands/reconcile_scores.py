@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core import reconcile
+from core.models import LiveSession
+
+
+class Command(BaseCommand):
+    help = "Recompute participant scores from their answers and repair the ones that drifted."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--session', action='append', metavar='CODE',
+                            help="Session code to reconcile; repeatable (default: every ended session).")
+        parser.add_argument('--dry-run', action='store_true', help="Report mismatches without fixing them.")
+        parser.add_argument('--chunk-size', type=int, help="Rows per UPDATE (default: RECONCILE_CHUNK_SIZE).")
+
+    def handle(self, *args, **options):
+        session_ids = None
+        if options['session']:
+            found = dict(
+                LiveSession.objects.filter(session_code__in=options['session']).values_list('session_code', 'id')
+            )
+            missing = sorted(set(options['session']) - set(found))
+            if missing:
+                raise CommandError(f"Unknown session(s): {', '.join(missing)}.")
+            session_ids = list(found.values())
+
+        job = reconcile.execute(reconcile.Reconciliation(
+            session_ids, dry_run=options['dry_run'], chunk_size=options['chunk_size'],
+        ))
+        report = job.progress()
+        if report['state'] != 'done':
+            raise CommandError(f"Reconciliation failed: {report['error']}")
+
+        for row in report['sample']:
+            self.stdout.write(f"  participant {row['participant']:>10}  stored {row['stored']:>6}  true {row['true']:>6}")
+        if report['mismatched'] > len(report['sample']):
+            self.stdout.write(f"  ... and {report['mismatched'] - len(report['sample'])} more")
+        if report['skipped_active_sessions']:
+            self.stdout.write(self.style.WARNING(
+                f"Skipped {report['skipped_active_sessions']} active session(s); reconcile them once ended."
+            ))
+        verb = "would fix" if report['dry_run'] else "fixed"
+        self.stdout.write(self.style.SUCCESS(
+            f"Checked {report['checked']} participants in {report['elapsed_ms']} ms "
+            f"({report['per_second'] or 0}/s): {report['mismatched']} mismatched, "
+            f"{verb} {report['mismatched'] if report['dry_run'] else report['fixed']} (drift {report['drift']:+d})"
+        ))
@@ -0,0 +1,274 @@
+import asyncio
+import json
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import LiveSession, LiveQuestion, ParticipantAnswer
+
+# Events that share a timestamp are replayed in this order.
+EVENT_ORDER = {'join': 0, 'push': 1, 'answer': 2}
+
+
+class Command(BaseCommand):
+    help = (
+        "Export a session's join/push/answer timeline, or replay an exported "
+        "timeline against a running server and report where it diverged."
+    )
+
+    def add_arguments(self, parser):
+        actions = parser.add_subparsers(dest='action', required=True)
+
+        export = actions.add_parser('export', help="Write a session's timeline as JSON.")
+        export.add_argument('session_code')
+        export.add_argument('-o', '--output', help="File to write (default: stdout).")
+
+        replay = actions.add_parser('replay', help="Replay an exported timeline.")
+        replay.add_argument('timeline')
+        replay.add_argument('--server', default='http://127.0.0.1:8000')
+        replay.add_argument('--username', required=True, help="Host account on the target server.")
+        replay.add_argument('--password', required=True)
+        replay.add_argument(
+            '--speed', default='1',
+            help="Time compression factor (1 = real time, 10 = 10x), or 'max'.",
+        )
+        replay.add_argument('--concurrency', type=int, default=64)
+        replay.add_argument(
+            '--threshold-ms', type=float, default=250,
+            help="Report events that finished this far behind their original schedule.",
+        )
+
+    def handle(self, *args, **options):
+        if options['action'] == 'export':
+            self.export(options['session_code'], options['output'])
+        else:
+            self.replay(options)
+
+    # ── export ──
+
+    def export(self, session_code, output):
+        try:
+            session = LiveSession.objects.select_related('quiz').get(session_code=session_code)
+        except LiveSession.DoesNotExist:
+            raise CommandError(f"Session {session_code} does not exist.")
+
+        origin = session.started_at
+
+        def offset(moment):
+            return round((moment - origin).total_seconds(), 6)
+
+        events = []
+        for pid, name, joined_at in session.participants.values_list('id', 'name', 'joined_at'):
+            events.append({'t': offset(joined_at), 'type': 'join', 'participant': pid, 'name': name})
+        for question_id, displayed_at, duration in (
+            LiveQuestion.objects.filter(session=session)
+            .values_list('question_id', 'displayed_at', 'duration_seconds')
+        ):
+            events.append({'t': offset(displayed_at), 'type': 'push', 'question': question_id, 'duration': duration})
+        for pid, question_id, option, answered_at in (
+            ParticipantAnswer.objects.filter(participant__session=session)
+            .values_list('participant_id', 'question_id', 'selected_option', 'answered_at')
+        ):
+            events.append({
+                't': offset(answered_at), 'type': 'answer',
+                'participant': pid, 'question': question_id, 'option': option,
+            })
+        events.sort(key=lambda e: (e['t'], EVENT_ORDER[e['type']]))
+
+        timeline = {
+            'session_code': session.session_code,
+            'quiz_title': session.quiz.title,
+            'questions': list(session.quiz.questions.values(
+                'id', 'text', 'option_a', 'option_b', 'option_c', 'option_d',
+                'correct_option', 'is_true_false',
+            )),
+            'events': events,
+        }
+        if output:
+            with open(output, 'w') as f:
+                json.dump(timeline, f)
+            self.stderr.write(f"Wrote {len(events)} events to {output}")
+        else:
+            self.stdout.write(json.dumps(timeline))
+
+    # ── replay ──
+
+    def replay(self, options):
+        with open(options['timeline']) as f:
+            timeline = json.load(f)
+
+        speed = options['speed']
+        if speed != 'max':
+            try:
+                speed = float(speed)
+            except ValueError:
+                raise CommandError("--speed must be a number or 'max'.")
+            if speed <= 0:
+                raise CommandError("--speed must be positive.")
+
+        replayer = Replayer(options['server'], options['concurrency'])
+        replayer.login(options['username'], options['password'])
+        code = replayer.create_session(timeline)
+        pace = 'max speed' if speed == 'max' else f'{speed:g}x'
+        self.stdout.write(f"Replaying {len(timeline['events'])} events into session {code} at {pace}")
+
+        results = asyncio.run(replayer.run(timeline['events'], speed))
+        self.report(results, options['threshold_ms'])
+
+    def report(self, results, threshold_ms):
+        self.stdout.write(f"\n{'event':<8}{'sent':>7}{'ok':>7}{'failed':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+        for kind in EVENT_ORDER:
+            rows = [r for r in results if r['type'] == kind]
+            if not rows:
+                continue
+            latencies = sorted(r['latency_ms'] for r in rows if r['status'] is not None)
+            ok = sum(1 for r in rows if r['status'] is not None and r['status'] < 400)
+            self.stdout.write(
+                f"{kind:<8}{len(rows):>7}{ok:>7}{len(rows) - ok:>8}"
+                f"{_percentile(latencies, 50):>9.1f}{_percentile(latencies, 95):>9.1f}{_percentile(latencies, 99):>9.1f}"
+            )
+
+        # Every recorded answer was accepted originally, so a rejection in
+        # the replay is itself a divergence.
+        rejected = [r for r in results if r['type'] == 'answer' and (r['status'] is None or r['status'] >= 400)]
+        if rejected:
+            self.stdout.write(f"\n{len(rejected)} answers accepted originally were rejected in the replay:")
+            for r in rejected[:10]:
+                self.stdout.write(f"  t={r['t']:.3f}s question {r['question']}: {r['detail']}")
+
+        behind = sorted(
+            (r for r in results if r['lag_ms'] > threshold_ms),
+            key=lambda r: r['lag_ms'], reverse=True,
+        )
+        self.stdout.write(
+            f"\n{len(behind)} of {len(results)} events finished more than "
+            f"{threshold_ms:.0f} ms behind the original timeline"
+        )
+        for r in behind[:10]:
+            self.stdout.write(f"  t={r['t']:.3f}s {r['type']:<7} +{r['lag_ms']:.0f} ms (HTTP {r['status']})")
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method='inclusive')[pct - 1]
+
+
+class Replayer:
+    """Drives a server through the public API, one HTTP request per event."""
+
+    def __init__(self, server, concurrency):
+        self.server = server.rstrip('/')
+        self.pool = ThreadPoolExecutor(max_workers=concurrency)
+        self.token = None
+        self.session_code = None
+        self.question_ids = {}    # exported question id -> id on the target server
+        self.participants = {}    # exported participant id -> future of the new id
+
+    def request(self, method, path, body=None, auth=False):
+        data = json.dumps(body).encode() if body is not None else None
+        req = urllib.request.Request(self.server + path, data=data, method=method)
+        req.add_header('Content-Type', 'application/json')
+        if auth:
+            req.add_header('Authorization', f'Bearer {self.token}')
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(req) as resp:
+                status, payload = resp.status, resp.read()
+        except urllib.error.HTTPError as e:
+            status, payload = e.code, e.read()
+        except OSError as e:
+            return None, {'error': str(e)}, (time.perf_counter() - start) * 1000
+        latency_ms = (time.perf_counter() - start) * 1000
+        try:
+            payload = json.loads(payload) if payload else {}
+        except ValueError:
+            payload = {'error': payload[:200].decode(errors='replace')}
+        return status, payload, latency_ms
+
+    def _expect(self, result, what):
+        status, payload, _ = result
+        if status is None or status >= 400:
+            raise CommandError(f"Could not {what}: HTTP {status} {payload}")
+        return payload
+
+    def login(self, username, password):
+        payload = self._expect(
+            self.request('POST', '/api/token/', {'username': username, 'password': password}),
+            "log in",
+        )
+        self.token = payload['access']
+
+    def create_session(self, timeline):
+        quiz = self._expect(
+            self.request('POST', '/api/quizzes/', {'title': f"Replay of {timeline['session_code']}"}, auth=True),
+            "create the quiz",
+        )
+        for question in timeline['questions']:
+            body = {k: v for k, v in question.items() if k != 'id'}
+            body['quiz'] = quiz['id']
+            created = self._expect(self.request('POST', '/api/questions/', body, auth=True), "create a question")
+            self.question_ids[question['id']] = created['id']
+        session = self._expect(
+            self.request('POST', '/api/sessions/', {'quiz_id': quiz['id']}, auth=True),
+            "create the session",
+        )
+        self.session_code = session['session_code']
+        return self.session_code
+
+    async def run(self, events, speed):
+        loop = asyncio.get_running_loop()
+        for event in events:
+            if event['type'] == 'join':
+                self.participants[event['participant']] = loop.create_future()
+
+        start = loop.time()
+        if speed == 'max':
+            # Strictly in order, each event as soon as the previous finished.
+            return [await self.fire(event, None) for event in events]
+        return await asyncio.gather(*(self.fire(event, start + event['t'] / speed) for event in events))
+
+    async def fire(self, event, due):
+        loop = asyncio.get_running_loop()
+        if due is not None:
+            await asyncio.sleep(max(0.0, due - loop.time()))
+        scheduled = loop.time() if due is None else due
+
+        kind = event['type']
+        result = {'type': kind, 't': event['t'], 'question': event.get('question'), 'status': None}
+        if kind == 'join':
+            call = ('POST', '/api/join/', {'session_code': self.session_code, 'name': event['name']}, False)
+        elif kind == 'push':
+            call = ('POST', f'/api/sessions/{self.session_code}/push-question/', {
+                'question_id': self.question_ids[event['question']],
+                'duration': event['duration'],
+            }, True)
+        else:
+            participant = self.participants.get(event['participant'])
+            participant_id = await participant if participant is not None else None
+            if participant_id is None:
+                return {**result, 'latency_ms': 0.0, 'lag_ms': 0.0, 'detail': 'participant never joined'}
+            call = ('POST', '/api/answers/', {
+                'participant': participant_id,
+                'question': self.question_ids[event['question']],
+                'selected_option': event['option'],
+            }, False)
+
+        status, payload, latency_ms = await loop.run_in_executor(self.pool, lambda: self.request(*call))
+        if kind == 'join':
+            future = self.participants[event['participant']]
+            future.set_result(payload.get('id') if status == 201 else None)
+
+        return {
+            **result,
+            'status': status,
+            'latency_ms': latency_ms,
+            'lag_ms': (loop.time() - scheduled) * 1000,
+            'detail': payload.get('detail') or payload.get('error'),
+        }
@@ -0,0 +1,87 @@
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.router import Router
+
+
+class Command(BaseCommand):
+    help = (
+        "Run N Daphne workers, each owning the sessions hashed to it, behind a "
+        "session-affinity router. Workers that exit are restarted; their "
+        "sessions fail over to the next shard meanwhile and move back after. "
+        "A restarted worker replays its own journal; the failover shard does not."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 2)
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8000, help="Router port.")
+        parser.add_argument('--base-port', type=int, default=9100, help="Worker i listens on base-port + i.")
+        parser.add_argument('--health-interval', type=float, default=1.0)
+        parser.add_argument(
+            '--journal-dir', default=str(settings.BASE_DIR / 'journal'),
+            help="Per-shard session journals go in subdirectories here; empty to disable.",
+        )
+
+    def handle(self, *args, **options):
+        self.host = options['host']
+        self.journal_dir = options['journal_dir']
+        self.ports = [options['base_port'] + i for i in range(options['workers'])]
+        self.workers = [None] * len(self.ports)
+        self.stopping = False
+        router = Router([(self.host, port) for port in self.ports], options['health_interval'])
+        signal.signal(signal.SIGTERM, self.terminate)
+        try:
+            asyncio.run(self.run(router, options['port']))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stopping = True
+            for worker in self.workers:
+                if worker is not None and worker.poll() is None:
+                    worker.send_signal(signal.SIGTERM)
+            for worker in self.workers:
+                if worker is not None:
+                    worker.wait()
+
+    def terminate(self, signum, frame):
+        raise KeyboardInterrupt
+
+    def start_worker(self, shard):
+        env = dict(
+            os.environ,
+            QUIZ_SHARD_INDEX=str(shard),
+            DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'interview_platform.settings'),
+        )
+        if self.journal_dir:
+            env['QUIZ_JOURNAL_DIR'] = os.path.join(self.journal_dir, f'shard-{shard}')
+        self.workers[shard] = subprocess.Popen(
+            [sys.executable, '-m', 'daphne', '-b', self.host, '-p', str(self.ports[shard]),
+             'interview_platform.asgi:application'],
+            cwd=settings.BASE_DIR, env=env,
+        )
+        self.stdout.write(f"shard {shard}: pid {self.workers[shard].pid} on {self.host}:{self.ports[shard]}")
+
+    async def supervise(self):
+        while not self.stopping:
+            for shard, worker in enumerate(self.workers):
+                if worker.poll() is not None:
+                    self.stderr.write(f"shard {shard} exited with {worker.returncode}; restarting")
+                    self.start_worker(shard)
+            await asyncio.sleep(1.0)
+
+    async def run(self, router, port):
+        for shard in range(len(self.ports)):
+            self.start_worker(shard)
+        supervisor = asyncio.create_task(self.supervise())
+        self.stdout.write(f"router on {self.host}:{port} -> {len(self.ports)} shards")
+        try:
+            await router.serve(self.host, port)
+        finally:
+            supervisor.cancel()
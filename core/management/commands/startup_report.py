@@ -0,0 +1,79 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Run in a fresh interpreter so nothing is already imported. Warm-up is
+# skipped during the import and run explicitly so it can be timed apart.
+PROBE = """
+import json, time
+start = time.perf_counter()
+import interview_platform.asgi
+imported = time.perf_counter()
+from core.warmup import warm_up
+stages = warm_up()
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'warmup_ms': (time.perf_counter() - imported) * 1000,
+    'stages': stages,
+}))
+"""
+
+
+def parse_importtime(stderr):
+    """[(module, self_us, cumulative_us)] from ``-X importtime`` output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        try:
+            self_us, cumulative_us, module = line[len('import time:'):].split('|')
+            rows.append((module.strip(), int(self_us), int(cumulative_us)))
+        except ValueError:
+            continue
+    return rows
+
+
+class Command(BaseCommand):
+    help = "Measure cold import and warm-up time of the ASGI entry point."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=15, help="Slowest modules to list.")
+        parser.add_argument('--budget-ms', type=float, help="Fail if import + warm-up exceeds this.")
+
+    def handle(self, *args, **options):
+        env = dict(os.environ, QUIZ_SKIP_WARMUP='1')
+        env.setdefault('DJANGO_SETTINGS_MODULE', 'interview_platform.settings')
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', PROBE],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            raise CommandError(f"Startup probe failed:\n{proc.stderr[-2000:]}")
+        report = json.loads(proc.stdout.strip().splitlines()[-1])
+        rows = parse_importtime(proc.stderr)
+        top = options['top']
+
+        self.stdout.write(f"{len(rows)} modules imported")
+        self.stdout.write("\nSlowest by cumulative time (ms):")
+        for module, _, cumulative in sorted(rows, key=lambda r: -r[2])[:top]:
+            self.stdout.write(f"  {cumulative / 1000:>8.1f}  {module}")
+        self.stdout.write("\nSlowest by self time (ms):")
+        for module, own, _ in sorted(rows, key=lambda r: -r[1])[:top]:
+            self.stdout.write(f"  {own / 1000:>8.1f}  {module}")
+
+        self.stdout.write("\nWarm-up stages (ms):")
+        for stage, ms in report['stages'].items():
+            self.stdout.write(f"  {ms:>8.1f}  {stage}")
+
+        total = report['import_ms'] + report['warmup_ms']
+        self.stdout.write(
+            f"\nimport {report['import_ms']:.0f} ms + warm-up {report['warmup_ms']:.0f} ms"
+            f" = {total:.0f} ms"
+        )
+        budget = options['budget_ms'] or getattr(settings, 'STARTUP_BUDGET_MS', None)
+        if budget and total > budget:
+            raise CommandError(f"Startup took {total:.0f} ms, over the {budget:.0f} ms budget.")
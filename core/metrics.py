@@ -0,0 +1,14 @@
+from collections import Counter
+
+# Process-wide counters for the live session machinery. Cheap enough to bump
+# on every frame; read them through the metrics/ endpoint.
+
+_counters = Counter()
+
+
+def incr(name, n=1):
+    _counters[name] += n
+
+
+def snapshot():
+    return dict(_counters)
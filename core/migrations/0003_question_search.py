@@ -0,0 +1,67 @@
+from django.db import migrations
+
+# External-content FTS5 index over Question's text and options, kept in sync
+# by triggers so bulk imports and admin edits are indexed too. SQLite only;
+# on other databases core/search.py matches with plain LIKE queries instead.
+FORWARD = [
+    """
+    CREATE VIRTUAL TABLE core_question_fts USING fts5(
+        text, option_a, option_b, option_c, option_d,
+        content='core_question', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER core_question_fts_ai AFTER INSERT ON core_question BEGIN
+        INSERT INTO core_question_fts(rowid, text, option_a, option_b, option_c, option_d)
+        VALUES (new.id, new.text, new.option_a, new.option_b, new.option_c, new.option_d);
+    END
+    """,
+    """
+    CREATE TRIGGER core_question_fts_ad AFTER DELETE ON core_question BEGIN
+        INSERT INTO core_question_fts(core_question_fts, rowid, text, option_a, option_b, option_c, option_d)
+        VALUES ('delete', old.id, old.text, old.option_a, old.option_b, old.option_c, old.option_d);
+    END
+    """,
+    """
+    CREATE TRIGGER core_question_fts_au AFTER UPDATE ON core_question BEGIN
+        INSERT INTO core_question_fts(core_question_fts, rowid, text, option_a, option_b, option_c, option_d)
+        VALUES ('delete', old.id, old.text, old.option_a, old.option_b, old.option_c, old.option_d);
+        INSERT INTO core_question_fts(rowid, text, option_a, option_b, option_c, option_d)
+        VALUES (new.id, new.text, new.option_a, new.option_b, new.option_c, new.option_d);
+    END
+    """,
+    "INSERT INTO core_question_fts(core_question_fts) VALUES ('rebuild')",
+]
+
+BACKWARD = [
+    "DROP TRIGGER IF EXISTS core_question_fts_au",
+    "DROP TRIGGER IF EXISTS core_question_fts_ad",
+    "DROP TRIGGER IF EXISTS core_question_fts_ai",
+    "DROP TABLE IF EXISTS core_question_fts",
+]
+
+
+def execute_on_sqlite(schema_editor, statements):
+    if schema_editor.connection.vendor == 'sqlite':
+        for statement in statements:
+            schema_editor.execute(statement)
+
+
+def create_index(apps, schema_editor):
+    execute_on_sqlite(schema_editor, FORWARD)
+
+
+def drop_index(apps, schema_editor):
+    execute_on_sqlite(schema_editor, BACKWARD)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_auto_20250621_1855'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:56
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_question_search'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='participantanswer',
+            name='answered_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
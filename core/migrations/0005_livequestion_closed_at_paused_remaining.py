@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_participantanswer_answered_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='livequestion',
+            name='closed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='livequestion',
+            name='paused_remaining',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
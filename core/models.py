@@ -75,7 +75,10 @@ class LiveQuestion(models.Model):
     question = models.ForeignKey(Question, on_delete=models.CASCADE)
     displayed_at = models.DateTimeField(auto_now_add=True)
     duration_seconds = models.IntegerField(default=60)  # timer per question
-    displayed_at = models.DateTimeField(auto_now_add=True)
+    # Saved by the session actor so a reloaded actor (without a journal)
+    # neither reopens a question the host closed early nor restarts a pause.
+    closed_at = models.DateTimeField(null=True, blank=True)
+    paused_remaining = models.FloatField(null=True, blank=True)     # seconds left while paused
 
     @property
     def expires_at(self):
@@ -95,13 +98,15 @@ class ParticipantAnswer(models.Model):
     question = models.ForeignKey(Question, on_delete=models.CASCADE)
     selected_option = models.CharField(max_length=1)
     is_correct = models.BooleanField()
-    answered_at = models.DateTimeField(auto_now_add=True)
+    # Not auto_now_add: answers written behind the journal keep the time
+    # they were accepted, not the time they reached the table.
+    answered_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
         unique_together = ('participant', 'question')
 
     def __str__(self):
-        return f"{self.participant.name} answered {self.question.id}"
+        return f"{self.participant.name} answered {self.question_id}"
 
 
 # ─── Feedback / Review ────────────────────────────────
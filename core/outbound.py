@@ -0,0 +1,82 @@
+import asyncio
+from collections import deque
+
+from . import metrics
+
+# Frames that only describe current state. If one is still waiting to be
+# written when a newer one of the same type arrives, the newer one simply
+# replaces it. Everything else (questions, reveals, session end, control
+# replies) is delivered in order and never dropped.
+COALESCABLE = frozenset({'leaderboard', 'waiting_on', 'timer_update'})
+
+
+class OutboundQueue:
+    """
+    Bounded per-connection send queue.
+
+    A writer task drains frames through ``send``. While a client is behind,
+    state frames are coalesced; if the queue still overflows, the caller is
+    told to disconnect the client rather than let memory grow.
+    """
+
+    def __init__(self, send, limit):
+        self.send = send
+        self.limit = limit
+        self.frames = deque()    # [kind, data] slots, in send order
+        self.waiting = {}        # kind -> queued slot, for coalescable kinds
+        self.ready = asyncio.Event()
+        self.idle = asyncio.Event()     # set while everything queued has been sent
+        self.idle.set()
+        self.task = asyncio.get_running_loop().create_task(self._drain())
+
+    def push(self, kind, data, in_place=True):
+        """
+        Queue a frame; returns False if the connection should be dropped.
+
+        A state frame that depends on frames queued just before it (the
+        names it refers to) passes ``in_place=False``: rather than taking
+        an earlier slot it replaces that slot at the back of the queue.
+        """
+        slot = self.waiting.get(kind)
+        if slot is not None:
+            if in_place:
+                slot[1] = data
+                metrics.incr('ws.frames_coalesced')
+                return True
+            self.frames.remove(slot)
+            del self.waiting[kind]
+            metrics.incr('ws.frames_coalesced')
+
+        if len(self.frames) >= self.limit:
+            if kind in COALESCABLE:
+                metrics.incr('ws.frames_dropped')
+                return True
+            metrics.incr('ws.overflow_disconnects')
+            return False
+
+        slot = [kind, data]
+        self.frames.append(slot)
+        if kind in COALESCABLE:
+            self.waiting[kind] = slot
+        self.idle.clear()
+        self.ready.set()
+        return True
+
+    async def _drain(self):
+        while True:
+            await self.ready.wait()
+            while self.frames:
+                slot = self.frames.popleft()
+                if self.waiting.get(slot[0]) is slot:
+                    del self.waiting[slot[0]]
+                await self.send(slot[1])
+                metrics.incr('ws.frames_sent')
+            self.ready.clear()
+            self.idle.set()
+
+    async def flushed(self):
+        """Wait until every queued frame has been sent."""
+        await self.idle.wait()
+
+    def close(self):
+        self.task.cancel()
@@ -0,0 +1,101 @@
+import json
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+
+from .models import Question
+
+
+# ─── Pre-rendered Question Payloads ──────────────────────────
+#
+# A quiz's questions are rendered once, when a session of it starts, into
+# two JSON encodings: the player payload (no correct_option, so the answer
+# key never reaches a player before the reveal) and the host payload. A
+# push only splices the stored bytes into its frame; nothing is serialized
+# per push. Edits to a question drop its quiz's entry (see the signal
+# receivers below); other workers pick up edits when their entry is evicted
+# or the next session of the quiz starts on a fresh worker.
+
+PLAYER_FIELDS = (
+    'id', 'quiz', 'text', 'option_a', 'option_b', 'option_c', 'option_d', 'is_true_false',
+)
+HOST_FIELDS = PLAYER_FIELDS + ('correct_option',)
+
+
+class QuestionPayload:
+    __slots__ = ('question_id', 'correct_option', 'player', 'host')
+
+    def __init__(self, row):
+        self.question_id = row['id']
+        self.correct_option = row['correct_option']
+        self.player = json.dumps({field: row[field] for field in PLAYER_FIELDS}).encode()
+        self.host = json.dumps({field: row[field] for field in HOST_FIELDS}).encode()
+
+
+_quizzes = OrderedDict()   # quiz id -> {question id: QuestionPayload}
+_lock = threading.Lock()
+
+
+def _max_quizzes():
+    return getattr(settings, 'QUESTION_PAYLOAD_CACHE_QUIZZES', 1000)
+
+
+def render_quiz(quiz_id):
+    rows = Question.objects.filter(quiz_id=quiz_id).values(*HOST_FIELDS)
+    return {row['id']: QuestionPayload(row) for row in rows}
+
+
+def for_quiz(quiz_id, refresh=False):
+    """The quiz's payloads by question id, rendering them on first use."""
+    with _lock:
+        payloads = _quizzes.get(quiz_id)
+        if payloads is not None and not refresh:
+            _quizzes.move_to_end(quiz_id)
+            return payloads
+    payloads = render_quiz(quiz_id)
+    with _lock:
+        _quizzes[quiz_id] = payloads
+        if len(_quizzes) > _max_quizzes():
+            _quizzes.popitem(last=False)
+    return payloads
+
+
+def get(quiz_id, question_id):
+    """One question's payload, or None if it isn't in the quiz."""
+    payload = for_quiz(quiz_id).get(question_id)
+    if payload is None:
+        # Possibly added on another worker since this quiz was rendered.
+        payload = for_quiz(quiz_id, refresh=True).get(question_id)
+    return payload
+
+
+def invalidate(quiz_id):
+    with _lock:
+        _quizzes.pop(quiz_id, None)
+
+
+def _question_changed(sender, instance, **kwargs):
+    invalidate(instance.quiz_id)
+
+
+post_save.connect(_question_changed, sender=Question, dispatch_uid='payloads.question_saved')
+post_delete.connect(_question_changed, sender=Question, dispatch_uid='payloads.question_deleted')
+
+
+# ─── Live Question Frames ────────────────────────────────────
+
+def _timestamp(value):
+    text = value.isoformat()
+    return text[:-6] + 'Z' if text.endswith('+00:00') else text
+
+
+def live_question(live_q, session_code, question_bytes):
+    """A LiveQuestion as JSON bytes, around an already-encoded question."""
+    return b''.join((
+        b'{"id": %d, "session": ' % live_q.id, json.dumps(session_code).encode(),
+        b', "question": ', question_bytes,
+        b', "displayed_at": ', json.dumps(_timestamp(live_q.displayed_at)).encode(),
+        b', "duration_seconds": %d}' % live_q.duration_seconds,
+    ))
@@ -0,0 +1,117 @@
+from django.conf import settings
+from rest_framework.exceptions import NotFound, ValidationError
+
+
+# ─── Session Playlists ───────────────────────────────────────
+#
+# Instead of pushing each question by hand, a host can hand the session an
+# ordered playlist: question, how long it stays open, and how long the
+# reveal stays on screen before the next one. The session actor then drives
+# it from its own timers (push -> deadline -> reveal -> interval -> push),
+# so there is no host round trip or host-side jitter between questions.
+#
+# Payloads for every item are looked up when the playlist starts, and the
+# leaderboard is computed while the reveal is on screen, so an advance only
+# has the LiveQuestion insert and the broadcast left to do.
+#
+# A playlist lives in the actor only. A manual push, an end, or the actor
+# being restarted or handed to another shard stops it; the host can start
+# the remainder again. A socket connecting does not: the actor moving to the
+# socket's loop hands the playlist and its pending advance over with it.
+
+class PlaylistItem:
+    __slots__ = ('question_id', 'duration', 'reveal_seconds', 'payload')
+
+    def __init__(self, question_id, duration, reveal_seconds):
+        self.question_id = question_id
+        self.duration = duration
+        self.reveal_seconds = reveal_seconds
+        self.payload = None         # payloads.QuestionPayload, set on start
+
+
+class Playlist:
+
+    def __init__(self, items, end_when_done=False):
+        self.items = items
+        self.end_when_done = end_when_done
+        self.position = -1          # index of the item on screen
+
+    @property
+    def current(self):
+        return self.items[self.position] if 0 <= self.position < len(self.items) else None
+
+    @property
+    def upcoming(self):
+        position = self.position + 1
+        return self.items[position] if position < len(self.items) else None
+
+    def advance(self):
+        self.position += 1
+        return self.current
+
+    def attach(self, quiz_payloads):
+        """Give every item its pre-rendered payload; unknown questions are a NotFound."""
+        for item in self.items:
+            item.payload = quiz_payloads.get(item.question_id)
+            if item.payload is None:
+                raise NotFound(f"Question {item.question_id} not found in quiz.")
+
+    def progress(self):
+        return {
+            'position': self.position,
+            'total': len(self.items),
+            'question_id': self.current.question_id if self.current else None,
+            'next_question_id': self.upcoming.question_id if self.upcoming else None,
+            'end_when_done': self.end_when_done,
+        }
+
+
+def _positive_int(value, name):
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise ValidationError(f"{name} must be a whole number of seconds.")
+    if value <= 0:
+        raise ValidationError(f"{name} must be a positive number of seconds.")
+    return value
+
+
+def _seconds(value, name):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        raise ValidationError(f"{name} must be a number of seconds.")
+    if value < 0:
+        raise ValidationError(f"{name} can't be negative.")
+    return value
+
+
+def parse(items, duration=60, reveal_seconds=None, end_when_done=False):
+    """
+    A Playlist from request data: ``items`` is a list of question ids or of
+    {question_id, duration, reveal_seconds} objects; missing values fall
+    back to the playlist-wide ``duration`` and ``reveal_seconds``.
+    """
+    if not isinstance(items, list) or not items:
+        raise ValidationError("items must be a non-empty list of questions.")
+    if len(items) > getattr(settings, 'PLAYLIST_MAX_ITEMS', 500):
+        raise ValidationError("Too many questions in one playlist.")
+    if reveal_seconds is None:
+        reveal_seconds = getattr(settings, 'PLAYLIST_REVEAL_SECONDS', 5)
+    duration = _positive_int(duration, 'duration')
+    reveal_seconds = _seconds(reveal_seconds, 'reveal_seconds')
+
+    parsed = []
+    for item in items:
+        if not isinstance(item, dict):
+            item = {'question_id': item}
+        try:
+            question_id = int(item.get('question_id'))
+        except (TypeError, ValueError):
+            raise ValidationError("Every item needs a question_id.")
+        parsed.append(PlaylistItem(
+            question_id,
+            _positive_int(item.get('duration', duration), 'duration'),
+            _seconds(item.get('reveal_seconds', reveal_seconds), 'reveal_seconds'),
+        ))
+    return Playlist(parsed, bool(end_when_done))
@@ -0,0 +1,223 @@
+import itertools
+import logging
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+
+from . import answers, eventlog, feedback, live, payloads, results_cache
+from .models import LiveSession
+
+logger = logging.getLogger(__name__)
+
+
+# ─── Chunked Purge ───────────────────────────────────────────
+#
+# Deleting a quiz or session through the ORM cascades with Django's
+# collector, which loads every related row into memory and deletes them in
+# one transaction; on a big session that holds SQLite's write lock for as
+# long as it takes. A purge instead walks the tables leaves-first and
+# deletes in chunks: select the next ids through the foreign-key index,
+# ordered by id, then DELETE by primary key. Each chunk is its own short
+# transaction and the worker sleeps between chunks, so answers and joins
+# from live sessions get the write lock in between.
+#
+# Purges run one at a time on a background thread (concurrent purges would
+# only queue on the same lock) and report progress while they run.
+
+# (label, table, WHERE clause on that table) in delete order. Every %s is
+# the session or quiz id.
+SESSION_STEPS = (
+    ('answers', 'core_participantanswer',
+     'participant_id IN (SELECT id FROM core_participant WHERE session_id = %s)'),
+    ('feedback', 'core_feedback',
+     'participant_id IN (SELECT id FROM core_participant WHERE session_id = %s)'),
+    ('live_questions', 'core_livequestion', 'session_id = %s'),
+    ('participants', 'core_participant', 'session_id = %s'),
+    ('sessions', 'core_livesession', 'id = %s'),
+)
+# After every session of the quiz is purged, what's left hangs off questions.
+# The first two leave out rows of the quiz's own sessions: those are gone by
+# the time these run, but the total is counted up front and must not count
+# them twice.
+QUIZ_STEPS = (
+    ('answers', 'core_participantanswer',
+     'question_id IN (SELECT id FROM core_question WHERE quiz_id = %s) AND participant_id NOT IN ('
+     'SELECT id FROM core_participant WHERE session_id IN (SELECT id FROM core_livesession WHERE quiz_id = %s))'),
+    ('live_questions', 'core_livequestion',
+     'question_id IN (SELECT id FROM core_question WHERE quiz_id = %s) '
+     'AND session_id NOT IN (SELECT id FROM core_livesession WHERE quiz_id = %s)'),
+    ('questions', 'core_question', 'quiz_id = %s'),
+    ('quizzes', 'core_quiz', 'id = %s'),
+)
+
+
+def count(table, where, target_id):
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT COUNT(*) FROM {table} WHERE {where}', [target_id] * where.count('%s'))
+        return cursor.fetchone()[0]
+
+
+def delete_chunk(table, where, target_id, limit):
+    """Delete up to ``limit`` matching rows, lowest ids first; returns how many."""
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT id FROM {table} WHERE {where} ORDER BY id LIMIT %s', [target_id] * where.count('%s') + [limit]
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+            if ids:
+                cursor.execute(
+                    f'DELETE FROM {table} WHERE id IN ({", ".join(["%s"] * len(ids))})', ids
+                )
+    return len(ids)
+
+
+def _retire_session(session_id, session_code):
+    """Stop a session taking writes and drop what this process caches for it."""
+    LiveSession.objects.filter(id=session_id).update(is_active=False)
+    live.discard_actor(session_code)
+    # Nothing buffered for the session may land after its rows are gone.
+    answers.writer.flush()
+    feedback.writer.flush()
+    with feedback.writer.lock:
+        feedback.writer.stats.pop(session_id, None)
+    results_cache.bump(session_code)
+
+
+class Purge:
+    """One quiz or session purge and its progress."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, kind, target_id, label, owner_id=None, chunk_size=None, pause=None):
+        self.id = next(self._ids)
+        self.kind = kind                # 'quiz' or 'session'
+        self.target_id = target_id
+        self.label = label              # quiz title or session code
+        self.owner_id = owner_id        # who may see its progress
+        self.chunk_size = chunk_size or getattr(settings, 'PURGE_CHUNK_SIZE', 2000)
+        self.pause = pause if pause is not None else getattr(settings, 'PURGE_CHUNK_PAUSE', 0.05)
+        self.state = 'queued'
+        self.deleted = {}               # step label -> rows deleted
+        self.total = None               # rows to delete, counted when it starts
+        self.error = None
+        self.started = None
+        self.finished = None
+
+    def plan(self):
+        """[(step label, table, where, id)] for the whole purge, in order."""
+        if self.kind == 'session':
+            return [(label, table, where, self.target_id) for label, table, where in SESSION_STEPS]
+        steps = []
+        for session_id in LiveSession.objects.filter(quiz_id=self.target_id).values_list('id', flat=True):
+            steps += [(label, table, where, session_id) for label, table, where in SESSION_STEPS]
+        return steps + [(label, table, where, self.target_id) for label, table, where in QUIZ_STEPS]
+
+    def run(self):
+        self.state = 'running'
+        self.started = time.monotonic()
+        sessions = LiveSession.objects.filter(
+            **({'id': self.target_id} if self.kind == 'session' else {'quiz_id': self.target_id})
+        ).values_list('id', 'session_code')
+        for session_id, session_code in sessions:
+            _retire_session(session_id, session_code)
+
+        steps = self.plan()
+        self.total = sum(count(table, where, target_id) for _, table, where, target_id in steps)
+        for label, table, where, target_id in steps:
+            self.deleted.setdefault(label, 0)
+            while True:
+                deleted = delete_chunk(table, where, target_id, self.chunk_size)
+                self.deleted[label] += deleted
+                if deleted < self.chunk_size:
+                    break
+                time.sleep(self.pause)
+        if self.kind == 'quiz':
+            payloads.invalidate(self.target_id)
+        self.state = 'done'
+
+    def progress(self):
+        done = sum(self.deleted.values())
+        end = self.finished or time.monotonic()
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'target': self.target_id,
+            'label': self.label,
+            'state': self.state,
+            'deleted': dict(self.deleted),
+            'rows_deleted': done,
+            'rows_total': self.total,
+            'percent': round(100 * done / self.total, 1) if self.total else (100.0 if self.state == 'done' else 0.0),
+            'elapsed_ms': round((end - self.started) * 1000) if self.started else 0,
+            'error': self.error,
+        }
+
+
+# ─── Background Worker ───────────────────────────────────────
+
+class PurgeWorker:
+
+    def __init__(self, keep=100):
+        self.keep = keep            # finished purges kept for progress lookups
+        self.purges = {}            # purge id -> Purge
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def submit(self, purge):
+        with self.lock:
+            self.purges[purge.id] = purge
+            finished = [p for p in self.purges.values() if p.finished is not None]
+            for old in finished[:max(len(finished) - self.keep, 0)]:
+                del self.purges[old.id]
+        self.queue.put(purge)
+        self._ensure_thread()
+        return purge
+
+    def get(self, purge_id):
+        with self.lock:
+            return self.purges.get(purge_id)
+
+    def _ensure_thread(self):
+        if self.thread is None or not self.thread.is_alive():
+            with self.lock:
+                if self.thread is None or not self.thread.is_alive():
+                    self.thread = threading.Thread(target=self._run, name='purge-worker', daemon=True)
+                    self.thread.start()
+
+    def _run(self):
+        while True:
+            purge = self.queue.get()
+            close_old_connections()
+            execute(purge)
+
+
+def execute(purge):
+    """Run a purge on the calling thread, recording the outcome on it."""
+    try:
+        purge.run()
+    except Exception as exc:
+        logger.exception("Purge %d of %s %s failed", purge.id, purge.kind, purge.target_id)
+        purge.state = 'failed'
+        purge.error = str(exc)
+    purge.finished = time.monotonic()
+    eventlog.event(
+        logger, 'purge.finished', logging.INFO if purge.state == 'done' else logging.ERROR,
+        **{key: value for key, value in purge.progress().items() if key != 'deleted'},
+    )
+    return purge
+
+
+def purge_session(session, owner_id=None, **options):
+    return Purge('session', session.id, session.session_code, owner_id, **options)
+
+
+def purge_quiz(quiz, owner_id=None, **options):
+    return Purge('quiz', quiz.id, quiz.title, owner_id, **options)
+
+
+worker = PurgeWorker()
@@ -0,0 +1,187 @@
+import itertools
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Count, Q
+
+from . import eventlog, live, results_cache
+from .answers import writer as answer_writer
+from .models import LiveSession, Participant
+
+logger = logging.getLogger(__name__)
+
+
+# ─── Score Reconciliation ────────────────────────────────────
+#
+# Participant.score is a running total kept by the answer paths, and
+# session_results ranks by correct answers counted from the answer table;
+# anything that ever lost or doubled an increment makes the two disagree.
+# A reconciliation recomputes every participant's score from their answers
+# in one grouped aggregate, streamed in chunks, diffs it against the
+# stored score and writes only the mismatches back, a chunk per short
+# transaction. Scores are multiples of the points per answer, so there are
+# few distinct values: the write is one UPDATE ... WHERE id IN (chunk) per
+# value (as answers.add_points does) rather than bulk_update, whose CASE
+# expression costs a fraction of a millisecond per row to build. A dry run
+# reports the same diff and writes nothing.
+#
+# Only ended sessions are reconciled: a live session's actor holds its
+# scores in memory and would overwrite a repair with its own totals.
+
+SAMPLE_SIZE = 20        # mismatches listed in a report
+
+
+class Reconciliation:
+    """One reconciliation run over some or all sessions, and its report."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, session_ids=None, dry_run=False, chunk_size=None, owner_id=None):
+        self.id = next(self._ids)
+        self.session_ids = session_ids      # None: every ended session
+        self.dry_run = dry_run
+        self.chunk_size = chunk_size or getattr(settings, 'RECONCILE_CHUNK_SIZE', 2000)
+        self.owner_id = owner_id
+        self.state = 'queued'
+        self.checked = 0
+        self.mismatched = 0
+        self.fixed = 0
+        self.drift = 0                      # sum of stored - true over mismatches
+        self.sample = []                    # first mismatches, for the report
+        self.skipped_sessions = 0           # active sessions left alone
+        self.error = None
+        self.started = None
+        self.finished = None
+
+    def participants(self):
+        sessions = LiveSession.objects.filter(is_active=False)
+        if self.session_ids is not None:
+            sessions = sessions.filter(id__in=self.session_ids)
+            self.skipped_sessions = LiveSession.objects.filter(id__in=self.session_ids, is_active=True).count()
+        else:
+            self.skipped_sessions = LiveSession.objects.filter(is_active=True).count()
+        # Grouped by exactly the selected columns, in index order (no sort).
+        return Participant.objects.filter(session__in=sessions).values('id', 'session_id', 'score').annotate(
+            correct=Count('participantanswer', filter=Q(participantanswer__is_correct=True)),
+        ).values_list('id', 'session_id', 'score', 'correct').order_by()
+
+    def run(self):
+        self.state = 'running'
+        self.started = time.monotonic()
+        # Answers accepted just before a session ended may still be pending.
+        answer_writer.flush()
+        points = live.POINTS_PER_CORRECT_ANSWER
+        fixes = []
+        sessions = set()
+        for participant_id, session_id, score, correct in self.participants().iterator(chunk_size=self.chunk_size):
+            self.checked += 1
+            true_score = correct * points
+            if score == true_score:
+                continue
+            self.mismatched += 1
+            self.drift += score - true_score
+            if len(self.sample) < SAMPLE_SIZE:
+                self.sample.append({'participant': participant_id, 'stored': score, 'true': true_score})
+            if not self.dry_run:
+                fixes.append((participant_id, true_score))
+                sessions.add(session_id)
+        # Written once the read is done: SQLite gives no isolation between a
+        # cursor still being read and writes to the same table.
+        if fixes:
+            self.write(fixes)
+            for code in LiveSession.objects.filter(id__in=sessions).values_list('session_code', flat=True):
+                live.discard_actor(code)
+                results_cache.bump(code)
+        self.state = 'done'
+
+    def write(self, fixes):
+        by_score = defaultdict(list)
+        for participant_id, score in fixes:
+            by_score[score].append(participant_id)
+        for score, participant_ids in by_score.items():
+            for start in range(0, len(participant_ids), self.chunk_size):
+                chunk = participant_ids[start:start + self.chunk_size]
+                with transaction.atomic():
+                    self.fixed += Participant.objects.filter(id__in=chunk).update(score=score)
+
+    def progress(self):
+        end = self.finished or time.monotonic()
+        elapsed = (end - self.started) if self.started else 0
+        return {
+            'id': self.id,
+            'state': self.state,
+            'dry_run': self.dry_run,
+            'sessions': self.session_ids,
+            'checked': self.checked,
+            'mismatched': self.mismatched,
+            'fixed': self.fixed,
+            'drift': self.drift,
+            'sample': list(self.sample),
+            'skipped_active_sessions': self.skipped_sessions,
+            'elapsed_ms': round(elapsed * 1000),
+            'per_second': round(self.checked / elapsed) if elapsed else None,
+            'error': self.error,
+        }
+
+
+def execute(job):
+    """Run a reconciliation on the calling thread, recording the outcome on it."""
+    try:
+        job.run()
+    except Exception as exc:
+        logger.exception("Reconciliation %d failed", job.id)
+        job.state = 'failed'
+        job.error = str(exc)
+    job.finished = time.monotonic()
+    eventlog.event(
+        logger, 'reconcile.finished', logging.INFO if job.state == 'done' else logging.ERROR,
+        **{key: value for key, value in job.progress().items() if key not in ('sample', 'sessions')},
+    )
+    return job
+
+
+# ─── Background Worker ───────────────────────────────────────
+
+class ReconcileWorker:
+
+    def __init__(self, keep=100):
+        self.keep = keep            # finished runs kept for report lookups
+        self.jobs = {}              # reconciliation id -> Reconciliation
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def submit(self, job):
+        with self.lock:
+            self.jobs[job.id] = job
+            finished = [j for j in self.jobs.values() if j.finished is not None]
+            for old in finished[:max(len(finished) - self.keep, 0)]:
+                del self.jobs[old.id]
+        self.queue.put(job)
+        self._ensure_thread()
+        return job
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def _ensure_thread(self):
+        if self.thread is None or not self.thread.is_alive():
+            with self.lock:
+                if self.thread is None or not self.thread.is_alive():
+                    self.thread = threading.Thread(target=self._run, name='reconcile-worker', daemon=True)
+                    self.thread.start()
+
+    def _run(self):
+        while True:
+            job = self.queue.get()
+            close_old_connections()
+            execute(job)
+
+
+worker = ReconcileWorker()
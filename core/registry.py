@@ -0,0 +1,98 @@
+import sys
+
+
+# ─── Participant Registry ────────────────────────────────────
+#
+# What a session actor knows about its players, kept compact enough for
+# rooms of tens of thousands: one __slots__ record per participant (no
+# per-instance dict), names interned, and the questions a player has
+# answered (and got right) held as bitsets over per-session question
+# indices rather than sets or per-question dicts. A 50k-player room costs
+# a few hundred bytes per player; see the memory budget in core/tests.
+#
+# The leaderboard, the reveal's tallies, the waiting-on list and the
+# already-answered check all read from here.
+
+class ParticipantRecord:
+    __slots__ = ('id', 'name', 'score', 'correct_count', 'answered', 'correct', 'last_answer_ms')
+
+    def __init__(self, participant_id, name, score=0, correct_count=0):
+        self.id = participant_id
+        self.name = sys.intern(name)
+        self.score = score
+        self.correct_count = correct_count
+        self.answered = 0           # bit i set: answered the question with index i
+        self.correct = 0            # bit i set: ... and got it right
+        self.last_answer_ms = 0     # epoch ms of the last answer this actor accepted
+
+
+class ParticipantRegistry:
+
+    def __init__(self):
+        self.records = {}           # participant id -> ParticipantRecord
+        self.question_bits = {}     # question id -> bit index, in order first seen
+
+    def __len__(self):
+        return len(self.records)
+
+    def __contains__(self, participant_id):
+        return participant_id in self.records
+
+    def get(self, participant_id):
+        return self.records.get(participant_id)
+
+    def add(self, participant_id, name, score=0, correct_count=0):
+        record = self.records[participant_id] = ParticipantRecord(participant_id, name, score, correct_count)
+        return record
+
+    def bit(self, question_id):
+        """The question's bitset mask, giving it the next index on first use."""
+        index = self.question_bits.get(question_id)
+        if index is None:
+            index = self.question_bits[question_id] = len(self.question_bits)
+        return 1 << index
+
+    # ── answers ──
+
+    def has_answered(self, participant_id, question_id):
+        record = self.records.get(participant_id)
+        return record is not None and bool(record.answered & self.bit(question_id))
+
+    def mark_answered(self, participant_id, question_id, is_correct):
+        """Note an answer whose points are already in the stored score."""
+        record = self.records[participant_id]
+        mask = self.bit(question_id)
+        record.answered |= mask
+        if is_correct:
+            record.correct |= mask
+        return record
+
+    def record_answer(self, participant_id, question_id, is_correct, points, answered_ms=0):
+        """Note a newly accepted answer and score it."""
+        record = self.mark_answered(participant_id, question_id, is_correct)
+        if is_correct:
+            record.score += points
+            record.correct_count += 1
+        record.last_answer_ms = answered_ms
+        return record
+
+    def tally(self, question_id):
+        """(answers to the question, names of those who got it right)."""
+        mask = self.bit(question_id)
+        total = 0
+        correct = []
+        for record in self.records.values():
+            if record.answered & mask:
+                total += 1
+                if record.correct & mask:
+                    correct.append(record.name)
+        return total, correct
+
+    # ── views ──
+
+    def names(self):
+        return [record.name for record in self.records.values()]
+
+    def leaderboard(self):
+        ranked = sorted(self.records.values(), key=lambda record: record.score, reverse=True)
+        return [{'name': record.name, 'score': record.score} for record in ranked]
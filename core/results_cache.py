@@ -0,0 +1,89 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
+
+
+# ─── Session Versions ────────────────────────────────────────
+#
+# The session actor bumps a session's version whenever something a player
+# can see in the results changes (an answer is accepted, a player joins, a
+# question is revealed, the session ends). Rendered responses are cached
+# under the version they were built for, so a poll between two changes is a
+# dictionary lookup instead of an aggregate join. Answers that go through
+# the write-behind writer bump again once they are in the table, since a
+# poll between the two reads the table without them.
+#
+# Views, actors and the writer threads all get here; _lock guards both
+# dictionaries.
+
+_versions = {}
+_lock = threading.Lock()
+
+
+def bump(session_code):
+    with _lock:
+        _versions[session_code] = _versions.get(session_code, 0) + 1
+
+
+def version(session_code):
+    with _lock:
+        return _versions.get(session_code, 0)
+
+
+# ─── Rendered Response Cache ─────────────────────────────────
+
+_entries = OrderedDict()   # (endpoint, session, version, participant) -> (body, etag, expires)
+
+
+def _ttl():
+    return getattr(settings, 'RESULTS_CACHE_TTL', 2)
+
+
+def _max_entries():
+    return getattr(settings, 'RESULTS_CACHE_MAX_ENTRIES', 10000)
+
+
+async def cached_json(request, endpoint, session_code, participant_id, build):
+    """
+    Serve ``build()`` through the micro-cache with a strong ETag.
+
+    ``build`` is an async callable returning a JsonResponse; only 200s are
+    cached. The TTL bounds staleness when another worker owns the session
+    and this process never sees its version bumps.
+    """
+    key = (endpoint, session_code, version(session_code), participant_id)
+    now = time.monotonic()
+
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None and entry[2] > now:
+            _entries.move_to_end(key)
+        else:
+            entry = None
+    if entry is None:
+        response = await build()
+        if response.status_code != 200:
+            return response
+        body = response.content
+        # Derived from the bytes, so it stays valid across versions/workers.
+        etag = '"%s"' % hashlib.blake2b(body, digest_size=16).hexdigest()
+        entry = (body, etag, now + _ttl())
+        with _lock:
+            _entries[key] = entry
+            if len(_entries) > _max_entries():
+                _entries.popitem(last=False)
+
+    body, etag, _ = entry
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match and (etag in parse_etags(if_none_match) or if_none_match.strip() == '*'):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(body, content_type='application/json')
+    response['ETag'] = etag
+    response['Cache-Control'] = 'no-cache'
+    return response
@@ -0,0 +1,307 @@
+import asyncio
+import itertools
+import json
+import logging
+import re
+from collections import OrderedDict
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+
+from . import eventlog, metrics, sharding
+from .models import Participant
+
+logger = logging.getLogger(__name__)
+
+
+# ─── Session-affinity Router ─────────────────────────────────
+#
+# A small HTTP/WebSocket proxy in front of the shard workers. It reads each
+# request's head (and body, for the endpoints that name the session there),
+# works out the session, and forwards the request to the worker that owns
+# it, so a session's actor, channel group and caches all live in one
+# process. Requests that aren't about a session are spread round-robin.
+# WebSocket upgrades are piped through for the life of the socket.
+
+PATH_SESSION = re.compile(r'^/(?:api/sessions|ws/session)/(\w+)/')
+BODY_SESSION = {'/api/join/': 'session_code'}
+BODY_PARTICIPANT = ('/api/answers/', '/api/feedback/')
+
+MAX_HEAD = 64 * 1024
+HOP_BY_HOP = {'connection', 'keep-alive', 'proxy-connection'}
+PARTICIPANT_CACHE_SIZE = 100_000
+
+
+class BadRequest(Exception):
+    pass
+
+
+def parse_head(head):
+    """(first line, [(name, value)]) from a request or response head."""
+    lines = head.decode('latin-1').split('\r\n')
+    headers = []
+    for line in lines[1:]:
+        if not line:
+            continue
+        name, sep, value = line.partition(':')
+        if not sep:
+            raise BadRequest(f"Malformed header line: {line!r}")
+        headers.append((name.strip(), value.strip()))
+    return lines[0], headers
+
+
+def build_head(first_line, headers):
+    lines = [first_line] + [f'{name}: {value}' for name, value in headers] + ['', '']
+    return '\r\n'.join(lines).encode('latin-1')
+
+
+def header(headers, name):
+    name = name.lower()
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+def body_fields(headers, body):
+    content_type = (header(headers, 'Content-Type') or '').lower()
+    try:
+        if 'json' in content_type:
+            data = json.loads(body or b'{}')
+            return data if isinstance(data, dict) else {}
+        if 'x-www-form-urlencoded' in content_type:
+            return {key: values[0] for key, values in parse_qs(body.decode()).items()}
+    except ValueError:
+        pass
+    return {}
+
+
+class Router:
+
+    def __init__(self, backends, health_interval=1.0):
+        self.backends = backends        # shard index -> (host, port)
+        self.down = set()
+        self.epoch = 0
+        self.health_interval = health_interval
+        self.round_robin = itertools.count()
+        self.participants = OrderedDict()   # participant id -> session code
+
+    # ── membership ──
+
+    def live_shards(self):
+        return [shard for shard in range(len(self.backends)) if shard not in self.down]
+
+    def view(self):
+        return sharding.format_view(self.epoch, self.live_shards())
+
+    def mark(self, shard, up):
+        if (shard not in self.down) == up:
+            return
+        if up:
+            self.down.discard(shard)
+        else:
+            self.down.add(shard)
+        self.epoch += 1
+        eventlog.event(
+            logger, 'router.shard_up' if up else 'router.shard_down',
+            logging.WARNING, shard=shard, epoch=self.epoch,
+        )
+
+    async def health_loop(self):
+        while True:
+            await asyncio.sleep(self.health_interval)
+            for shard in list(self.down):
+                try:
+                    _, writer = await asyncio.open_connection(*self.backends[shard])
+                except OSError:
+                    continue
+                writer.close()
+                self.mark(shard, up=True)
+
+    # ── routing ──
+
+    async def session_code(self, path, headers, body):
+        match = PATH_SESSION.match(path)
+        if match:
+            return match.group(1)
+        path = path.split('?', 1)[0]
+        if path in BODY_SESSION:
+            return body_fields(headers, body).get(BODY_SESSION[path])
+        if path in BODY_PARTICIPANT:
+            participant_id = body_fields(headers, body).get('participant')
+            if participant_id is not None:
+                return await self.participant_session(str(participant_id))
+        return None
+
+    async def participant_session(self, participant_id):
+        code = self.participants.get(participant_id)
+        if code is None:
+            if not participant_id.isdigit():
+                return None
+            code = await database_sync_to_async(
+                lambda: Participant.objects.filter(id=participant_id)
+                .values_list('session__session_code', flat=True).first()
+            )()
+            if code is None:
+                return None
+            self.participants[participant_id] = code
+            if len(self.participants) > PARTICIPANT_CACHE_SIZE:
+                self.participants.popitem(last=False)
+        return code
+
+    def candidates(self, session_code):
+        """Live shards in the order to try them for this request."""
+        shards = self.live_shards() or list(range(len(self.backends)))
+        if session_code is None:
+            start = next(self.round_robin) % len(shards)
+            return shards[start:] + shards[:start]
+        return sharding.ranked(session_code, shards)
+
+    async def connect(self, session_code):
+        for shard in self.candidates(session_code):
+            try:
+                reader, writer = await asyncio.open_connection(*self.backends[shard])
+            except OSError:
+                self.mark(shard, up=False)
+                continue
+            return shard, reader, writer
+        return None, None, None
+
+    # ── proxying ──
+
+    async def handle(self, client_reader, client_writer):
+        try:
+            while await self.forward_one(client_reader, client_writer):
+                pass
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            pass
+        except BadRequest as exc:
+            await self.reply(client_writer, 400, str(exc))
+        except Exception:
+            logger.exception("Router failed to proxy a request")
+        finally:
+            client_writer.close()
+
+    async def reply(self, writer, status, message):
+        body = json.dumps({'error': message}).encode()
+        writer.write(build_head(f'HTTP/1.1 {status} Router', [
+            ('Content-Type', 'application/json'),
+            ('Content-Length', str(len(body))),
+            ('Connection', 'close'),
+        ]) + body)
+        await writer.drain()
+
+    async def forward_one(self, client_reader, client_writer):
+        """Proxy one request; returns whether the client connection stays open."""
+        try:
+            head = await client_reader.readuntil(b'\r\n\r\n')
+        except asyncio.IncompleteReadError:
+            return False
+        request_line, headers = parse_head(head)
+        try:
+            method, path, version = request_line.split(' ')
+        except ValueError:
+            raise BadRequest("Malformed request line.")
+
+        if header(headers, 'Transfer-Encoding'):
+            await self.reply(client_writer, 411, "Chunked request bodies are not supported.")
+            return False
+        length = int(header(headers, 'Content-Length') or 0)
+        body = await client_reader.readexactly(length) if length else b''
+
+        upgrade = (header(headers, 'Upgrade') or '').lower() == 'websocket'
+        client_keeps_alive = (
+            version == 'HTTP/1.1'
+            and (header(headers, 'Connection') or '').lower() != 'close'
+        )
+
+        session_code = await self.session_code(path, headers, body)
+        shard, upstream_reader, upstream_writer = await self.connect(session_code)
+        if shard is None:
+            await self.reply(client_writer, 503, "No shard workers are reachable.")
+            return False
+        metrics.incr(f'router.shard{shard}.requests')
+
+        # Only the router may tell a worker the shard view; a client-sent
+        # copy is dropped before ours is added.
+        forwarded = [
+            (name, value) for name, value in headers
+            if (upgrade or name.lower() not in HOP_BY_HOP) and name.lower() != sharding.SHARDS_HEADER.lower()
+        ]
+        if not upgrade:
+            # One request per upstream connection keeps the response framing
+            # simple: the worker closes when it's done.
+            forwarded.append(('Connection', 'close'))
+        forwarded.append((sharding.SHARDS_HEADER, self.view()))
+        upstream_writer.write(build_head(request_line, forwarded) + body)
+        await upstream_writer.drain()
+
+        try:
+            if upgrade:
+                await self.pipe_both(client_reader, client_writer, upstream_reader, upstream_writer)
+                return False
+            return await self.relay_response(
+                method, upstream_reader, client_writer, client_keeps_alive
+            )
+        finally:
+            upstream_writer.close()
+
+    async def relay_response(self, method, upstream_reader, client_writer, keep_alive):
+        head = await upstream_reader.readuntil(b'\r\n\r\n')
+        status_line, headers = parse_head(head)
+        status = int(status_line.split(' ', 2)[1])
+        length = header(headers, 'Content-Length')
+        chunked = 'chunked' in (header(headers, 'Transfer-Encoding') or '').lower()
+        bodyless = method == 'HEAD' or status in (204, 304) or status < 200
+        # Without a length or chunking the body ends when the worker closes,
+        # so the client has to see a close too.
+        keep_alive = keep_alive and (bodyless or length is not None or chunked)
+
+        headers = [(name, value) for name, value in headers if name.lower() not in HOP_BY_HOP]
+        headers.append(('Connection', 'keep-alive' if keep_alive else 'close'))
+        client_writer.write(build_head(status_line, headers))
+
+        if bodyless:
+            pass
+        elif length is not None:
+            remaining = int(length)
+            while remaining:
+                chunk = await upstream_reader.read(min(remaining, 65536))
+                if not chunk:
+                    raise ConnectionError("Worker closed mid-response.")
+                client_writer.write(chunk)
+                remaining -= len(chunk)
+                await client_writer.drain()
+        else:
+            await self.pipe(upstream_reader, client_writer)
+        await client_writer.drain()
+        return keep_alive
+
+    async def pipe(self, reader, writer):
+        while True:
+            chunk = await reader.read(65536)
+            if not chunk:
+                return
+            writer.write(chunk)
+            await writer.drain()
+
+    async def pipe_both(self, client_reader, client_writer, upstream_reader, upstream_writer):
+        tasks = [
+            asyncio.create_task(self.pipe(client_reader, upstream_writer)),
+            asyncio.create_task(self.pipe(upstream_reader, client_writer)),
+        ]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle, host, port, limit=MAX_HEAD)
+        health = asyncio.create_task(self.health_loop())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            health.cancel()
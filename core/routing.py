@@ -1,6 +1,12 @@
 from django.urls import re_path
 from .consumers import LiveSessionConsumer
+from .sse import EventStreamConsumer
 
 websocket_urlpatterns = [
     re_path(r'ws/session/(?P<code>\w+)/$', LiveSessionConsumer.as_asgi()),
 ]
+
+# Long-lived HTTP streams served by Channels ahead of Django's URLconf
+http_urlpatterns = [
+    re_path(r'^api/sessions/(?P<code>\w+)/events/$', EventStreamConsumer.as_asgi()),
+]
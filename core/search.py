@@ -0,0 +1,87 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import Question
+
+
+# ─── Question Bank Search ────────────────────────────────────
+#
+# Backed by the core_question_fts FTS5 table (see migration 0003), which
+# triggers keep in step with core_question. Results are always scoped to
+# the quizzes one host owns. Other databases have no index; there every
+# word is matched with a LIKE over the text and options, unranked.
+
+# Question text outweighs matches in the answer options.
+RANK = 'bm25(core_question_fts, 10.0, 2.0, 2.0, 2.0, 2.0)'
+
+_TOKEN = re.compile(r'\w+', re.UNICODE)
+
+
+def match_expression(query):
+    """
+    Turn free text into an FTS5 MATCH expression: every word must appear,
+    and the last one is a prefix so results narrow as the host types.
+    Returns None if the query has no searchable words.
+    """
+    words = _TOKEN.findall(query)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def search_questions(owner_id, query, quiz_id=None, offset=0, limit=50):
+    """[{'id', 'quiz', 'quiz_title', 'snippet', 'score'}] best match first."""
+    if connection.vendor != 'sqlite':
+        return _search_unindexed(owner_id, query, quiz_id, offset, limit)
+    expression = match_expression(query)
+    if expression is None:
+        return []
+    sql = f"""
+        SELECT q.id, q.quiz_id, z.title,
+               snippet(core_question_fts, -1, '[', ']', '…', 12),
+               {RANK} AS score
+        FROM core_question_fts
+        JOIN core_question q ON q.id = core_question_fts.rowid
+        JOIN core_quiz z ON z.id = q.quiz_id
+        WHERE core_question_fts MATCH %s AND z.created_by_id = %s
+    """
+    params = [expression, owner_id]
+    if quiz_id is not None:
+        sql += " AND q.quiz_id = %s"
+        params.append(quiz_id)
+    sql += " ORDER BY score LIMIT %s OFFSET %s"
+    params += [limit, offset]
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    return [
+        {'id': id, 'quiz': quiz, 'quiz_title': title, 'snippet': snippet, 'score': round(-score, 3)}
+        for id, quiz, title, snippet, score in rows
+    ]
+
+
+SEARCHED_FIELDS = ('text', 'option_a', 'option_b', 'option_c', 'option_d')
+
+
+def _search_unindexed(owner_id, query, quiz_id, offset, limit):
+    words = _TOKEN.findall(query)
+    if not words:
+        return []
+    questions = Question.objects.filter(quiz__created_by_id=owner_id)
+    if quiz_id is not None:
+        questions = questions.filter(quiz_id=quiz_id)
+    for word in words:
+        match = Q()
+        for field in SEARCHED_FIELDS:
+            match |= Q(**{f'{field}__icontains': word})
+        questions = questions.filter(match)
+    rows = questions.order_by('id').values_list('id', 'quiz_id', 'quiz__title', 'text')[offset:offset + limit]
+    return [
+        {'id': id, 'quiz': quiz, 'quiz_title': title, 'snippet': text[:80], 'score': 0.0}
+        for id, quiz, title, text in rows
+    ]
@@ -12,18 +12,6 @@ class UserSerializer(serializers.ModelSerializer):
         fields = ['id', 'username', 'email', 'is_host']
 
 
-# ─── Question Serializer ──────────────────────────────────────
-
-class QuestionSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = Question
-        fields = [
-            'id', 'text', 'option_a', 'option_b', 'option_c', 'option_d',
-            'correct_option', 'is_true_false'
-        ]
-        read_only_fields = ['correct_option']  # hide for participant response
-
-
 # ─── Quiz Serializer ───────────────────────────────────────────
 
 class QuizSerializer(serializers.ModelSerializer):
@@ -32,9 +20,10 @@ class QuizSerializer(serializers.ModelSerializer):
         fields = ['id', 'title', 'created_by', 'created_at']
         read_only_fields = ['created_by', 'created_at']
 
-# ____ Questions serializers __________________________________
+# ─── Question Serializers ─────────────────────────────────────
 
 class QuestionSerializer(serializers.ModelSerializer):
+    """Host-facing: includes the answer key."""
     class Meta:
         model = Question
         fields = [
@@ -44,6 +33,18 @@ class QuestionSerializer(serializers.ModelSerializer):
         ]
 
 
+class PlayerQuestionSerializer(serializers.ModelSerializer):
+    """Player-facing: same as payloads.PLAYER_FIELDS, never correct_option."""
+    class Meta:
+        model = Question
+        fields = [
+            'id', 'quiz', 'text',
+            'option_a', 'option_b', 'option_c', 'option_d',
+            'is_true_false'
+        ]
+        read_only_fields = fields
+
+
 # ─── Live Session Serializer ──────────────────────────────────
 
 class LiveSessionSerializer(serializers.ModelSerializer):
@@ -73,7 +74,7 @@ class ParticipantSerializer(serializers.ModelSerializer):
 # ─── Live Question Serializer ─────────────────────────────────
 
 class LiveQuestionSerializer(serializers.ModelSerializer):
-    question = QuestionSerializer(read_only=True)
+    question = PlayerQuestionSerializer(read_only=True)
     question_id = serializers.PrimaryKeyRelatedField(queryset=Question.objects.all(), source='question', write_only=True)
     session = serializers.SlugRelatedField(slug_field='session_code', queryset=LiveSession.objects.all())
 
@@ -105,7 +106,17 @@ class ParticipantAnswerSerializer(serializers.ModelSerializer):
 # ─── Feedback Serializer ──────────────────────────────────────
 
 class FeedbackSerializer(serializers.ModelSerializer):
+    participant = serializers.PrimaryKeyRelatedField(
+        queryset=Participant.objects.select_related('session')
+    )
+    rating = serializers.IntegerField(min_value=1, max_value=5)
+    comments = serializers.CharField(allow_blank=True, max_length=2000)
+
     class Meta:
         model = Feedback
-        fields = '__all__'
-        read_only_fields = ['submitted_at']
+        fields = ['id', 'participant', 'rating', 'comments']
+
+    def validate_participant(self, participant):
+        if participant.session.is_active:
+            raise serializers.ValidationError("Feedback opens once the session has ended.")
+        return participant
@@ -0,0 +1,106 @@
+import hashlib
+import threading
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from . import live
+
+
+# ─── Session Ownership ───────────────────────────────────────
+#
+# In sharded mode (manage.py runshards) each worker process owns the
+# sessions that rendezvous hashing assigns to it. Removing a shard only
+# moves that shard's sessions, and they move back when it returns.
+#
+# Each worker journals to its own directory, and only that worker replays
+# it, when runshards restarts it. Answers a dead shard had accepted but not
+# yet written are therefore missing from the database until it is back, and
+# the shard its sessions failed over to doesn't see them. If the failover
+# shard accepts another answer from the same player to the same question,
+# whichever reaches the table first is kept.
+
+SHARDS_HEADER = 'X-Quiz-Shards'
+
+
+def _weight(shard, session_code):
+    digest = hashlib.blake2b(f'{shard}/{session_code}'.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
+
+
+def owner(session_code, shards):
+    """The shard (from the iterable of live shard indexes) owning a session."""
+    return max(shards, key=lambda shard: _weight(shard, session_code))
+
+
+def ranked(session_code, shards):
+    """Shards in failover order for a session: owner first."""
+    return sorted(shards, key=lambda shard: _weight(shard, session_code), reverse=True)
+
+
+def format_view(epoch, shards):
+    return f"{epoch};{','.join(map(str, sorted(shards)))}"
+
+
+def parse_view(value):
+    epoch, _, shards = value.partition(';')
+    return int(epoch), [int(shard) for shard in shards.split(',') if shard]
+
+
+# ─── Worker-side Handoff ─────────────────────────────────────
+#
+# The router stamps every request with its current view of the live
+# shards: an epoch that increases on every membership change, plus the
+# list. A worker that sees the view change drops the actors of sessions it
+# no longer owns; if it missed a change it can't know what moved in
+# between, so it drops them all. Dropped actors reload from the database
+# the next time they are needed, so a session that moves back starts fresh.
+
+_seen_epoch = None
+_lock = threading.Lock()
+
+
+def shard_index():
+    return getattr(settings, 'SHARD_INDEX', None)
+
+
+def observe(value):
+    global _seen_epoch
+    index = shard_index()
+    if not value or index is None:
+        return
+    try:
+        epoch, shards = parse_view(value)
+    except ValueError:
+        return
+    with _lock:
+        if epoch == _seen_epoch:
+            return
+        contiguous = _seen_epoch is not None and epoch == _seen_epoch + 1
+        _seen_epoch = epoch
+    if contiguous and shards:
+        live.discard_actors(lambda code: owner(code, shards) != index)
+    else:
+        live.discard_actors(lambda code: True)
+
+
+def ShardViewMiddleware(get_response):
+    """Apply the router's shard view before the request reaches a view."""
+    header = 'HTTP_' + SHARDS_HEADER.upper().replace('-', '_')
+
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            observe(request.META.get(header))
+            return await get_response(request)
+
+        markcoroutinefunction(middleware)
+    else:
+        def middleware(request):
+            observe(request.META.get(header))
+            return get_response(request)
+
+    return middleware
+
+
+ShardViewMiddleware.sync_capable = True
+ShardViewMiddleware.async_capable = True
@@ -0,0 +1,125 @@
+import asyncio
+import json
+import logging
+
+from channels.db import database_sync_to_async
+from channels.exceptions import StopConsumer
+from channels.generic.http import AsyncHttpConsumer
+from django.conf import settings
+
+from . import eventlog, frames, live, metrics, sharding
+from .models import LiveSession
+from .outbound import OutboundQueue
+
+logger = logging.getLogger(__name__)
+
+
+# ─── Event Stream ────────────────────────────────────────────
+#
+# Server-Sent Events for players whose network drops WebSockets. A stream
+# joins the session's channel group like the WebSocket consumer does and
+# turns the same broadcasts into the same frames (frames.EVENT_FRAMES),
+# written as
+#
+#   id: <frame id>
+#   event: <frame type>
+#   data: <JSON frame>
+#
+# Each broadcast is encoded once per process and the bytes are shared by
+# every stream. Events go out through the same bounded, coalescing queue as
+# WebSocket frames (core/outbound.py), so a stream that falls too far behind
+# is ended rather than buffered without limit. It is a Channels consumer rather than a Django view: Django
+# gives every request its own thread-sensitive executor thread, which a
+# long-lived stream would hold for its whole life, while a consumer is only
+# a coroutine and a channel, so idle streams cost memory and no threads.
+
+RETRY_MS = 3000
+HEADERS = [
+    (b'Content-Type', b'text/event-stream'),
+    (b'Cache-Control', b'no-cache'),
+    (b'X-Accel-Buffering', b'no'),     # don't let nginx buffer the stream
+]
+
+
+def _encode(frame, frame_id):
+    lines = []
+    if frame_id is not None:
+        lines.append(f'id: {frame_id}')
+    lines.append(f'event: {frame["type"]}')
+    lines.append(f'data: {frames.dumps(frame)}')
+    return ('\n'.join(lines) + '\n\n').encode()
+
+
+def encode(frame, frame_id=None):
+    return frames.encode_shared('sse', frame, frame_id, lambda frame: _encode(frame, frame_id))
+
+
+class EventStreamConsumer(AsyncHttpConsumer):
+
+    async def http_request(self, message):
+        # The request has no body worth waiting for; the response starts now
+        # and stays open, so don't hand off to handle() (which would close it).
+        self.session_code = self.scope['url_route']['kwargs']['code']
+        sharding.observe(dict(self.scope.get('headers', [])).get(b'x-quiz-shards', b'').decode())
+        exists = await database_sync_to_async(
+            LiveSession.objects.filter(session_code=self.session_code, is_active=True).exists
+        )()
+        if not exists:
+            body = json.dumps({'detail': 'No active session matches the given code.'}).encode()
+            await self.send_response(404, body, headers=[(b'Content-Type', b'application/json')])
+            raise StopConsumer()
+
+        self.group_name = f'session_{self.session_code}'
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        live.tell(self.session_code, 'connect')
+        await self.send_headers(status=200, headers=HEADERS)
+        await self.send_body(f'retry: {RETRY_MS}\n\n'.encode(), more_body=True)
+        self.outbound = OutboundQueue(self.write, settings.WS_SEND_QUEUE_LIMIT)
+        self.heartbeat = asyncio.get_running_loop().create_task(self.keep_alive())
+        metrics.incr('sse.streams_opened')
+
+    async def keep_alive(self):
+        # A comment line now and then stops proxies closing an idle stream.
+        interval = getattr(settings, 'SSE_HEARTBEAT_SECONDS', 15)
+        while True:
+            await asyncio.sleep(interval)
+            await self.send_body(b': keep-alive\n\n', more_body=True)
+
+    async def write(self, data):
+        await self.send_body(data, more_body=True)
+        metrics.incr('sse.frames_sent')
+
+    async def send_event(self, event):
+        frame = frames.event_frame(event)
+        if not self.outbound.push(frame['type'], encode(frame, event.get('frame_id'))):
+            eventlog.event(logger, 'sse.overflow', logging.WARNING, session=self.session_code)
+            await self.end()
+        if frame['type'] == 'session_ended':
+            await self.outbound.flushed()
+            await self.end()
+
+    async def end(self):
+        """Finish the response and stop the consumer."""
+        self.outbound.close()
+        await self.send_body(b'', more_body=False)
+        await self.disconnect()
+        raise StopConsumer()
+
+    # Group broadcast handlers, as on the WebSocket consumer.
+    send_leaderboard = send_event
+    send_question_with_leaderboard = send_event
+    session_ended = send_event
+    send_waiting_on = send_event
+    reveal_answer = send_event
+    send_timer_update = send_event
+    question_skipped = send_event
+
+    async def disconnect(self):
+        if hasattr(self, 'heartbeat'):
+            self.heartbeat.cancel()
+        if hasattr(self, 'outbound'):
+            self.outbound.close()
+        if hasattr(self, 'group_name'):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+            del self.group_name
+            eventlog.event(logger, 'sse.closed', logging.DEBUG, session=self.session_code)
@@ -0,0 +1,206 @@
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+
+from asgiref.sync import sync_to_async
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core import analytics, answers, auth, feedback, frames, journal, live, payloads, results_cache
+from core.models import LiveSession, Participant, Question, Quiz, User
+
+
+# ─── Budgets ─────────────────────────────────────────────────
+#
+# Query, timing and memory budgets live in budgets.json next to these tests.
+# A hot path that runs more queries than its budget, or takes longer (or
+# holds more memory) than its baseline times the tolerance, fails the run. After an intended
+# change, re-record with:
+#
+#   QUIZ_UPDATE_BUDGETS=1 python manage.py test core.tests
+#
+# and commit the updated file with the change.
+
+BUDGETS_PATH = Path(__file__).with_name('budgets.json')
+UPDATE = bool(os.environ.get('QUIZ_UPDATE_BUDGETS'))
+
+
+def load_budgets():
+    with open(BUDGETS_PATH) as f:
+        return json.load(f)
+
+
+def record_budget(section, name, value):
+    budgets = load_budgets()
+    budgets.setdefault(section, {})[name] = value
+    budgets[section] = dict(sorted(budgets[section].items()))
+    with open(BUDGETS_PATH, 'w') as f:
+        json.dump(budgets, f, indent=2)
+        f.write('\n')
+
+
+def timing_tolerance(budgets):
+    return float(os.environ.get('QUIZ_TIMING_TOLERANCE', budgets['timing_tolerance']))
+
+
+class BudgetMixin:
+
+    @contextmanager
+    def assertQueryBudget(self, name):
+        """Fail if the block runs more queries than budgets.json allows for ``name``."""
+        with CaptureQueriesContext(connection) as captured:
+            yield captured
+        count = len(captured.captured_queries)
+        if UPDATE:
+            record_budget('queries', name, count)
+            return
+        budget = load_budgets()['queries'].get(name)
+        self.assertIsNotNone(budget, f"No query budget recorded for {name!r}.")
+        if count > budget:
+            queries = '\n'.join(
+                f"{i}. {query['sql']}" for i, query in enumerate(captured.captured_queries, 1)
+            )
+            self.fail(f"{name}: {count} queries, budget is {budget}:\n{queries}")
+
+    @asynccontextmanager
+    async def assertAsyncQueryBudget(self, name):
+        """
+        ``assertQueryBudget`` for async code. Capture starts and stops on the
+        thread that runs thread-sensitive database calls, so it sees the same
+        connection the consumer's queries use.
+        """
+        budget = self.assertQueryBudget(name)
+        await sync_to_async(budget.__enter__)()
+        try:
+            yield
+        except BaseException:
+            await sync_to_async(budget.__exit__)(*sys.exc_info())
+            raise
+        await sync_to_async(budget.__exit__)(None, None, None)
+
+    def assertTimeBudget(self, name, func, repeat=7, number=None):
+        """
+        Time ``func`` like pytest-benchmark: calibrate a loop count, take the
+        median of ``repeat`` rounds, and compare ms per call to the baseline.
+        """
+        if number is None:
+            number = 1
+            while True:
+                start = time.perf_counter()
+                for _ in range(number):
+                    func()
+                if time.perf_counter() - start >= 0.05 or number >= 10000:
+                    break
+                number *= 2
+        rounds = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            rounds.append((time.perf_counter() - start) * 1000 / number)
+        median = statistics.median(rounds)
+        if UPDATE:
+            record_budget('timings_ms', name, round(median, 4))
+            return median
+        budgets = load_budgets()
+        baseline = budgets['timings_ms'].get(name)
+        self.assertIsNotNone(baseline, f"No timing baseline recorded for {name!r}.")
+        # The floor keeps sub-microsecond paths from failing on timer noise.
+        limit = max(baseline * timing_tolerance(budgets), baseline + budgets['timing_floor_ms'])
+        self.assertLessEqual(
+            median, limit,
+            f"{name}: {median:.3f} ms per call, baseline {baseline} ms (limit {limit:.3f} ms).",
+        )
+        return median
+
+    def assertMemoryBudget(self, name, build, units):
+        """
+        Bytes ``build()``'s result keeps allocated, per one of ``units``
+        (traced with tracemalloc), against the baseline times the tolerance.
+        """
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            kept = build()
+            per_unit = round((tracemalloc.get_traced_memory()[0] - before) / units, 1)
+        finally:
+            tracemalloc.stop()
+        del kept
+        if UPDATE:
+            record_budget('memory_bytes', name, per_unit)
+            return per_unit
+        budgets = load_budgets()
+        baseline = budgets.get('memory_bytes', {}).get(name)
+        self.assertIsNotNone(baseline, f"No memory baseline recorded for {name!r}.")
+        limit = baseline * budgets['memory_tolerance']
+        self.assertLessEqual(
+            per_unit, limit, f"{name}: {per_unit} bytes each, baseline {baseline} (limit {limit:.0f}).",
+        )
+        return per_unit
+
+
+# ─── Fixtures ────────────────────────────────────────────────
+
+def reset_process_state():
+    """Module-level caches outlive a test's database; start each test clean."""
+    results_cache._entries.clear()
+    results_cache._versions.clear()
+    live.discard_actors(lambda code: True)
+    payloads._quizzes.clear()
+    frames._shared.clear()
+    analytics._quizzes.clear()
+    feedback.writer.flush()
+    feedback.writer.stats.clear()
+    answers.writer.flush()
+    journal._journal = None
+    auth.token_cache.clear()
+
+
+class QuizFixtures:
+
+    def setUp(self):
+        super().setUp()
+        reset_process_state()
+        self.host = User.objects.create_user('host', password='secret-pass', is_host=True)
+        self.quiz = Quiz.objects.create(title='Capitals', created_by=self.host)
+        self.questions = Question.objects.bulk_create([
+            Question(
+                quiz=self.quiz, text=f'Question {i}?', option_a='Yes', option_b='No',
+                option_c='Maybe', option_d='Later', correct_option='A',
+            )
+            for i in range(5)
+        ])
+        self.session = LiveSession.objects.create(quiz=self.quiz, host=self.host, session_code='TEST01')
+
+    def tearDown(self):
+        reset_process_state()
+        super().tearDown()
+
+    def auth(self, user=None):
+        return {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(user or self.host)}'}
+
+    def add_players(self, count, session=None):
+        return Participant.objects.bulk_create([
+            Participant(session=session or self.session, name=f'player{i}') for i in range(count)
+        ])
+
+    def push(self, question=None, duration=60):
+        return self.client.post(
+            f'/api/sessions/{self.session.session_code}/push-question/',
+            {'question_id': (question or self.questions[0]).id, 'duration': duration},
+            content_type='application/json', **self.auth(),
+        )
+
+    def answer(self, participant, question=None, option='A'):
+        return self.client.post(
+            '/api/answers/',
+            {'participant': participant.id, 'question': (question or self.questions[0]).id,
+             'selected_option': option},
+            content_type='application/json',
+        )
@@ -0,0 +1,119 @@
+import csv
+import io
+import time
+
+from django.test import TransactionTestCase
+
+from core import purge, reconcile
+from core.models import Feedback, LiveQuestion, LiveSession, Participant, ParticipantAnswer, User
+
+from .base import BudgetMixin, QuizFixtures
+
+
+# ─── Admin ───────────────────────────────────────────────────
+#
+# Changelists are measured with enough rows that a related __str__ or a
+# missing list_select_related would show up as a query per row.
+
+PLAYERS = 30
+
+
+class AdminTests(BudgetMixin, QuizFixtures, TransactionTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.admin = User.objects.create_superuser('ops', password='secret-pass')
+        self.client.force_login(self.admin)
+        self.players = self.add_players(PLAYERS)
+        LiveQuestion.objects.create(session=self.session, question=self.questions[0])
+        ParticipantAnswer.objects.bulk_create([
+            ParticipantAnswer(participant=p, question=self.questions[0], selected_option='A', is_correct=i % 2 == 0)
+            for i, p in enumerate(self.players)
+        ])
+        Feedback.objects.bulk_create([Feedback(participant=p, rating=4, comments='ok') for p in self.players])
+
+    def changelist(self, model):
+        return f'/admin/core/{model}/'
+
+    def action(self, model, action, *pks):
+        return self.client.post(self.changelist(model), {'action': action, '_selected_action': pks})
+
+    def test_changelists_within_query_budget(self):
+        for model in ('user', 'quiz', 'question', 'livesession', 'livequestion',
+                      'participant', 'participantanswer', 'feedback'):
+            with self.subTest(model=model), self.assertQueryBudget(f'admin_{model}_changelist'):
+                response = self.client.get(self.changelist(model))
+            self.assertEqual(response.status_code, 200)
+
+    def test_unfiltered_big_tables_estimate_count(self):
+        response = self.client.get(self.changelist('participantanswer'))
+        self.assertEqual(response.context['cl'].result_count, ParticipantAnswer.objects.latest('id').id)
+        response = self.client.get(self.changelist('participantanswer'), {'is_correct__exact': '1'})
+        self.assertEqual(response.context['cl'].result_count, PLAYERS // 2)
+
+    def test_end_sessions(self):
+        response = self.action('livesession', 'end_sessions', self.session.pk)
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(LiveSession.objects.get().is_active)
+
+    def recompute_scores(self):
+        self.action('livesession', 'recompute_scores', self.session.pk)
+        job = reconcile.worker.get(max(reconcile.worker.jobs))
+        for _ in range(200):
+            if job.finished is not None:
+                return job.progress()
+            time.sleep(0.02)
+        self.fail("Reconciliation did not finish.")
+
+    def test_recompute_scores_skips_live_sessions(self):
+        Participant.objects.update(score=999)
+        self.assertEqual(self.recompute_scores()['skipped_active_sessions'], 1)
+        self.assertEqual(set(Participant.objects.values_list('score', flat=True)), {999})
+
+        LiveSession.objects.update(is_active=False)
+        report = self.recompute_scores()
+        self.assertEqual((report['checked'], report['fixed']), (PLAYERS, PLAYERS))
+        self.assertEqual(report['sessions'], [self.session.pk])
+        self.assertEqual(sorted(set(Participant.objects.values_list('score', flat=True))), [0, 10])
+        self.assertEqual(Participant.objects.filter(score=10).count(), PLAYERS // 2)
+
+    def test_exports(self):
+        response = self.action('livesession', 'export_results', self.session.pk)
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(rows[0], ['session', 'participant', 'name', 'score', 'correct', 'answers'])
+        self.assertEqual(len(rows), PLAYERS + 1)
+        self.assertEqual(sum(int(row[4]) for row in rows[1:]), PLAYERS // 2)
+
+        response = self.action('user', 'export_csv', self.host.pk, self.admin.pk)
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertNotIn('password', rows[0])
+        self.assertEqual(len(rows), 3)
+
+    def test_delete_goes_through_purge(self):
+        with self.assertQueryBudget('admin_livesession_delete_confirm'):
+            response = self.action('livesession', 'delete_selected', self.session.pk)
+        self.assertEqual(response.status_code, 200)
+        response = self.client.post(self.changelist('livesession'), {
+            'action': 'delete_selected', '_selected_action': [self.session.pk], 'post': 'yes',
+        })
+        self.assertEqual(response.status_code, 302)
+        for _ in range(200):
+            if not LiveSession.objects.exists():
+                break
+            time.sleep(0.02)
+        self.assertFalse(Participant.objects.exists())
+        self.assertEqual(purge.worker.get(max(purge.worker.purges)).owner_id, self.admin.id)
+
+    def test_quiz_delete_goes_through_purge(self):
+        response = self.client.post(self.changelist('quiz'), {
+            'action': 'delete_selected', '_selected_action': [self.quiz.pk], 'post': 'yes',
+        })
+        self.assertEqual(response.status_code, 302)
+        job = purge.worker.get(max(purge.worker.purges))
+        self.assertEqual((job.kind, job.target_id, job.label), ('quiz', self.quiz.pk, self.quiz.title))
+        for _ in range(200):
+            if job.finished is not None:
+                break
+            time.sleep(0.02)
+        self.assertEqual(job.progress()['percent'], 100.0)
+        self.assertFalse(Participant.objects.exists())
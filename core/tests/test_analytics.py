@@ -0,0 +1,116 @@
+from unittest import mock, skipUnless
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+
+from core import analytics
+from core.models import LiveQuestion, ParticipantAnswer
+
+from .base import QuizFixtures
+
+np = analytics.load_numpy()
+
+
+def columns(names, rows):
+    table = np.array(rows, dtype=np.int64).reshape(-1, len(names))
+    return {name: table[:, i] for i, name in enumerate(names)}
+
+
+@skipUnless(np, 'question analytics need NumPy')
+class StatisticsTests(SimpleTestCase):
+
+    def test_grouped_median(self):
+        medians = analytics.grouped_median(
+            np, np.array([0, 0, 0, 1, 1, 1]), np.array([3.0, 1.0, 2.0, 5.0, 4.0, np.nan]), 3,
+        )
+        self.assertEqual(medians[:2].tolist(), [2.0, 4.5])
+        self.assertTrue(np.isnan(medians[2]))
+
+    def test_response_time_uses_latest_showing(self):
+        # Question 10 shown twice in session 1; never in session 2.
+        shown = columns(analytics.SCREENING_COLUMNS, [(1, 1, 10, 1000), (2, 1, 10, 5000)])
+        answered = columns(analytics.ANSWER_COLUMNS, [
+            (1, 1, 1, 10, 0, 1, 3000),
+            (2, 2, 1, 10, 0, 1, 6500),
+            (3, 3, 2, 10, 0, 1, 6500),
+            (4, 4, 1, 10, 0, 1, 500),
+        ])
+        seconds = analytics.response_seconds(np, answered, shown)
+        self.assertEqual(seconds[:2].tolist(), [2.0, 1.5])
+        self.assertTrue(np.isnan(seconds[2:]).all())
+
+    def test_report(self):
+        # Players 1-4 answer questions 100-102 (A is right). Player 4 gets
+        # everything wrong, player 2 everything right.
+        right = {1: (100, 102), 2: (100, 101, 102), 3: (100, 102), 4: ()}
+        rows = []
+        for player, correct in right.items():
+            for question in (100, 101, 102):
+                ok = question in correct
+                rows.append((len(rows) + 1, player, 1, question, 0 if ok else 1, int(ok), 0))
+        questions = ((100, 'First'), (101, 'Second'), (102, 'Third'), (103, 'Unused'))
+        report = analytics.compute(
+            np, 7, questions, columns(analytics.ANSWER_COLUMNS, rows),
+            columns(analytics.SCREENING_COLUMNS, []),
+        )
+        self.assertEqual((report['answers'], report['participants']), (12, 4))
+        first, second, third, unused = report['questions']
+
+        self.assertEqual((first['attempts'], first['correct'], first['p_value']), (4, 3, 0.75))
+        self.assertEqual(first['options'], {'A': 3, 'B': 1, 'C': 0, 'D': 0})
+        self.assertEqual(first['discrimination'], 1.0)
+        self.assertEqual(second['p_value'], 0.25)
+        self.assertEqual(second['flags'], ['too_hard'])
+        self.assertEqual(third['flags'], [])
+        self.assertIsNone(first['median_response_seconds'])
+        self.assertEqual((unused['attempts'], unused['p_value'], unused['flags']), (0, None, []))
+
+
+@skipUnless(np, 'question analytics need NumPy')
+class QuizReportTests(QuizFixtures, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.players = self.add_players(4)
+
+    def add_answers(self, players, question, option='A'):
+        ParticipantAnswer.objects.bulk_create([
+            ParticipantAnswer(participant=player, question=question, selected_option=option,
+                              is_correct=option == 'A')
+            for player in players
+        ])
+
+    def test_report_follows_new_and_deleted_answers(self):
+        question = self.questions[0]
+        self.add_answers(self.players[:2], question)
+        self.assertEqual(analytics.quiz_report(self.quiz.id)['questions'][0]['attempts'], 2)
+
+        self.add_answers(self.players[2:], question, 'B')
+        report = analytics.quiz_report(self.quiz.id)
+        self.assertEqual(report['questions'][0]['options'], {'A': 2, 'B': 2, 'C': 0, 'D': 0})
+
+        ParticipantAnswer.objects.filter(selected_option='B').delete()
+        report = analytics.quiz_report(self.quiz.id)
+        self.assertEqual((report['answers'], report['questions'][0]['p_value']), (2, 1.0))
+
+    def test_other_databases_read_the_same_columns(self):
+        self.add_answers(self.players[:2], self.questions[0])
+        self.add_answers(self.players[2:3], self.questions[1], 'b')
+        LiveQuestion.objects.create(session=self.session, question=self.questions[0])
+        sqlite = analytics.QuizColumns(np, self.quiz.id)
+        sqlite.refresh()
+        with mock.patch.object(connection, 'vendor', 'postgresql'):
+            portable = analytics.QuizColumns(np, self.quiz.id)
+            portable.refresh()
+            self.add_answers(self.players[3:], self.questions[1], '?')
+            portable.refresh()
+        sqlite.refresh()
+
+        for table in ('answers', 'screenings'):
+            expected = np.concatenate(getattr(sqlite, table).chunks)
+            rows = np.concatenate(getattr(portable, table).chunks)
+            self.assertEqual(expected.shape, rows.shape)
+            # Timestamps may round a millisecond apart; everything else matches exactly.
+            self.assertTrue((expected[:, :-1] == rows[:, :-1]).all())
+            self.assertLessEqual(np.abs(expected[:, -1] - rows[:, -1]).max(), 1)
+        self.assertEqual(portable.answers.columns()['option'].tolist(), [0, 0, 1, 4])
@@ -0,0 +1,60 @@
+import time
+
+from django.test import TestCase, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.auth import TokenCache, token_cache
+
+from .base import BudgetMixin, QuizFixtures
+
+
+class TokenCacheTests(BudgetMixin, QuizFixtures, TestCase):
+
+    def test_cached_token_skips_user_lookup(self):
+        headers = self.auth()
+        self.client.get(f'/api/quizzes/{self.quiz.id}/', **headers)
+        with self.assertQueryBudget('quiz_detail_cached_token'):
+            response = self.client.get(f'/api/quizzes/{self.quiz.id}/', **headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(token_cache.entries), 1)
+
+    def test_async_view_uses_cache(self):
+        headers = self.auth()
+        self.client.get(f'/api/quizzes/{self.quiz.id}/', **headers)
+        with self.assertQueryBudget('session_summary_cached_token'):
+            response = self.client.get(f'/api/sessions/{self.session.session_code}/summary/', **headers)
+        self.assertEqual(response.status_code, 200)
+
+    def test_deactivating_user_evicts_tokens(self):
+        headers = self.auth()
+        self.assertEqual(self.client.get('/api/quizzes/', **headers).status_code, 200)
+        self.host.is_active = False
+        self.host.save()
+        self.assertEqual(len(token_cache.entries), 0)
+        self.assertEqual(self.client.get('/api/quizzes/', **headers).status_code, 401)
+
+    def test_expired_entry_is_dropped(self):
+        token = AccessToken.for_user(self.host)
+        raw = str(token).encode()
+        token_cache.put(raw, self.host, token)
+        self.assertIsNotNone(token_cache.get(raw))
+        key = token_cache.key(raw)
+        user, validated, _ = token_cache.entries[key]
+        token_cache.entries[key] = (user, validated, 0)
+        self.assertIsNone(token_cache.get(raw))
+        self.assertNotIn(key, token_cache.entries)
+
+    @override_settings(JWT_CACHE_TTL=5)
+    def test_entries_expire_within_the_ttl(self):
+        # Other processes never see this one's invalidations; the TTL bounds them.
+        token = AccessToken.for_user(self.host)
+        cache = TokenCache()
+        cache.put(str(token).encode(), self.host, token)
+        _, _, expires = cache.entries[cache.key(str(token).encode())]
+        self.assertLessEqual(expires, time.time() + 5)
+        self.assertLess(expires, token['exp'])
+
+    def test_bad_token_is_not_cached(self):
+        response = self.client.get('/api/quizzes/', HTTP_AUTHORIZATION='Bearer garbage')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(len(token_cache.entries), 0)
@@ -0,0 +1,129 @@
+import asyncio
+
+from asgiref.sync import async_to_sync
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase
+
+from core import frames, payloads, results_cache
+from core.live import SessionActor
+from core.registry import ParticipantRegistry
+from core.models import LiveQuestion, Participant
+from core.serializers import ParticipantSerializer, QuestionSerializer
+
+from .base import BudgetMixin, QuizFixtures
+
+
+# ─── Timing Budgets ──────────────────────────────────────────
+#
+# Medians of repeated runs compared against budgets.json (see base.py). The
+# tolerance is generous because machines differ; these catch order-of-
+# magnitude regressions such as an accidental O(n²) or a lost cache.
+
+ROOM = 2000
+
+
+class HotPathTimings(BudgetMixin, QuizFixtures, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.players = self.add_players(ROOM)
+        for i, player in enumerate(self.players):
+            player.score = (i * 37) % 1000
+        Participant.objects.bulk_update(self.players, ['score'])
+
+    def test_leaderboard(self):
+        loop = asyncio.new_event_loop()
+        try:
+            actor = SessionActor(self.session.session_code, loop)
+            for player in self.players:
+                actor.participants.add(player.id, player.name, player.score)
+            board = actor.leaderboard()
+            self.assertEqual(len(board), ROOM)
+            self.assertEqual(board[0]['score'], max(player.score for player in self.players))
+            # The actor caches its leaderboard; time building it.
+            self.assertTimeBudget('leaderboard_2000', actor.participants.leaderboard)
+            actor.stop()
+            loop.run_until_complete(asyncio.sleep(0))
+        finally:
+            loop.close()
+
+    def test_participant_serializer(self):
+        players = list(Participant.objects.filter(session=self.session))
+        self.assertTimeBudget(
+            'participant_serializer_2000', lambda: ParticipantSerializer(players, many=True).data,
+        )
+
+    def test_question_serializer(self):
+        questions = list(self.quiz.questions.all())
+        self.assertTimeBudget('question_serializer_5', lambda: QuestionSerializer(questions, many=True).data)
+
+    def test_render_payloads(self):
+        self.assertTimeBudget('render_quiz_payloads', lambda: payloads.render_quiz(self.quiz.id))
+
+    def test_question_frame_encode(self):
+        live_q = LiveQuestion.objects.create(session=self.session, question=self.questions[0])
+        payload = payloads.get(self.quiz.id, self.questions[0].id)
+        board = [{'name': player.name, 'score': player.score} for player in self.players]
+        frame = {
+            'type': 'question_with_leaderboard',
+            'question': frames.RawJSON(payloads.live_question(live_q, self.session.session_code, payload.player)),
+            'start_time': live_q.displayed_at.isoformat(),
+            'duration': 60,
+            'server_time': 1767268800000,
+            'remaining_ms': 60000,
+            'leaderboard': board,
+        }
+        codec = frames.JSONCodec()
+        self.assertTimeBudget('question_frame_encode_2000', lambda: codec.encode(frame))
+        frame_id = frames.new_frame_id()
+        codec.encode(frame, frame_id)
+        self.assertTimeBudget('question_frame_shared_hit', lambda: codec.encode(frame, frame_id))
+
+    def test_results_cache_hit(self):
+        request = RequestFactory().get(f'/api/sessions/{self.session.session_code}/results/')
+        body = frames.dumps({'leaderboard': [{'name': p.name, 'score': p.score} for p in self.players]})
+
+        async def build():
+            return HttpResponse(body, content_type='application/json')
+
+        async def fetch():
+            return await results_cache.cached_json(request, 'results', self.session.session_code, None, build)
+
+        async def hits(count):
+            for _ in range(count):
+                await fetch()
+
+        async_to_sync(fetch)()
+        # Time a loop of hits inside one event loop, not the async_to_sync
+        # round trip around each.
+        self.assertTimeBudget('results_cache_hit_x100', lambda: async_to_sync(hits)(100))
+
+
+# ─── Memory Budgets ──────────────────────────────────────────
+
+BIG_ROOM = 50_000
+QUESTIONS = 20
+
+
+class RegistryMemory(BudgetMixin, SimpleTestCase):
+
+    def build_registry(self, questions=QUESTIONS):
+        registry = ParticipantRegistry()
+        for pid in range(1, BIG_ROOM + 1):
+            registry.add(pid, f'player{pid}')
+        for question_id in range(1, questions + 1):
+            for pid in range(1, BIG_ROOM + 1):
+                correct = (pid + question_id) % 3 == 0
+                registry.record_answer(pid, question_id, correct, 10 if correct else 0, 1767268800000 + pid)
+        return registry
+
+    def test_bytes_per_participant(self):
+        """A 50k-player room that has answered 20 questions, per player."""
+        self.assertMemoryBudget(f'registry_per_participant_{QUESTIONS}q', self.build_registry, BIG_ROOM)
+
+    def test_tally_50k(self):
+        registry = self.build_registry(questions=2)
+        total, correct = registry.tally(2)
+        self.assertEqual(total, BIG_ROOM)
+        self.assertEqual(len(correct), len(range(1, BIG_ROOM + 1, 3)))
+        self.assertTimeBudget('registry_tally_50000', lambda: registry.tally(2), repeat=3)
@@ -0,0 +1,179 @@
+from asgiref.sync import async_to_sync
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.test import TransactionTestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core import live
+from core.auth import JWTAuthMiddleware
+from core.models import LiveQuestion, LiveSession
+from core.routing import websocket_urlpatterns
+
+from .base import BudgetMixin, QuizFixtures
+
+
+# ─── Query Budgets: WebSocket Consumer ───────────────────────
+#
+# TransactionTestCase because the session actor can reach the database from
+# a thread other than the test's, which must see committed rows.
+
+PLAYERS = 25
+
+
+class ConsumerQueries(BudgetMixin, QuizFixtures, TransactionTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.add_players(PLAYERS)
+        self.application = JWTAuthMiddleware(URLRouter(websocket_urlpatterns))
+
+    def communicator(self, user=None):
+        path = f'/ws/session/{self.session.session_code}/'
+        if user is not None:
+            path += f'?token={AccessToken.for_user(user)}'
+        return WebsocketCommunicator(self.application, path)
+
+    async def settle(self):
+        """
+        Wait for the session actor to finish loading, so the load (which may
+        run on another thread) never lands inside a measured block.
+        """
+        await live.get_actor(self.session.session_code).ask('connect')
+
+    async def receive(self, communicator, *frame_types):
+        """Frames until one of each of ``frame_types`` has arrived, keyed by type."""
+        received = {}
+        while not set(frame_types) <= set(received):
+            frame = await communicator.receive_json_from(timeout=5)
+            received[frame['type']] = frame
+        return received
+
+    async def command(self, communicator, name, message, broadcast):
+        async with self.assertAsyncQueryBudget(name):
+            await communicator.send_json_to(message)
+            frames = await self.receive(communicator, 'control_ack', broadcast)
+        return frames[broadcast]
+
+    def test_host_commands(self):
+        question = self.questions[0]
+
+        async def run():
+            host = self.communicator(self.host)
+            async with self.assertAsyncQueryBudget('ws_connect'):
+                connected, _ = await host.connect()
+            self.assertTrue(connected)
+            await self.settle()
+
+            pushed = await self.command(host, 'ws_push_question', {
+                'type': 'push_question', 'question_id': question.id, 'duration': 30,
+            }, 'question_with_leaderboard')
+            self.assertEqual(len(pushed['leaderboard']), PLAYERS)
+            self.assertNotIn('correct_option', pushed['question'])
+            self.assertLessEqual(pushed['remaining_ms'], 30000)
+            self.assertIn('server_time', pushed)
+
+            extended = await self.command(
+                host, 'ws_extend_question', {'type': 'extend_question', 'seconds': 5}, 'timer_update',
+            )
+            self.assertEqual(extended['duration'], 35)
+            paused = await self.command(host, 'ws_pause_question', {'type': 'pause_question'}, 'timer_update')
+            self.assertEqual(paused['state'], 'paused')
+            self.assertGreater(paused['remaining_ms'], 30000)
+            await self.command(host, 'ws_resume_question', {'type': 'resume_question'}, 'timer_update')
+            revealed = await self.command(host, 'ws_reveal_answer', {'type': 'reveal_answer'}, 'reveal_answer')
+            self.assertEqual(revealed['correct_option'], 'A')
+            await self.receive(host, 'waiting_on')
+
+            await self.command(host, 'ws_push_question', {
+                'type': 'push_question', 'question_id': self.questions[1].id,
+            }, 'question_with_leaderboard')
+            await self.command(host, 'ws_skip_question', {'type': 'skip_question'}, 'question_skipped')
+            await self.command(host, 'ws_end_session', {'type': 'end_session'}, 'session_ended')
+            await host.disconnect()
+
+        async_to_sync(run)()
+        self.assertEqual(LiveQuestion.objects.count(), 2)
+        self.assertFalse(LiveSession.objects.get().is_active)
+
+    def test_player_cannot_control(self):
+        async def run():
+            player = self.communicator()
+            connected, _ = await player.connect()
+            self.assertTrue(connected)
+            await self.settle()
+            async with self.assertAsyncQueryBudget('ws_rejected_command'):
+                await player.send_json_to({'type': 'end_session'})
+                frame = await player.receive_json_from(timeout=5)
+            self.assertEqual(frame['type'], 'error')
+            await player.disconnect()
+
+        async_to_sync(run)()
+        self.assertTrue(LiveSession.objects.get().is_active)
+
+    def test_malformed_message_gets_an_error_frame(self):
+        async def run():
+            player = self.communicator()
+            connected, _ = await player.connect()
+            self.assertTrue(connected)
+            for message in ('{"type": ', '[1, 2]'):
+                await player.send_to(text_data=message)
+                frame = await player.receive_json_from(timeout=5)
+                self.assertEqual((frame['type'], frame['error']), ('error', 'Malformed message.'))
+            # The socket is still usable afterwards.
+            await player.send_json_to({'type': 'end_session'})
+            self.assertEqual((await player.receive_json_from(timeout=5))['command'], 'end_session')
+            await player.disconnect()
+
+        async_to_sync(run)()
+
+    def test_bad_timer_values_get_error_frames(self):
+        async def run():
+            host = self.communicator(self.host)
+            connected, _ = await host.connect()
+            self.assertTrue(connected)
+            question_id = self.questions[0].id
+            for message in (
+                {'type': 'push_question', 'question_id': question_id, 'duration': 'abc'},
+                {'type': 'push_question', 'question_id': question_id, 'duration': -5},
+            ):
+                await host.send_json_to(message)
+                frame = await host.receive_json_from(timeout=5)
+                self.assertEqual((frame['type'], frame['command']), ('error', 'push_question'))
+
+            await host.send_json_to({'type': 'push_question', 'question_id': question_id})
+            await self.receive(host, 'control_ack', 'question_with_leaderboard')
+            for seconds in ('x', 0):
+                await host.send_json_to({'type': 'extend_question', 'seconds': seconds})
+                frame = (await self.receive(host, 'error'))['error']
+                self.assertEqual(frame['command'], 'extend_question')
+            await host.disconnect()
+
+        async_to_sync(run)()
+        self.assertEqual(LiveQuestion.objects.get().duration_seconds, 60)
+        # HTTP runs the same check.
+        self.assertEqual(self.push(duration=-5).status_code, 400)
+
+    def test_invalid_token_connects_as_player(self):
+        async def run():
+            communicator = WebsocketCommunicator(
+                self.application, f'/ws/session/{self.session.session_code}/?token=not-a-jwt',
+            )
+            connected, _ = await communicator.connect()
+            self.assertTrue(connected)
+            await communicator.send_json_to({'type': 'end_session'})
+            frame = await communicator.receive_json_from(timeout=5)
+            self.assertEqual(frame['type'], 'error')
+            await communicator.disconnect()
+
+        async_to_sync(run)()
+        self.assertTrue(LiveSession.objects.get().is_active)
+
+    def test_unknown_session(self):
+        async def run():
+            communicator = WebsocketCommunicator(self.application, '/ws/session/NOPE00/')
+            async with self.assertAsyncQueryBudget('ws_connect_unknown'):
+                connected, code = await communicator.connect()
+            self.assertFalse(connected)
+            self.assertEqual(code, 4404)
+
+        async_to_sync(run)()
@@ -0,0 +1,58 @@
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+from django.utils import timezone
+
+from core.deadlines import NS_PER_SECOND, Deadline, server_time_ms
+
+
+@override_settings(LIVE_ANSWER_GRACE_MS=500)
+class DeadlineTests(SimpleTestCase):
+
+    def at(self, offset_seconds):
+        """Patch the monotonic clock to ``offset_seconds`` after now."""
+        now = time.monotonic_ns() + int(offset_seconds * NS_PER_SECOND)
+        return mock.patch('core.deadlines.time.monotonic_ns', return_value=now)
+
+    def test_accepts_through_grace_window(self):
+        deadline = Deadline()
+        deadline.start(10)
+        with self.at(9.9):
+            self.assertTrue(deadline.accepts())
+        with self.at(10.4):
+            self.assertTrue(deadline.accepts())
+            self.assertEqual(deadline.remaining_ms(), 0)
+        with self.at(10.6):
+            self.assertFalse(deadline.accepts())
+
+    def test_closed_by_default_and_after_close(self):
+        deadline = Deadline()
+        self.assertFalse(deadline.accepts())
+        deadline.start(10)
+        deadline.close()
+        self.assertFalse(deadline.accepts())
+        self.assertFalse(deadline.paused)
+
+    def test_pause_resume_keeps_remaining(self):
+        deadline = Deadline()
+        deadline.start(10)
+        with self.at(4):
+            deadline.pause()
+        self.assertTrue(deadline.paused)
+        self.assertFalse(deadline.accepts())
+        self.assertAlmostEqual(deadline.remaining_seconds(), 6, places=1)
+        deadline.extend(5)
+        self.assertAlmostEqual(deadline.remaining_seconds(), 11, places=1)
+        deadline.resume()
+        self.assertTrue(deadline.accepts())
+        self.assertAlmostEqual(deadline.reveal_delay(), 11.5, places=1)
+
+    def test_wall_clock_round_trip(self):
+        deadline = Deadline()
+        deadline.restore(timezone.now() + timedelta(seconds=30))
+        self.assertAlmostEqual(
+            (deadline.expires_at() - timezone.now()).total_seconds(), 30, places=1,
+        )
+        self.assertAlmostEqual(server_time_ms() / 1000, time.time(), places=0)
@@ -0,0 +1,74 @@
+import threading
+
+from django.test import TransactionTestCase, override_settings
+
+from core import feedback
+from core.models import Feedback
+
+from .base import QuizFixtures
+
+
+class FeedbackWriterTests(QuizFixtures, TransactionTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.players = self.add_players(3)
+        self.writer = feedback.FeedbackWriter()
+
+    def submit(self, participant_id, rating):
+        self.writer.submit(Feedback(participant_id=participant_id, rating=rating, comments=''), self.session.id)
+
+    def test_pending_rows_count_until_flushed(self):
+        self.submit(self.players[0].id, 5)
+        self.assertEqual(self.writer.session_stats(self.session.id)['count'], 1)
+        self.submit(self.players[1].id, 3)
+        self.assertEqual(self.writer.flush(), 2)
+        self.assertEqual(Feedback.objects.count(), 2)
+        self.assertEqual(self.writer.session_stats(self.session.id), {
+            'count': 2, 'average': 4.0, 'histogram': {'1': 0, '2': 0, '3': 1, '4': 0, '5': 1},
+        })
+
+    def test_submit_does_not_wait_for_a_flush(self):
+        self.writer = feedback.FeedbackWriter(flush_interval=3600)
+        started, release = threading.Event(), threading.Event()
+        write = self.writer._write
+
+        def slow_write(batch):
+            started.set()
+            release.wait(5)
+            write(batch)
+
+        self.writer._write = slow_write
+        self.submit(self.players[0].id, 5)
+        flushing = threading.Thread(target=self.writer.flush)
+        flushing.start()
+        self.assertTrue(started.wait(5))
+        self.submit(self.players[1].id, 3)
+        self.assertEqual(len(self.writer.pending), 1)
+        release.set()
+        flushing.join()
+
+        self.assertEqual(Feedback.objects.count(), 1)
+        self.assertEqual(self.writer.session_stats(self.session.id)['count'], 2)
+        self.assertEqual(self.writer.flush(), 1)
+
+    @override_settings(FEEDBACK_MAX_ATTEMPTS=2)
+    def test_failed_batch_rolls_back_then_bad_rows_are_set_aside(self):
+        self.writer = feedback.FeedbackWriter()
+        self.writer.session_stats(self.session.id)
+        self.submit(self.players[0].id, 5)
+        self.submit(999999, 1)      # no such participant
+        self.submit(self.players[1].id, 4)
+
+        with self.assertLogs('core.feedback', 'ERROR') as logs:
+            self.assertEqual(self.writer.flush(), 0)
+            # Nothing of the batch was kept, and no row holds on to a pk.
+            self.assertEqual(Feedback.objects.count(), 0)
+            self.assertEqual([entry[0].pk for entry in self.writer.pending], [None, None, None])
+
+            self.assertEqual(self.writer.flush(), 2)
+        self.assertIn('participant 999999', logs.output[-1])
+        self.assertEqual(self.writer.pending, [])
+        self.assertEqual([entry[0].participant_id for entry in self.writer.rejected], [999999])
+        self.assertEqual(sorted(Feedback.objects.values_list('rating', flat=True)), [4, 5])
+        self.assertEqual(self.writer.session_stats(self.session.id)['average'], 4.5)
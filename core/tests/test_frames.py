@@ -0,0 +1,66 @@
+import json
+from unittest import skipUnless
+
+from django.test import SimpleTestCase
+
+from core import frames
+
+
+def leaderboard_frame(players=20):
+    return {
+        'type': 'leaderboard',
+        'leaderboard': [{'name': f'player{i}', 'score': 10 * i} for i in range(players)],
+    }
+
+
+class FrameCodecTests(SimpleTestCase):
+
+    def setUp(self):
+        frames._shared.clear()
+
+    def test_negotiate(self):
+        self.assertIsInstance(frames.negotiate([]), frames.JSONCodec)
+        self.assertIsInstance(frames.negotiate(['other', frames.DEFLATE_SUBPROTOCOL]), frames.DeflateCodec)
+
+    def test_raw_json_values_are_spliced_in(self):
+        frame = {'type': 'question_with_leaderboard', 'question': frames.RawJSON(b'{"id": 1}'), 'duration': 30}
+        self.assertEqual(json.loads(frames.dumps(frame)), {
+            'type': 'question_with_leaderboard', 'question': {'id': 1}, 'duration': 30,
+        })
+
+    def test_broadcast_is_encoded_once(self):
+        codec, frame_id = frames.DeflateCodec(), frames.new_frame_id()
+        first = codec.encode(leaderboard_frame(), frame_id)
+        self.assertIs(codec.encode(leaderboard_frame(), frame_id)[0][1], first[0][1])
+        self.assertEqual(len(frames._shared), 1)
+
+    def test_deflate_round_trip(self):
+        frame = leaderboard_frame()
+        [(kind, data)] = frames.DeflateCodec().encode(frame)
+        self.assertEqual(kind, 'leaderboard')
+        self.assertIsInstance(data, bytes)
+        self.assertLess(len(data), len(frames.dumps(frame)) / 2)
+        # A client inflates with the same preset dictionary.
+        self.assertEqual(json.loads(frames.inflate(data)), frame)
+        self.assertEqual(frames.DeflateCodec().decode(frames.deflate('{"type": "reveal_answer"}')),
+                         {'type': 'reveal_answer'})
+        self.assertEqual(frames.DeflateCodec().decode('{"type": "ping"}'), {'type': 'ping'})
+
+    @skipUnless(frames.load_msgpack(), 'msgpack frames need msgpack')
+    def test_msgpack_interns_names_per_connection(self):
+        msgpack = frames.load_msgpack()
+        codec = frames.MsgpackCodec(msgpack)
+        encoded = codec.encode(leaderboard_frame(2))
+        self.assertEqual([kind for kind, _ in encoded], ['names', 'leaderboard'])
+        self.assertEqual(msgpack.unpackb(encoded[0][1]), [frames.NAMES, [0, 'player0', 1, 'player1']])
+        self.assertEqual(msgpack.unpackb(encoded[1][1]), [frames.FRAME_IDS['leaderboard'], [0, 0, 1, 10]])
+
+        # Known names go as ids; only the newcomer is announced.
+        [names, (kind, data)] = codec.encode({'type': 'waiting_on', 'players': ['player1', 'late']})
+        self.assertEqual(msgpack.unpackb(names[1]), [frames.NAMES, [2, 'late']])
+        self.assertEqual(msgpack.unpackb(data), [frames.FRAME_IDS['waiting_on'], [1, 2]])
+        self.assertEqual(len(codec.encode({'type': 'session_ended', 'message': 'bye'})), 1)
+
+        self.assertEqual(codec.decode(msgpack.packb({'type': 'ping'})), {'type': 'ping'})
+        with self.assertRaises(ValueError):
+            codec.encode({'type': 'unknown'})
@@ -0,0 +1,163 @@
+import os
+import tempfile
+import threading
+import time
+from datetime import timedelta
+
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from core import answers, journal, live
+from core.models import Participant, ParticipantAnswer
+
+from .base import QuizFixtures
+
+
+def answer_record(participant, question, correct=True, at=None):
+    record = {
+        'kind': 'answer', 'session': 'TEST01', 'participant': participant, 'question': question,
+        'option': 'A' if correct else 'B', 'correct': correct, 'points': 10 if correct else 0,
+    }
+    if at is not None:
+        record['at'] = at.isoformat()
+    return record
+
+
+class JournalTests(SimpleTestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_segments_roll_over_and_drain(self):
+        log = journal.Journal(self.directory.name, segment_bytes=400)
+        log.append({'kind': 'push', 'session': 'TEST01', 'live_question': 1}).result(timeout=5)
+        futures = [log.append(answer_record(pid, 1)) for pid in range(20)]
+        for future in futures:
+            future.result(timeout=5)
+        segments = {future.segment for future in futures}
+        self.assertGreater(len(segments), 1)
+        self.assertEqual(len(log.segment_paths()), len(segments))
+        # A new segment opens with a snapshot of the open sessions.
+        latest = [record for record in log.read() if record['kind'] == 'snapshot']
+        self.assertEqual(latest[-1]['live_question'], 1)
+
+        # Segments go once every answer in them has reached the database.
+        counts = {segment: sum(1 for f in futures if f.segment == segment) for segment in segments}
+        log.release(counts)
+        self.assertEqual(log.segment_paths(), [log.segment.name])
+
+    def test_group_commit(self):
+        log = journal.Journal(self.directory.name)
+        futures = []
+        threads = [
+            threading.Thread(target=lambda n=n: futures.extend(
+                log.append(answer_record(n * 100 + i, 1)) for i in range(50)
+            ))
+            for n in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for future in futures:
+            future.result(timeout=5)
+        self.assertEqual(log.records, 200)
+        self.assertLess(log.commits, log.records)
+        self.assertEqual(sum(1 for record in log.read() if record['kind'] == 'answer'), 200)
+
+    def test_corrupt_tail_ends_the_segment(self):
+        log = journal.Journal(self.directory.name)
+        for pid in range(3):
+            log.append(answer_record(pid, 1)).result(timeout=5)
+        with open(log.segment.name, 'ab') as segment:
+            segment.write(b'0000dead {"kind": "answer"')
+        self.assertEqual([record['participant'] for record in journal.Journal(self.directory.name).read()], [0, 1, 2])
+
+
+class RecoveryTests(QuizFixtures, TransactionTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        settings = override_settings(LIVE_JOURNAL_DIR=self.directory.name, LIVE_ANSWER_GRACE_MS=0)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.players = self.add_players(3)
+
+    def test_recover_replays_missing_answers(self):
+        accepted = timezone.now() - timedelta(hours=1)
+        log = journal.get_journal()
+        question = self.questions[0].id
+        log.append({'kind': 'push', 'session': 'TEST01', 'live_question': 1})
+        for player in self.players[:2]:
+            log.append(answer_record(player.id, question, at=accepted)).result(timeout=5)
+        log.append(answer_record(self.players[2].id, question, correct=False, at=accepted)).result(timeout=5)
+        # The first answer reached the table before the crash; the rest didn't.
+        ParticipantAnswer.objects.create(
+            participant=self.players[0], question=self.questions[0], selected_option='A', is_correct=True,
+        )
+        Participant.objects.filter(id=self.players[0].id).update(score=10)
+
+        journal._journal = None     # a fresh process
+        self.assertEqual(journal.recover(), (2, 1))
+        self.assertEqual(ParticipantAnswer.objects.count(), 3)
+        self.assertEqual(dict(Participant.objects.values_list('id', 'score')), {
+            self.players[0].id: 10, self.players[1].id: 10, self.players[2].id: 0,
+        })
+        replayed = ParticipantAnswer.objects.get(participant=self.players[1])
+        self.assertEqual(replayed.answered_at, accepted)
+        # Recovery starts a fresh segment holding just the session's snapshot,
+        # so a second run has no answers left to replay.
+        self.assertEqual(len(os.listdir(self.directory.name)), 1)
+        journal._journal = None
+        self.assertEqual(journal.recover(), (0, 1))
+
+    def test_journaled_answer_keeps_accept_time_and_counts_at_reveal(self):
+        self.assertEqual(self.push().status_code, 201)
+        before = timezone.now()
+        self.assertEqual(self.answer(self.players[0]).status_code, 201)
+        self.assertEqual(self.answer(self.players[0]).status_code, 400)
+        time.sleep(0.05)
+        answers.writer.flush()
+        stored = ParticipantAnswer.objects.get()
+        self.assertLess(stored.answered_at - before, timedelta(seconds=1))
+        self.assertEqual(Participant.objects.get(id=self.players[0].id).score, 10)
+
+        actor = live._actors[self.session.session_code]
+        self.assertEqual(actor.unconfirmed, {})
+        self.assertEqual(actor.participants.tally(self.questions[0].id), (1, [self.players[0].name]))
+
+
+class AnswerWriterTests(QuizFixtures, TransactionTestCase):
+
+    def entry(self, participant_id, answered_at=None):
+        return ParticipantAnswer(
+            participant_id=participant_id, question_id=self.questions[0].id, selected_option='A',
+            is_correct=True, answered_at=answered_at or timezone.now(),
+        )
+
+    def test_flush_keeps_accept_time(self):
+        player, = self.add_players(1)
+        accepted = timezone.now() - timedelta(minutes=5)
+        writer = answers.AnswerWriter()
+        writer.submit(self.entry(player.id, accepted), self.session.id, 10, None)
+        self.assertEqual(writer.flush(), 1)
+        self.assertEqual(ParticipantAnswer.objects.get().answered_at, accepted)
+        self.assertEqual(Participant.objects.get().score, 10)
+
+    @override_settings(ANSWER_MAX_ATTEMPTS=2)
+    def test_bad_row_is_set_aside(self):
+        good, = self.add_players(1)
+        writer = answers.AnswerWriter()
+        writer.submit(self.entry(good.id), self.session.id, 10, None)
+        writer.submit(self.entry(999999), self.session.id, 10, None)     # no such participant
+        with self.assertLogs('core.answers', 'ERROR'):
+            self.assertEqual(writer.flush(), 0)
+            self.assertEqual(len(writer.pending), 2)
+            self.assertEqual(writer.flush(), 1)
+        self.assertEqual(writer.pending, [])
+        self.assertEqual([entry[0].participant_id for entry in writer.rejected], [999999])
+        self.assertEqual(ParticipantAnswer.objects.get().participant_id, good.id)
+        self.assertEqual(Participant.objects.get().score, 10)
@@ -0,0 +1,72 @@
+import asyncio
+
+from asgiref.sync import async_to_sync
+from django.test import SimpleTestCase
+
+from core.outbound import OutboundQueue
+
+
+class OutboundQueueTests(SimpleTestCase):
+
+    def run_queue(self, limit, scenario):
+        """Run ``scenario(queue, sent)`` against a client that reads only once released."""
+        sent = []
+        release = asyncio.Event()
+
+        async def send(data):
+            await release.wait()
+            sent.append(data)
+
+        async def run():
+            queue = OutboundQueue(send, limit)
+            queue.push('question_with_leaderboard', 'q1')
+            await asyncio.sleep(0)      # the writer takes q1 and blocks on the client
+            result = scenario(queue)
+            release.set()
+            for _ in range(10):
+                await asyncio.sleep(0)
+            queue.close()
+            return result
+
+        return async_to_sync(run)(), sent
+
+    def test_state_frames_coalesce_behind_a_slow_client(self):
+        def scenario(queue):
+            for n in range(3):
+                queue.push('leaderboard', f'board{n}')
+            queue.push('reveal_answer', 'reveal')
+            queue.push('waiting_on', 'waiting')
+            queue.push('leaderboard', 'board3')
+            return len(queue.frames)
+
+        queued, sent = self.run_queue(10, scenario)
+        self.assertEqual(queued, 3)
+        # The leaderboard keeps its place in line but carries the newest data.
+        self.assertEqual(sent, ['q1', 'board3', 'reveal', 'waiting'])
+
+    def test_frame_after_new_names_is_not_moved_ahead_of_them(self):
+        def scenario(queue):
+            queue.push('leaderboard', 'board0')
+            queue.push('reveal_answer', 'reveal')
+            # A msgpack leaderboard naming a newcomer: its ids are defined by
+            # the names frame, so it can't go out in board0's earlier slot.
+            queue.push('names', 'names')
+            queue.push('leaderboard', 'board1', in_place=False)
+            return len(queue.frames)
+
+        queued, sent = self.run_queue(10, scenario)
+        self.assertEqual(queued, 3)
+        self.assertEqual(sent, ['q1', 'reveal', 'names', 'board1'])
+
+    def test_overflow(self):
+        def scenario(queue):
+            return [
+                queue.push('reveal_answer', 'reveal'),
+                queue.push('question_skipped', 'skipped'),
+                queue.push('timer_update', 'timer'),         # full: a state frame is dropped
+                queue.push('question_with_leaderboard', 'q2'),  # full: the client is cut off
+            ]
+
+        results, sent = self.run_queue(2, scenario)
+        self.assertEqual(results, [True, True, True, False])
+        self.assertEqual(sent, ['q1', 'reveal', 'skipped'])
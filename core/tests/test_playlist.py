@@ -0,0 +1,178 @@
+import time
+
+from asgiref.sync import async_to_sync
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from rest_framework.exceptions import ValidationError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core import live, playlist
+from core.auth import JWTAuthMiddleware
+from core.models import LiveQuestion, LiveSession
+from core.routing import websocket_urlpatterns
+
+from .base import QuizFixtures
+
+
+class ParseTests(SimpleTestCase):
+
+    def test_defaults_fill_in_items(self):
+        parsed = playlist.parse([1, {'question_id': 2, 'duration': 5, 'reveal_seconds': 0}], 20, 3)
+        self.assertEqual(
+            [(i.question_id, i.duration, i.reveal_seconds) for i in parsed.items], [(1, 20, 3.0), (2, 5, 0.0)],
+        )
+        self.assertEqual(parsed.progress()['position'], -1)
+
+    def test_rejects_bad_items(self):
+        for items in ([], None, [{'duration': 5}], [{'question_id': 1, 'duration': 0}]):
+            with self.assertRaises(ValidationError):
+                playlist.parse(items)
+        with self.assertRaises(ValidationError):
+            playlist.parse([1], reveal_seconds=-1)
+
+
+@override_settings(LIVE_ANSWER_GRACE_MS=0)
+class PlaylistTests(QuizFixtures, TransactionTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.add_players(3)
+        self.application = JWTAuthMiddleware(URLRouter(websocket_urlpatterns))
+
+    async def connect_host(self):
+        communicator = WebsocketCommunicator(
+            self.application, f'/ws/session/{self.session.session_code}/?token={AccessToken.for_user(self.host)}',
+        )
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        return communicator
+
+    async def frames(self, communicator, until):
+        """Frame types (with question ids) in arrival order, up to a frame of type ``until``."""
+        received = []
+        while True:
+            frame = await communicator.receive_json_from(timeout=5)
+            if frame['type'] == 'question_with_leaderboard':
+                question_id = frame['question']['question']['id']
+            else:
+                question_id = frame.get('question_id')
+            received.append((frame['type'], question_id))
+            if frame['type'] == until:
+                return received
+
+    def test_runs_to_the_end_without_the_host(self):
+        first, second = self.questions[0].id, self.questions[1].id
+
+        async def run():
+            host = await self.connect_host()
+            await host.send_json_to({
+                'type': 'start_playlist', 'reveal_seconds': 0, 'end_when_done': True,
+                'items': [{'question_id': first, 'duration': 1}, {'question_id': second, 'duration': 1}],
+            })
+            received = await self.frames(host, 'session_ended')
+            await host.disconnect()
+            return [frame for frame in received if frame[0] not in ('control_ack', 'waiting_on')]
+
+        self.assertEqual(async_to_sync(run)(), [
+            ('question_with_leaderboard', first), ('reveal_answer', first),
+            ('question_with_leaderboard', second), ('reveal_answer', second),
+            ('session_ended', None),
+        ])
+        self.assertEqual(LiveQuestion.objects.count(), 2)
+        self.assertFalse(LiveSession.objects.get().is_active)
+
+    def test_manual_push_stops_playlist(self):
+        code = self.session.session_code
+
+        async def run():
+            await live.control(code, self.host, 'playlist', items=[q.id for q in self.questions], duration=30)
+            await live.control(code, self.host, 'push', question_id=self.questions[4].id)
+            await live.control(code, self.host, 'reveal')
+            actor = live.get_actor(code)
+            return actor.playlist, actor.timer
+
+        self.assertEqual(async_to_sync(run)(), (None, None))
+        self.assertEqual(
+            list(LiveQuestion.objects.values_list('question_id', flat=True).order_by('id')),
+            [self.questions[0].id, self.questions[4].id],
+        )
+
+    def test_stop_cancels_pending_advance(self):
+        code = self.session.session_code
+
+        async def run():
+            await live.control(code, self.host, 'playlist', items=[q.id for q in self.questions[:2]])
+            await live.control(code, self.host, 'skip')
+            actor = live.get_actor(code)
+            self.assertIsNotNone(actor.timer)
+            stopped = await live.control(code, self.host, 'stop_playlist')
+            return stopped, actor.playlist, actor.timer
+
+        stopped, remaining, timer = async_to_sync(run)()
+        self.assertEqual(stopped['position'], 0)
+        self.assertEqual(stopped['next_question_id'], self.questions[1].id)
+        self.assertIsNone(remaining)
+        self.assertIsNone(timer)
+
+    def test_http_start_and_errors(self):
+        url = f'/api/sessions/{self.session.session_code}/playlist/'
+        response = self.client.post(
+            url, {'items': [self.questions[0].id, 999999]}, content_type='application/json', **self.auth(),
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(LiveQuestion.objects.count(), 0)
+
+        response = self.client.post(url, {'items': []}, content_type='application/json', **self.auth())
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(
+            url, {'items': [q.id for q in self.questions], 'duration': 20},
+            content_type='application/json', **self.auth(),
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['position'], 0)
+        self.assertEqual(response.json()['total'], 5)
+        self.assertEqual(LiveQuestion.objects.get().duration_seconds, 20)
+
+        response = self.client.delete(url, **self.auth())
+        self.assertEqual(response.status_code, 200)
+
+    def test_http_start_keeps_advancing_after_the_request(self):
+        first, second = self.questions[0].id, self.questions[1].id
+        response = self.client.post(
+            f'/api/sessions/{self.session.session_code}/playlist/',
+            {'items': [first, second], 'duration': 1, 'reveal_seconds': 0, 'end_when_done': True},
+            content_type='application/json', **self.auth(),
+        )
+        self.assertEqual(response.status_code, 201)
+        for _ in range(150):
+            if not LiveSession.objects.get().is_active:
+                break
+            time.sleep(0.05)
+        self.assertFalse(LiveSession.objects.get().is_active)
+        self.assertEqual(
+            list(LiveQuestion.objects.order_by('id').values_list('question_id', flat=True)), [first, second],
+        )
+
+    def test_http_start_keeps_advancing_once_a_socket_connects(self):
+        ids = [q.id for q in self.questions[:3]]
+        response = self.client.post(
+            f'/api/sessions/{self.session.session_code}/playlist/',
+            {'items': ids, 'duration': 1, 'reveal_seconds': 0, 'end_when_done': True},
+            content_type='application/json', **self.auth(),
+        )
+        self.assertEqual(response.status_code, 201)
+
+        async def run():
+            # Connects while the first question is open on the background loop.
+            host = await self.connect_host()
+            received = await self.frames(host, 'session_ended')
+            await host.disconnect()
+            return [frame for frame in received if frame[0] == 'question_with_leaderboard']
+
+        self.assertEqual(async_to_sync(run)(), [
+            ('question_with_leaderboard', ids[1]), ('question_with_leaderboard', ids[2]),
+        ])
+        self.assertEqual(list(LiveQuestion.objects.order_by('id').values_list('question_id', flat=True)), ids)
+        self.assertFalse(LiveSession.objects.get().is_active)
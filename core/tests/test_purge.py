@@ -0,0 +1,71 @@
+import time
+
+from django.test import TransactionTestCase
+
+from core import purge
+from core.models import Feedback, LiveQuestion, LiveSession, Participant, ParticipantAnswer, Question, Quiz, User
+
+from .base import QuizFixtures
+
+
+class PurgeTests(QuizFixtures, TransactionTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.other = LiveSession.objects.create(quiz=self.quiz, host=self.host, session_code='KEEP01')
+        for session in (self.session, self.other):
+            players = self.add_players(30, session)
+            live_q = LiveQuestion.objects.create(session=session, question=self.questions[0])
+            ParticipantAnswer.objects.bulk_create([
+                ParticipantAnswer(participant=p, question=live_q.question, selected_option='A', is_correct=True)
+                for p in players
+            ])
+            Feedback.objects.bulk_create([Feedback(participant=p, rating=3, comments='') for p in players])
+
+    def wait(self, purge_id):
+        for _ in range(200):
+            response = self.client.get(f'/api/purges/{purge_id}/', **self.auth())
+            if response.json()['state'] in ('done', 'failed'):
+                return response.json()
+            time.sleep(0.02)
+        self.fail("Purge did not finish.")
+
+    def test_session_purge_in_chunks(self):
+        job = purge.execute(purge.purge_session(self.session, chunk_size=7, pause=0))
+        progress = job.progress()
+        self.assertEqual(progress['state'], 'done')
+        self.assertEqual(progress['deleted'], {
+            'answers': 30, 'feedback': 30, 'live_questions': 1, 'participants': 30, 'sessions': 1,
+        })
+        self.assertEqual(progress['rows_deleted'], progress['rows_total'])
+        self.assertFalse(LiveSession.objects.filter(id=self.session.id).exists())
+        # The other session on the same quiz is untouched.
+        self.assertEqual(Participant.objects.filter(session=self.other).count(), 30)
+        self.assertEqual(ParticipantAnswer.objects.count(), 30)
+        self.assertEqual(Feedback.objects.count(), 30)
+
+    def test_session_purge_endpoint(self):
+        intruder = User.objects.create_user('intruder', password='secret-pass', is_host=True)
+        response = self.client.post(f'/api/sessions/{self.session.session_code}/purge/', **self.auth(intruder))
+        self.assertEqual(response.status_code, 404)
+
+        response = self.client.post(f'/api/sessions/{self.session.session_code}/purge/', **self.auth())
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(self.client.get(f"/api/purges/{response.json()['id']}/", **self.auth(intruder)).status_code, 404)
+        self.assertEqual(self.wait(response.json()['id'])['state'], 'done')
+        self.assertEqual(LiveSession.objects.count(), 1)
+
+    def test_quiz_delete_purges_everything(self):
+        intruder = User.objects.create_user('intruder', password='secret-pass', is_host=True)
+        self.assertEqual(self.client.delete(f'/api/quizzes/{self.quiz.id}/', **self.auth(intruder)).status_code, 404)
+        self.assertTrue(Quiz.objects.exists())
+
+        response = self.client.delete(f'/api/quizzes/{self.quiz.id}/', **self.auth())
+        self.assertEqual(response.status_code, 202)
+        progress = self.wait(response.json()['id'])
+        self.assertEqual(progress['state'], 'done')
+        self.assertEqual(progress['deleted']['sessions'], 2)
+        self.assertEqual(progress['rows_deleted'], progress['rows_total'])
+        self.assertEqual(progress['percent'], 100.0)
+        for model in (Quiz, Question, LiveSession, Participant, ParticipantAnswer, Feedback, LiveQuestion):
+            self.assertFalse(model.objects.exists(), model.__name__)
@@ -0,0 +1,181 @@
+from unittest import skipUnless
+
+from django.test import TestCase
+
+from core import analytics
+from core.models import Feedback, LiveQuestion, LiveSession, ParticipantAnswer, User
+
+from .base import BudgetMixin, QuizFixtures
+
+
+# ─── Query Budgets: HTTP Endpoints ───────────────────────────
+#
+# Each endpoint is exercised with enough rows that an N+1 would show up as
+# extra queries: several questions, many participants, answers and ratings.
+
+PLAYERS = 25
+
+
+class AccountAndQuizQueries(BudgetMixin, QuizFixtures, TestCase):
+
+    def test_register_host(self):
+        with self.assertQueryBudget('register_host'):
+            response = self.client.post(
+                '/api/register/host/', {'username': 'new-host', 'password': 'pw', 'email': 'a@b.c'},
+                content_type='application/json',
+            )
+        self.assertEqual(response.status_code, 201)
+
+    def test_quiz_list(self):
+        for i in range(10):
+            self.quiz.pk = None
+            self.quiz.title = f'Quiz {i}'
+            self.quiz.save()
+        with self.assertQueryBudget('quiz_list'):
+            response = self.client.get('/api/quizzes/', **self.auth())
+        self.assertEqual(response.status_code, 200)
+
+    def test_quiz_create(self):
+        with self.assertQueryBudget('quiz_create'):
+            response = self.client.post(
+                '/api/quizzes/', {'title': 'Rivers'}, content_type='application/json', **self.auth(),
+            )
+        self.assertEqual(response.status_code, 201)
+
+    def test_quiz_detail(self):
+        with self.assertQueryBudget('quiz_detail'):
+            response = self.client.get(f'/api/quizzes/{self.quiz.id}/', **self.auth())
+        self.assertEqual(response.status_code, 200)
+
+    def test_question_list(self):
+        with self.assertQueryBudget('question_list'):
+            response = self.client.get(f'/api/questions/?quiz={self.quiz.id}', **self.auth())
+        self.assertEqual(len(response.json()), len(self.questions))
+
+    def test_question_create(self):
+        with self.assertQueryBudget('question_create'):
+            response = self.client.post('/api/questions/', {
+                'quiz': self.quiz.id, 'text': 'Longest river?', 'option_a': 'Nile',
+                'option_b': 'Amazon', 'correct_option': 'A',
+            }, content_type='application/json', **self.auth())
+        self.assertEqual(response.status_code, 201)
+
+    def test_question_update(self):
+        question = self.questions[0]
+        with self.assertQueryBudget('question_update'):
+            response = self.client.patch(
+                f'/api/questions/{question.id}/', {'text': 'Edited?'},
+                content_type='application/json', **self.auth(),
+            )
+        self.assertEqual(response.status_code, 200)
+
+    def test_quiz_questions(self):
+        with self.assertQueryBudget('quiz_questions'):
+            response = self.client.get(f'/api/quizzes/{self.quiz.id}/questions/', **self.auth())
+        self.assertEqual(response.status_code, 200)
+
+    def test_search_questions(self):
+        with self.assertQueryBudget('search_questions'):
+            response = self.client.get('/api/questions/search/?q=quest', **self.auth())
+        self.assertEqual(len(response.json()['results']), len(self.questions))
+
+    def test_session_create(self):
+        with self.assertQueryBudget('session_create'):
+            response = self.client.post(
+                '/api/sessions/', {'quiz_id': self.quiz.id}, content_type='application/json', **self.auth(),
+            )
+        self.assertEqual(response.status_code, 201, response.content)
+
+    def test_metrics(self):
+        admin = User.objects.create_superuser('admin', password='secret-pass')
+        with self.assertQueryBudget('metrics'):
+            response = self.client.get('/api/metrics/', **self.auth(admin))
+        self.assertEqual(response.status_code, 200)
+
+
+class LiveSessionQueries(BudgetMixin, QuizFixtures, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.players = self.add_players(PLAYERS)
+
+    def test_join(self):
+        with self.assertQueryBudget('join'):
+            response = self.client.post(
+                '/api/join/', {'session_code': self.session.session_code, 'name': 'late'},
+                content_type='application/json',
+            )
+        self.assertEqual(response.status_code, 201)
+
+    def test_push_question(self):
+        with self.assertQueryBudget('push_question'):
+            response = self.push()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(LiveQuestion.objects.count(), 1)
+
+    def test_answer(self):
+        self.push()
+        for player in self.players[1:]:
+            self.answer(player)
+        with self.assertQueryBudget('answer'):
+            response = self.answer(self.players[0])
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(ParticipantAnswer.objects.count(), PLAYERS)
+
+    def test_end_session(self):
+        with self.assertQueryBudget('end_session'):
+            response = self.client.post(f'/api/sessions/{self.session.session_code}/end/', **self.auth())
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(LiveSession.objects.get().is_active)
+
+    def answer_all(self):
+        for question in self.questions[:3]:
+            self.push(question)
+            for i, player in enumerate(self.players):
+                self.answer(player, question, 'A' if i % 3 else 'B')
+
+    def test_results(self):
+        self.answer_all()
+        with self.assertQueryBudget('results'):
+            response = self.client.get(f'/api/sessions/{self.session.session_code}/results/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_participant_summary(self):
+        self.answer_all()
+        with self.assertQueryBudget('participant_summary'):
+            response = self.client.get(
+                f'/api/sessions/{self.session.session_code}/participant-summary/'
+                f'?participant_id={self.players[0].id}'
+            )
+        self.assertEqual(response.status_code, 200)
+
+    def test_session_summary(self):
+        self.answer_all()
+        LiveSession.objects.update(is_active=False)
+        Feedback.objects.bulk_create([
+            Feedback(participant=player, rating=4, comments='ok') for player in self.players
+        ])
+        with self.assertQueryBudget('session_summary'):
+            response = self.client.get(f'/api/sessions/{self.session.session_code}/summary/', **self.auth())
+        self.assertEqual(response.status_code, 200)
+
+    def test_feedback(self):
+        LiveSession.objects.update(is_active=False)
+        with self.assertQueryBudget('feedback'):
+            response = self.client.post(
+                '/api/feedback/', {'participant': self.players[0].id, 'rating': 5, 'comments': 'fun'},
+                content_type='application/json',
+            )
+        self.assertEqual(response.status_code, 201, response.content)
+
+    @skipUnless(analytics.load_numpy(), 'question analytics need NumPy')
+    def test_quiz_analytics(self):
+        self.answer_all()
+        with self.assertQueryBudget('quiz_analytics'):
+            response = self.client.get(f'/api/quizzes/{self.quiz.id}/analytics/', **self.auth())
+        self.assertEqual(response.status_code, 200, response.content)
+        report = response.json()
+        self.assertEqual((report['answers'], report['participants']), (3 * PLAYERS, PLAYERS))
+        first = report['questions'][0]
+        self.assertEqual((first['attempts'], first['correct']), (PLAYERS, 16))
+        self.assertEqual(first['options'], {'A': 16, 'B': 9, 'C': 0, 'D': 0})
@@ -0,0 +1,88 @@
+import time
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TransactionTestCase
+
+from core import reconcile
+from core.models import LiveSession, Participant, ParticipantAnswer, User
+
+from .base import BudgetMixin, QuizFixtures
+
+
+class ReconcileTests(BudgetMixin, QuizFixtures, TransactionTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.session.is_active = False
+        self.session.save()
+        self.players = self.add_players(40)
+        # Everyone got question 0 right; odd players also question 1.
+        ParticipantAnswer.objects.bulk_create([
+            ParticipantAnswer(participant=p, question=question, selected_option='A', is_correct=True)
+            for i, p in enumerate(self.players)
+            for question in self.questions[:1 + i % 2]
+        ])
+        for i, player in enumerate(self.players):
+            player.score = 10 * (1 + i % 2)
+        # Drift: a lost increment on the first five, a doubled one on the next five.
+        for player in self.players[:5]:
+            player.score -= 10
+        for player in self.players[5:10]:
+            player.score += 10
+        Participant.objects.bulk_update(self.players, ['score'])
+
+    def scores(self):
+        return dict(Participant.objects.values_list('id', 'score'))
+
+    def test_dry_run_reports_without_writing(self):
+        before = self.scores()
+        report = reconcile.execute(reconcile.Reconciliation(dry_run=True)).progress()
+        self.assertEqual(report['state'], 'done')
+        self.assertEqual((report['checked'], report['mismatched'], report['fixed']), (40, 10, 0))
+        self.assertEqual(report['drift'], 0)
+        self.assertEqual(len(report['sample']), 10)
+        self.assertEqual(self.scores(), before)
+
+    def test_repairs_only_mismatches(self):
+        with self.assertQueryBudget('reconcile_session'):
+            report = reconcile.execute(reconcile.Reconciliation([self.session.id])).progress()
+        self.assertEqual((report['mismatched'], report['fixed']), (10, 10))
+        self.assertEqual(self.scores(), {p.id: 10 * (1 + i % 2) for i, p in enumerate(self.players)})
+        again = reconcile.execute(reconcile.Reconciliation([self.session.id])).progress()
+        self.assertEqual(again['mismatched'], 0)
+
+    def test_active_sessions_are_skipped(self):
+        live_session = LiveSession.objects.create(quiz=self.quiz, host=self.host, session_code='LIVE01')
+        live_player = Participant.objects.create(session=live_session, name='live', score=50)
+        report = reconcile.execute(reconcile.Reconciliation()).progress()
+        self.assertEqual(report['skipped_active_sessions'], 1)
+        self.assertEqual(report['checked'], 40)
+        self.assertEqual(Participant.objects.get(id=live_player.id).score, 50)
+
+    def test_command(self):
+        out = StringIO()
+        call_command('reconcile_scores', '--session', self.session.session_code, '--dry-run', stdout=out)
+        self.assertIn('10 mismatched, would fix 10', out.getvalue())
+        call_command('reconcile_scores', stdout=out)
+        self.assertIn('fixed 10', out.getvalue())
+        self.assertEqual(reconcile.execute(reconcile.Reconciliation()).progress()['mismatched'], 0)
+
+    def test_endpoint(self):
+        url = f'/api/sessions/{self.session.session_code}/reconcile/'
+        intruder = User.objects.create_user('intruder', password='secret-pass', is_host=True)
+        self.assertEqual(self.client.post(url, **self.auth(intruder)).status_code, 404)
+
+        response = self.client.post(url, {'dry_run': True}, content_type='application/json', **self.auth())
+        self.assertEqual(response.status_code, 202)
+        status_url = f"/api/reconciliations/{response.json()['id']}/"
+        self.assertEqual(self.client.get(status_url, **self.auth(intruder)).status_code, 404)
+        for _ in range(200):
+            report = self.client.get(status_url, **self.auth()).json()
+            if report['state'] in ('done', 'failed'):
+                break
+            time.sleep(0.02)
+        self.assertEqual((report['state'], report['mismatched'], report['fixed']), ('done', 10, 0))
+
+        LiveSession.objects.update(is_active=True)
+        self.assertEqual(self.client.post(url, **self.auth()).status_code, 409)
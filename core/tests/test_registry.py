@@ -0,0 +1,172 @@
+import time
+
+from asgiref.sync import SyncToAsync, async_to_sync
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from rest_framework.exceptions import ValidationError
+
+from core import live
+from core.models import LiveQuestion, LiveSession, Participant
+from core.registry import ParticipantRegistry
+
+from .base import QuizFixtures
+
+
+class RegistryTests(SimpleTestCase):
+
+    def test_answers_are_bits_per_question(self):
+        registry = ParticipantRegistry()
+        registry.add(1, 'ada')
+        registry.add(2, 'bob', score=30, correct_count=3)
+        registry.record_answer(1, 101, True, 10, 5)
+        registry.record_answer(2, 101, False, 0, 6)
+        registry.record_answer(2, 102, True, 10, 7)
+
+        self.assertTrue(registry.has_answered(1, 101))
+        self.assertFalse(registry.has_answered(1, 102))
+        self.assertFalse(registry.has_answered(3, 101))
+        self.assertEqual(registry.question_bits, {101: 0, 102: 1})
+        self.assertEqual(registry.get(2).answered, 0b11)
+        self.assertEqual(registry.get(2).correct, 0b10)
+        self.assertEqual((registry.get(2).score, registry.get(2).correct_count), (40, 4))
+        self.assertEqual(registry.get(2).last_answer_ms, 7)
+        self.assertEqual(registry.tally(101), (2, ['ada']))
+
+    def test_leaderboard_and_names(self):
+        registry = ParticipantRegistry()
+        for pid, (name, score) in enumerate([('ada', 10), ('bob', 30), ('cy', 20)], 1):
+            registry.add(pid, name, score)
+        self.assertEqual([row['name'] for row in registry.leaderboard()], ['bob', 'cy', 'ada'])
+        self.assertEqual(registry.names(), ['ada', 'bob', 'cy'])
+        self.assertIs(registry.get(1).name, registry.add(9, ''.join(['a', 'da'])).name)
+
+    def test_mark_answered_keeps_stored_score(self):
+        registry = ParticipantRegistry()
+        registry.add(1, 'ada', score=10, correct_count=1)
+        registry.mark_answered(1, 101, True)
+        self.assertEqual((registry.get(1).score, registry.get(1).correct_count), (10, 1))
+        self.assertTrue(registry.has_answered(1, 101))
+
+
+class ActorRegistryTests(QuizFixtures, TransactionTestCase):
+
+    def test_reload_restores_answers_and_counts(self):
+        first, second = self.add_players(2)
+        self.push()
+        self.assertEqual(self.answer(first).status_code, 201)
+        self.assertEqual(self.answer(second, option='B').status_code, 201)
+        live.discard_actors(lambda code: True)
+
+        async def reload():
+            actor = live.get_actor(self.session.session_code)
+            await actor.ask('connect')
+            return actor.participants
+
+        participants = async_to_sync(reload)()
+        self.assertEqual(participants.get(first.id).correct_count, 1)
+        self.assertEqual(participants.get(first.id).score, 10)
+        self.assertTrue(participants.has_answered(second.id, self.questions[0].id))
+        self.assertEqual(self.answer(first).status_code, 400)
+
+    def reload(self):
+        live.discard_actors(lambda code: True)
+
+        async def run():
+            actor = live.get_actor(self.session.session_code)
+            await actor.ask('connect')
+            return actor
+
+        return async_to_sync(run)()
+
+    def test_early_close_survives_reload(self):
+        player, = self.add_players(1)
+        code = self.session.session_code
+        for command in ('reveal', 'skip'):
+            self.assertEqual(self.push().status_code, 201)
+            live.control_sync(code, self.host, command)
+            actor = self.reload()
+            self.assertTrue(actor.revealed)
+            self.assertIsNone(actor.timer)
+            self.assertEqual(self.answer(player).status_code, 400)
+        self.assertEqual(Participant.objects.get().score, 0)
+        self.assertEqual(LiveQuestion.objects.filter(closed_at=None).count(), 0)
+
+    def test_pause_survives_reload(self):
+        player, = self.add_players(1)
+        code = self.session.session_code
+        self.assertEqual(self.push(duration=30).status_code, 201)
+        live.control_sync(code, self.host, 'pause')
+        actor = self.reload()
+        self.assertTrue(actor.deadline.paused)
+        self.assertAlmostEqual(actor.deadline.remaining_seconds(), 30, delta=1)
+        self.assertIsNone(actor.timer)
+        self.assertEqual(self.answer(player).status_code, 400)
+
+        live.control_sync(code, self.host, 'resume')
+        actor = self.reload()
+        self.assertFalse(actor.deadline.paused)
+        self.assertIsNotNone(actor.timer)
+        self.assertEqual(self.answer(player).status_code, 201)
+
+    def test_a_socket_takes_over_the_background_actor(self):
+        player, = self.add_players(1)
+        code = self.session.session_code
+        self.assertEqual(self.push(duration=30).status_code, 201)
+        live.control_sync(code, self.host, 'pause')
+        background = live._actors[code]
+        # Only the handed-over state still knows the question is paused.
+        LiveQuestion.objects.update(paused_remaining=None)
+
+        async def connect():
+            actor = live.get_actor(code)
+            await actor.ask('connect')
+            with self.assertRaises(ValidationError):
+                await live.answer(code, player.id, self.questions[0].id, 'A')
+            return actor
+
+        actor = async_to_sync(connect)()
+        self.assertIsNot(actor, background)
+        self.assertIs(background.successor, actor)
+        self.assertFalse(background.alive())
+        self.assertIs(actor.participants, background.participants)
+        self.assertTrue(actor.deadline.paused)
+        self.assertIsNone(actor.timer)
+
+    def test_answer_from_participant_the_actor_has_not_seen(self):
+        self.push()
+        other = LiveSession.objects.create(quiz=self.quiz, host=self.host, session_code='OTHER1')
+        code, question_id = self.session.session_code, self.questions[0].id
+
+        async def run():
+            await live.get_actor(code).ask('connect')
+            # Rows the loaded actor never saw join through it.
+            late = await Participant.objects.acreate(session=self.session, name='late')
+            stranger = await Participant.objects.acreate(session=other, name='stranger')
+            await live.answer(code, late.id, question_id, 'A')
+            with self.assertRaises(ValidationError):
+                await live.answer(code, stranger.id, question_id, 'A')
+            return live.get_actor(code).leaderboard()
+
+        self.assertEqual(async_to_sync(run)(), [{'name': 'late', 'score': 10}])
+
+    @override_settings(LIVE_ANSWER_GRACE_MS=0)
+    def test_sync_callers_share_an_actor_that_outlives_the_request(self):
+        code = self.session.session_code
+        player, = self.add_players(1)
+        self.assertEqual(self.push(duration=1).status_code, 201)
+        actor = live._actors[code]
+        self.assertEqual(self.answer(player).status_code, 201)
+        self.assertIs(live._actors[code], actor)
+        # The caller's later async_to_sync calls aren't sent to the actor's loop.
+        self.assertIsNot(getattr(SyncToAsync.threadlocal, 'main_event_loop', None), live._background)
+        # The reveal timer fires after the push request has returned.
+        for _ in range(100):
+            if actor.revealed:
+                break
+            time.sleep(0.02)
+        self.assertTrue(actor.revealed)
+        self.assertTrue(actor.alive())
+
+        response = self.client.post(f'/api/sessions/{code}/end/', **self.auth())
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(code, live._actors)
+        self.assertEqual(self.answer(player).status_code, 400)
@@ -0,0 +1,61 @@
+from django.test import TestCase, override_settings
+
+from core import answers, results_cache
+from core.models import ParticipantAnswer
+
+from .base import QuizFixtures
+
+
+@override_settings(RESULTS_CACHE_TTL=60)
+class ResultsCacheTests(QuizFixtures, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.players = self.add_players(3)
+        self.url = f'/api/sessions/{self.session.session_code}/results/'
+
+    def test_etag_and_not_modified(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        etag = first['ETag']
+        self.assertEqual(first['Cache-Control'], 'no-cache')
+
+        again = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again['ETag'], etag)
+        self.assertEqual(again.content, b'')
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=f'"other", {etag}').status_code, 304)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH='"other"').status_code, 200)
+
+    def test_a_change_serves_a_new_body(self):
+        etag = self.client.get(self.url)['ETag']
+        version = results_cache.version(self.session.session_code)
+        self.push()
+        self.assertEqual(self.answer(self.players[0]).status_code, 201)
+        self.assertGreater(results_cache.version(self.session.session_code), version)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_write_behind_answers_refresh_results(self):
+        etag = self.client.get(self.url)['ETag']
+        writer = answers.AnswerWriter(flush_interval=3600)
+        answer = ParticipantAnswer(
+            participant=self.players[0], question=self.questions[0], selected_option='A', is_correct=True,
+        )
+        writer.submit(answer, self.session.id, 10, None)
+        # Accepted but not yet in the table: nothing a poll can see has changed.
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        writer.flush()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['leaderboard'][0], {
+            'id': self.players[0].id, 'name': self.players[0].name, 'correct_count': 1,
+        })
+
+    def test_only_successes_are_cached(self):
+        url = '/api/sessions/NOPE00/results/'
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(results_cache._entries, {})
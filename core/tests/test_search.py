@@ -0,0 +1,41 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+
+from core import search
+from core.models import Question
+
+from .base import QuizFixtures
+
+
+class SearchIndexTests(QuizFixtures, TestCase):
+
+    def ids(self, query):
+        return [result['id'] for result in search.search_questions(self.host.id, query)]
+
+    def test_triggers_keep_the_index_in_step(self):
+        question = self.questions[2]
+        self.assertEqual(self.ids('volcano'), [])
+
+        question.text = 'Which volcano buried Pompeii?'
+        question.save()
+        self.assertEqual(self.ids('volcano'), [question.id])
+        self.assertEqual(self.ids('Question 2'), [])
+
+        Question.objects.filter(id=question.id).update(option_d='Vesuvius')
+        self.assertEqual(self.ids('vesuv'), [question.id])
+
+        added = Question.objects.create(
+            quiz=self.quiz, text='Another volcano?', option_a='Etna', option_b='Fuji', correct_option='A',
+        )
+        self.assertEqual(sorted(self.ids('volcano')), [question.id, added.id])
+        question.delete()
+        self.assertEqual(self.ids('volcano'), [added.id])
+
+    def test_without_sqlite_words_are_matched_unindexed(self):
+        Question.objects.filter(id=self.questions[1].id).update(option_c='Lisbon')
+        with mock.patch.object(connection, 'vendor', 'postgresql'):
+            results = search.search_questions(self.host.id, 'question lisb')
+        self.assertEqual([result['id'] for result in results], [self.questions[1].id])
+        self.assertEqual(results[0]['quiz_title'], self.quiz.title)
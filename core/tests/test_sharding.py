@@ -0,0 +1,96 @@
+import asyncio
+import socket
+
+from asgiref.sync import async_to_sync
+from django.test import SimpleTestCase
+
+from core import sharding
+from core.router import Router, parse_head
+
+CODES = [f'S{i:05d}' for i in range(2000)]
+
+
+class RendezvousTests(SimpleTestCase):
+
+    def test_owner_is_stable_and_balanced(self):
+        owners = {code: sharding.owner(code, range(4)) for code in CODES}
+        self.assertEqual(owners, {code: sharding.owner(code, [3, 1, 0, 2]) for code in CODES})
+        for shard in range(4):
+            self.assertGreater(list(owners.values()).count(shard), len(CODES) / 4 * 0.8)
+
+    def test_removing_a_shard_only_moves_its_sessions(self):
+        before = {code: sharding.owner(code, range(4)) for code in CODES}
+        after = {code: sharding.owner(code, [0, 1, 3]) for code in CODES}
+        moved = {code for code in CODES if before[code] != after[code]}
+        self.assertEqual(moved, {code for code in CODES if before[code] == 2})
+        # Each moves to the next shard in its failover order.
+        for code in moved:
+            self.assertEqual(after[code], sharding.ranked(code, range(4))[1])
+
+    def test_view_round_trip(self):
+        self.assertEqual(sharding.parse_view(sharding.format_view(7, [2, 0])), (7, [0, 2]))
+        self.assertEqual(sharding.parse_view('3;'), (3, []))
+
+
+class RouterTests(SimpleTestCase):
+
+    def free_port(self):
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            return sock.getsockname()[1]
+
+    def test_forwards_to_the_owner_and_fails_over(self):
+        received = {}
+
+        def backend(shard):
+            async def handle(reader, writer):
+                head = await reader.readuntil(b'\r\n\r\n')
+                received[shard] = parse_head(head)
+                body = f'{{"shard": {shard}}}'.encode()
+                writer.write(
+                    b'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n'
+                    b'Content-Length: %d\r\n\r\n%s' % (len(body), body)
+                )
+                await writer.drain()
+                writer.close()
+            return handle
+
+        async def request(port, path):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            # A spoofed shard view must not reach the worker.
+            writer.write(
+                f'GET {path} HTTP/1.1\r\nHost: test\r\nx-quiz-shards: 9;5\r\nConnection: close\r\n\r\n'.encode()
+            )
+            response = await reader.read()
+            writer.close()
+            return response
+
+        async def run():
+            servers = [await asyncio.start_server(backend(shard), '127.0.0.1', 0) for shard in range(2)]
+            backends = [server.sockets[0].getsockname()[:2] for server in servers]
+            backends.append(('127.0.0.1', self.free_port()))    # shard 2 is down
+            router = Router(backends)
+            proxy = await asyncio.start_server(router.handle, '127.0.0.1', 0)
+            port = proxy.sockets[0].getsockname()[1]
+
+            code = next(code for code in CODES if sharding.owner(code, range(3)) == 1)
+            response = await request(port, f'/api/sessions/{code}/results/')
+            self.assertTrue(response.startswith(b'HTTP/1.1 200 OK'))
+            self.assertTrue(response.endswith(b'{"shard": 1}'))
+            request_line, headers = received.pop(1)
+            self.assertEqual(request_line, f'GET /api/sessions/{code}/results/ HTTP/1.1')
+            self.assertEqual([value for name, value in headers if name.lower() == 'x-quiz-shards'], ['0;0,1,2'])
+
+            # A session owned by the dead shard goes to its next choice.
+            code = next(code for code in CODES if sharding.ranked(code, range(3))[:2] == [2, 0])
+            with self.assertLogs('core.router', 'WARNING'):
+                response = await request(port, f'/ws/session/{code}/')
+            self.assertTrue(response.endswith(b'{"shard": 0}'))
+            self.assertEqual(router.down, {2})
+            self.assertIn((sharding.SHARDS_HEADER, '1;0,1'), received[0][1])
+
+            for server in [proxy, *servers]:
+                server.close()
+                await server.wait_closed()
+
+        async_to_sync(run)()
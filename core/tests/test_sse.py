@@ -0,0 +1,130 @@
+import json
+
+from asgiref.sync import async_to_sync
+from asgiref.testing import ApplicationCommunicator
+from channels.exceptions import StopConsumer
+from channels.routing import URLRouter
+from django.test import SimpleTestCase, TransactionTestCase
+
+from core import live
+from core.outbound import OutboundQueue
+from core.routing import http_urlpatterns
+from core.sse import EventStreamConsumer
+
+from .base import QuizFixtures
+
+
+def parse_events(body):
+    """[(event, data)] from event-stream bytes, skipping comments and retry lines."""
+    events = []
+    for block in body.decode().split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in block.split('\n') if ': ' in line and not line.startswith(':'))
+        if 'event' in fields:
+            events.append((fields['event'], json.loads(fields['data'])))
+    return events
+
+
+class EventStreamTests(QuizFixtures, TransactionTestCase):
+
+    def open_stream(self, code):
+        return ApplicationCommunicator(URLRouter(http_urlpatterns), {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+            'method': 'GET', 'scheme': 'http', 'path': f'/api/sessions/{code}/events/',
+            'raw_path': f'/api/sessions/{code}/events/'.encode(), 'query_string': b'',
+            'headers': [(b'host', b'localhost')], 'server': ('localhost', 80), 'client': ('127.0.0.1', 5000),
+        })
+
+    def test_streams_broadcasts_until_session_ends(self):
+        self.add_players(3)
+
+        async def run():
+            stream = self.open_stream(self.session.session_code)
+            await stream.send_input({'type': 'http.request', 'body': b''})
+            start = await stream.receive_output(timeout=5)
+            self.assertEqual(start['status'], 200)
+            self.assertIn((b'Content-Type', b'text/event-stream'), start['headers'])
+            first = await stream.receive_output(timeout=5)
+            self.assertTrue(first['body'].startswith(b'retry:'))
+
+            await live.control(self.session.session_code, self.host, 'push', question_id=self.questions[0].id)
+            await live.control(self.session.session_code, self.host, 'end')
+            body = b''
+            while True:
+                message = await stream.receive_output(timeout=5)
+                body += message.get('body', b'')
+                if not message.get('more_body'):
+                    break
+            return parse_events(body)
+
+        events = async_to_sync(run)()
+        kinds = [kind for kind, _ in events]
+        self.assertEqual(kinds[0], 'question_with_leaderboard')
+        self.assertEqual(kinds[-1], 'session_ended')
+        question = events[0][1]
+        self.assertEqual(len(question['leaderboard']), 3)
+        self.assertNotIn('correct_option', question['question']['question'])
+
+    def test_unknown_session(self):
+        async def run():
+            stream = self.open_stream('NOPE00')
+            await stream.send_input({'type': 'http.request', 'body': b''})
+            start = await stream.receive_output(timeout=5)
+            body = await stream.receive_output(timeout=5)
+            return start['status'], body.get('more_body', False)
+
+        self.assertEqual(async_to_sync(run)(), (404, False))
+
+
+class SlowReaderTests(SimpleTestCase):
+
+    def run_stream(self, limit, events):
+        """
+        Feed ``events`` to a stream. Queuing never yields to the writer, so
+        the client gets nothing until they are all in, like a slow reader.
+        """
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        async def run():
+            stream = EventStreamConsumer()
+            stream.session_code = 'SLOW01'
+            stream.base_send = send
+            stream.outbound = OutboundQueue(stream.write, limit)
+            try:
+                for event in events:
+                    await stream.send_event(event)
+            except StopConsumer:
+                return True
+            return False
+
+        stopped = async_to_sync(run)()
+        return stopped, parse_events(b''.join(message['body'] for message in sent)), sent[-1]['more_body']
+
+    def test_state_events_coalesce(self):
+        stopped, events, more = self.run_stream(4, [
+            {'type': 'question_skipped', 'question_id': 1},
+            *({'type': 'send_leaderboard', 'leaderboard': [{'name': 'ada', 'score': n}]} for n in range(3)),
+            {'type': 'question_skipped', 'question_id': 2},
+            {'type': 'session_ended', 'message': 'bye'},
+        ])
+        self.assertTrue(stopped)
+        self.assertFalse(more)
+        self.assertEqual(events, [
+            ('question_skipped', {'type': 'question_skipped', 'question_id': 1}),
+            ('leaderboard', {'type': 'leaderboard', 'leaderboard': [{'name': 'ada', 'score': 2}]}),
+            ('question_skipped', {'type': 'question_skipped', 'question_id': 2}),
+            ('session_ended', {'type': 'session_ended', 'message': 'bye'}),
+        ])
+
+    def test_overflow_ends_the_stream(self):
+        with self.assertLogs('core.sse', 'WARNING'):
+            stopped, events, more = self.run_stream(
+                2, [{'type': 'question_skipped', 'question_id': n} for n in range(4)] + [
+                    {'type': 'session_ended', 'message': 'bye'},
+                ],
+            )
+        self.assertTrue(stopped)
+        self.assertFalse(more)
+        self.assertEqual(events, [])
@@ -1,25 +1,33 @@
 from django.urls import path
-from .views import *
-from .views import register_host
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
+from . import views
+
 urlpatterns = [
-    path('register/host/', register_host),
+    path('register/host/', views.register_host),
     path('token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
-    path('quizzes/', QuizListCreateView.as_view()),
-    path('quizzes/<int:pk>/', QuizDetailView.as_view()),
-    path('questions/', QuestionListCreateView.as_view()),
-    path('quizzes/<int:pk>/questions/', quiz_questions_view),
-    path('questions/<int:pk>/', QuestionDetailView.as_view()),
-    path('sessions/', LiveSessionCreateView.as_view()),
-    path('join/', join_session),
-    path('sessions/<str:code>/push-question/', push_question),
-    path('answers/', ParticipantAnswerCreateView.as_view()),
-    path('sessions/<str:code>/results/', session_results),
-    path('feedback/', feedback_create),
-    path('sessions/<str:code>/summary/', session_summary),
-    path('sessions/<str:code>/participant-summary/', participant_summary),
-
-
+    path('quizzes/', views.QuizListCreateView.as_view()),
+    path('quizzes/<int:pk>/', views.QuizDetailView.as_view()),
+    path('questions/', views.QuestionListCreateView.as_view()),
+    path('quizzes/<int:pk>/questions/', views.quiz_questions_view),
+    path('quizzes/<int:pk>/analytics/', views.quiz_analytics),
+    path('quizzes/<int:pk>/purge/', views.purge_quiz),
+    path('questions/search/', views.search_questions),
+    path('questions/<int:pk>/', views.QuestionDetailView.as_view()),
+    path('sessions/', views.LiveSessionCreateView.as_view()),
+    path('join/', views.join_session),
+    path('sessions/<str:code>/push-question/', views.push_question),
+    path('sessions/<str:code>/playlist/', views.session_playlist),
+    path('sessions/<str:code>/end/', views.end_session),
+    path('sessions/<str:code>/purge/', views.purge_session),
+    path('purges/<int:pk>/', views.purge_status),
+    path('sessions/<str:code>/reconcile/', views.reconcile_session),
+    path('reconciliations/<int:pk>/', views.reconciliation_status),
+    path('answers/', views.ParticipantAnswerCreateView.as_view()),
+    path('sessions/<str:code>/results/', views.session_results),
+    path('feedback/', views.feedback_create),
+    path('sessions/<str:code>/summary/', views.session_summary),
+    path('sessions/<str:code>/participant-summary/', views.participant_summary),
+    path('metrics/', views.metrics_view),
 ]
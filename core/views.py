@@ -1,30 +1,31 @@
+import logging
+
+from channels.db import database_sync_to_async
+from django.contrib.auth.hashers import make_password
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.http import HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.utils.crypto import get_random_string
+from django.views.decorators.http import require_GET
 from rest_framework import generics, status, permissions
-from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
-from django.utils.crypto import get_random_string
-from django.shortcuts import get_object_or_404
-from asgiref.sync import async_to_sync
-from channels.layers import get_channel_layer
-from rest_framework.exceptions import ValidationError
+from rest_framework.exceptions import (
+    APIException, ValidationError
+)
 from rest_framework.permissions import IsAuthenticated
-from .serializers import QuestionSerializer
-import threading
-import logging
-from rest_framework.exceptions import ValidationError
-from django.db.models import Count, F, Q
-from .models import User
-from .models import Quiz
-from .serializers import QuizSerializer
 from rest_framework.response import Response
-from django.contrib.auth.hashers import make_password
+
+# analytics (NumPy), search, purge and reconcile are imported in the views
+# that use them, so they stay off the worker's startup path.
+from . import auth, eventlog, feedback, live, metrics, payloads, results_cache
 from .models import (
-    Quiz, LiveSession, Participant, LiveQuestion,
+    User, Quiz, LiveSession, Participant,
     Question, ParticipantAnswer, Feedback
 )
 from .serializers import (
-    LiveSessionSerializer, ParticipantSerializer,
-    LiveQuestionSerializer, ParticipantAnswerSerializer,
-    FeedbackSerializer
+    QuizSerializer, QuestionSerializer, LiveSessionSerializer,
+    ParticipantSerializer, ParticipantAnswerSerializer, FeedbackSerializer
 )
 
 @api_view(['POST'])
@@ -59,6 +60,16 @@ class QuizDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = QuizSerializer
     permission_classes = [IsAuthenticated]
 
+    def destroy(self, request, *args, **kwargs):
+        # Quizzes can carry every session ever run on them; delete in the
+        # background in chunks rather than through the ORM cascade.
+        from . import purge
+
+        # Only the quiz's owner may delete it, as with purge_quiz below.
+        quiz = get_object_or_404(Quiz, pk=kwargs['pk'], created_by=request.user)
+        job = purge.worker.submit(purge.purge_quiz(quiz, request.user.id))
+        return Response(job.progress(), status=202)
+
 # _____Host: Question views___________________________________
 
 class QuestionListCreateView(generics.ListCreateAPIView):
@@ -85,7 +96,8 @@ class LiveSessionCreateView(generics.CreateAPIView):
 
     def perform_create(self, serializer):
         code = get_random_string(6).upper()
-        serializer.save(host=self.request.user, session_code=code)
+        session = serializer.save(host=self.request.user, session_code=code)
+        payloads.for_quiz(session.quiz_id)
 
 
 # ─── Guest: Join a Session by Code ───────────────────────────
@@ -97,7 +109,7 @@ def join_session(request):
     name = request.data.get('name')
 
     session = get_object_or_404(LiveSession, session_code=session_code, is_active=True)
-    participant = Participant.objects.create(session=session, name=name)
+    participant = live.ask_sync(session.session_code, 'join', name=name)
 
     serializer = ParticipantSerializer(participant)
     return Response(serializer.data, status=201)
@@ -108,48 +120,49 @@ def join_session(request):
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
 def push_question(request, code):
-    try:
-        session = LiveSession.objects.get(session_code=code, host=request.user)
-    except LiveSession.DoesNotExist:
-        return Response({"error": "Session not found or unauthorized."}, status=404)
-
     question_id = request.data.get('question_id')
     if not question_id:
         return Response({"error": "Missing question_id."}, status=400)
+    duration = request.data.get('duration', 60)
 
+    # Same host-control path the host's WebSocket uses: the session actor
+    # checks the host and the duration, creates the LiveQuestion, broadcasts
+    # it with the leaderboard and schedules the reveal.
     try:
-        question = Question.objects.get(id=question_id, quiz=session.quiz)
-    except Question.DoesNotExist:
-        return Response({"error": "Question not found in quiz."}, status=404)
-
-    # Create the LiveQuestion
-    live_q = LiveQuestion.objects.create(session=session, question=question, duration_seconds=60)
-    serializer = LiveQuestionSerializer(live_q)
-
-    # Build leaderboard
-    participants = session.participants.order_by('-score')
-    leaderboard = [
-        {'name': p.name, 'score': p.score}
-        for p in participants
-    ]
-
-    # Broadcast question + leaderboard
-    channel_layer = get_channel_layer()
-    async_to_sync(channel_layer.group_send)(
-        f'session_{code}',
-        {
-            'type': 'send_question_with_leaderboard',
-            'question': serializer.data,
-            'start_time': live_q.displayed_at.isoformat(),
-            'duration': live_q.duration_seconds,
-            'leaderboard': leaderboard
+        body = live.control_sync(code, request.user, 'push', question_id=question_id, duration=duration)
+    except APIException as e:
+        return Response({"error": e.detail}, status=e.status_code)
+
+    # Pre-rendered host payload (with the answer key); see payloads.py.
+    return HttpResponse(body, content_type='application/json', status=201)
+
+
+# ─── Host: Auto-advancing Playlist ──────────────────────────
+#
+# POST hands the session an ordered list of questions that the session
+# actor then pushes and reveals on its own timers (core/playlist.py);
+# DELETE stops it, leaving the question on screen to run out as usual.
+
+@api_view(['POST', 'DELETE'])
+@permission_classes([permissions.IsAuthenticated])
+def session_playlist(request, code):
+    try:
+        if request.method == 'DELETE':
+            stopped = live.control_sync(code, request.user, 'stop_playlist')
+            return Response({"detail": "Playlist stopped.", "playlist": stopped})
+        options = {
+            key: request.data[key] for key in ('duration', 'reveal_seconds', 'end_when_done') if key in request.data
         }
-    )
+        progress = live.control_sync(code, request.user, 'playlist', items=request.data.get('items'), **options)
+    except APIException as e:
+        return Response({"error": e.detail}, status=e.status_code)
+    return Response(progress, status=201)
 
-    # Start timer
-    start_question_timer(live_q)
 
-    return Response(serializer.data, status=201)
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def metrics_view(request):
+    return Response(metrics.snapshot())
 
 
 @api_view(['GET'])
@@ -160,6 +173,45 @@ def quiz_questions_view(request, pk):
     return Response(serializer.data)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def quiz_analytics(request, pk):
+    from . import analytics
+
+    quiz = get_object_or_404(Quiz, pk=pk, created_by=request.user)
+    try:
+        report = analytics.quiz_report(quiz.id)
+    except RuntimeError as e:
+        return Response({"error": str(e)}, status=501)
+    return Response(report)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def search_questions(request):
+    from . import search
+
+    query = request.query_params.get('q', '').strip()
+    if not query:
+        return Response({"error": "q is required."}, status=400)
+    quiz_id = request.query_params.get('quiz')
+    if quiz_id is not None and not quiz_id.isdigit():
+        return Response({"error": "quiz must be an id."}, status=400)
+
+    page, page_size = _page_params(request)
+    results = search.search_questions(
+        request.user.id, query, quiz_id=quiz_id and int(quiz_id),
+        offset=(page - 1) * page_size, limit=page_size + 1,
+    )
+    return Response({
+        'query': query,
+        'results': results[:page_size],
+        'page': page,
+        'page_size': page_size,
+        'has_next': len(results) > page_size,
+    })
+
+
 # ─── Participant: Submit Answer ──────────────────────────────
 logger = logging.getLogger(__name__)
 
@@ -169,12 +221,9 @@ class ParticipantAnswerCreateView(generics.CreateAPIView):
     permission_classes = [permissions.AllowAny]
 
     def create(self, request, *args, **kwargs):
-        logger.info(f"📨 Received answer submission: {request.data}")
-        logger.info(f"🔐 Authenticated user: {request.user if request.user.is_authenticated else 'Anonymous'}")
-
         serializer = self.get_serializer(data=request.data)
         if not serializer.is_valid():
-            logger.error(f"❌ Serializer validation failed: {serializer.errors}")
+            eventlog.event(logger, 'answer.invalid', logging.WARNING, errors=serializer.errors)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
         try:
@@ -184,11 +233,16 @@ class ParticipantAnswerCreateView(generics.CreateAPIView):
             return Response(output_serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
         except ValidationError as e:
-            logger.error(f"⚠️ Validation error in perform_create: {e}")
+            eventlog.event(
+                logger, 'answer.rejected', logging.WARNING,
+                participant=serializer.validated_data['participant'].id,
+                question=serializer.validated_data['question'].id,
+                reason=e.detail,
+            )
             return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
         except Exception as e:
-            logger.exception("🔥 Unexpected error in perform_create")
+            logger.exception("Unexpected error in perform_create")
             return Response(
                 {"detail": "An unexpected error occurred while processing your answer."},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -197,107 +251,143 @@ class ParticipantAnswerCreateView(generics.CreateAPIView):
     def perform_create(self, serializer):
         question = serializer.validated_data['question']
         participant = serializer.validated_data['participant']
+        session = participant.session
 
-        logger.info(f"🛠 Processing answer from participant {participant.id} for question {question.id}")
+        # Validation, the duplicate check and scoring all happen inside the
+        # session actor, one answer at a time.
+        answer = live.answer_sync(
+            session.session_code, participant.id, question.id,
+            serializer.validated_data['selected_option'],
+        )
 
-        session = participant.session
-        logger.info(f"🧾 Session {session.session_code} is_active: {session.is_active}")
+        eventlog.event(
+            logger, 'answer.accepted',
+            session=session.session_code,
+            participant=participant.id,
+            question=question.id,
+            correct=answer.is_correct,
+        )
+        return answer
 
-        if not session.is_active:
-            logger.warning(f"⚠️ Session {session.session_code} is not active")
-            raise ValidationError("This quiz session has ended. No more answers allowed.")
 
-        live_q = LiveQuestion.objects.filter(
-            question=question,
-            session=session
-        ).order_by('-displayed_at').first()
+# ─── Host: View Session Results / Leaderboard ────────────────
+#
+# The result endpoints are polled by every player, so they are plain async
+# Django views: under Daphne they stay on the event loop instead of each
+# poll occupying a worker from the sync thread pool.
 
-        if not live_q:
-            logger.warning(f"⚠️ No active LiveQuestion found for question {question.id} in session {session.session_code}")
-            raise ValidationError("This question is not currently active.")
+def _not_found(detail="Not found."):
+    return JsonResponse({"detail": detail}, status=404)
 
-        logger.info(f"📍 Found LiveQuestion {live_q.id}, displayed_at: {live_q.displayed_at}")
 
-        if not live_q.is_active():
-            logger.warning(f"⏰ LiveQuestion {live_q.id} has expired")
-            raise ValidationError("Time's up! You can no longer answer this question.")
+@require_GET
+async def session_results(request, code):
+    participant_id = request.GET.get('participant')
+    return await results_cache.cached_json(
+        request, 'results', code, participant_id,
+        lambda: _session_results(code, participant_id),
+    )
 
-        existing_answer = ParticipantAnswer.objects.filter(
-            participant=participant,
-            question=question
-        ).first()
 
-        if existing_answer:
-            logger.warning(f"🔁 Duplicate answer by participant {participant.id} for question {question.id}")
-            raise ValidationError("You have already answered this question.")
+async def _session_results(code, participant_id):
+    session_id = await LiveSession.objects.filter(session_code=code).values_list('id', flat=True).afirst()
+    if session_id is None:
+        return _not_found("No LiveSession matches the given query.")
 
-        logger.info("💾 Saving answer...")
-        answer = serializer.save()
+    # One grouped query gives both the leaderboard and the caller's score.
+    rows = Participant.objects.filter(session_id=session_id).annotate(
+        correct_count=Count('participantanswer', filter=Q(participantanswer__is_correct=True))
+    ).values('id', 'name', 'score', 'correct_count').order_by('-correct_count')
 
-        answer.is_correct = (answer.selected_option.upper() == question.correct_option.upper())
-        answer.save()
+    leaderboard = []
+    participant_data = None
+    async for row in rows:
+        leaderboard.append({'id': row['id'], 'name': row['name'], 'correct_count': row['correct_count']})
+        if participant_id and str(row['id']) == participant_id:
+            participant_data = {"id": row['id'], "name": row['name'], "score": row['score']}
 
-        logger.info(f"✅ Answer saved. Correct: {answer.is_correct}")
+    return JsonResponse({
+        "participant": participant_data,
+        "leaderboard": leaderboard
+    })
 
-        if answer.is_correct:
-            participant.score += 10
-            participant.save()
-            logger.info(f"🏆 Participant {participant.id} score updated to {participant.score}")
 
-        return answer    
-    
-# ─── Host: View Session Results / Leaderboard ────────────────
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def end_session(request, code):
+    # Marks the session ended and broadcasts the end event.
+    try:
+        live.control_sync(code, request.user, 'end')
+    except APIException as e:
+        return Response({"error": e.detail}, status=e.status_code)
 
-@api_view(['GET'])
-def session_results(request, code):
-    participant_id = request.GET.get('participant')
+    return Response({"detail": "Session ended successfully."})
 
-    session = get_object_or_404(LiveSession, session_code=code)
-    participants = Participant.objects.filter(session=session)
 
-    leaderboard = participants.annotate(
-        correct_count=Count(
-            'participantanswer',
-            filter=Q(participantanswer__selected_option=F('participantanswer__question__correct_option'))
-        )
-    ).values('id', 'name', 'correct_count').order_by('-correct_count')
+# ─── Host: Purge Session Data ───────────────────────────────
+#
+# Purges run in the background (see core/purge.py); these return 202 with
+# the purge's progress, which purge_status reports until it is done.
 
-    participant_data = None
-    if participant_id:
-        try:
-            participant = participants.get(id=participant_id)
-            participant_data = {
-                "id": participant.id,
-                "name": participant.name,
-                "score": participant.score,
-            }
-        except Participant.DoesNotExist:
-            pass
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def purge_session(request, code):
+    from . import purge
 
-    return Response({
-        "participant": participant_data,
-        "leaderboard": leaderboard
-    })
+    session = get_object_or_404(LiveSession, session_code=code, host=request.user)
+    job = purge.worker.submit(purge.purge_session(session, request.user.id))
+    return Response(job.progress(), status=202)
 
 
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
-def end_session(request, code):
+def purge_quiz(request, pk):
+    from . import purge
+
+    quiz = get_object_or_404(Quiz, pk=pk, created_by=request.user)
+    job = purge.worker.submit(purge.purge_quiz(quiz, request.user.id))
+    return Response(job.progress(), status=202)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def purge_status(request, pk):
+    from . import purge
+
+    job = purge.worker.get(pk)
+    if job is None or job.owner_id != request.user.id:
+        return Response({"detail": "Not found."}, status=404)
+    return Response(job.progress())
+
+
+# ─── Host: Reconcile Scores ──────────────────────────────────
+#
+# Recomputes an ended session's scores from its answers in the background
+# (see core/reconcile.py); dry_run reports the mismatches without fixing.
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def reconcile_session(request, code):
+    from . import reconcile
+
     session = get_object_or_404(LiveSession, session_code=code, host=request.user)
+    if session.is_active:
+        return Response({"error": "End the session before reconciling its scores."}, status=409)
+    job = reconcile.worker.submit(reconcile.Reconciliation(
+        [session.id], dry_run=bool(request.data.get('dry_run')), owner_id=request.user.id,
+    ))
+    return Response(job.progress(), status=202)
 
-    session.end()
 
-    # Broadcast end event
-    channel_layer = get_channel_layer()
-    async_to_sync(channel_layer.group_send)(
-        f'session_{code}',
-        {
-            'type': 'session_ended',
-            'message': f"Session {code} has ended."
-        }
-    )
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def reconciliation_status(request, pk):
+    from . import reconcile
 
-    return Response({"detail": "Session ended successfully."})
+    job = reconcile.worker.get(pk)
+    if job is None or job.owner_id != request.user.id:
+        return Response({"detail": "Not found."}, status=404)
+    return Response(job.progress())
 
 
 # ─── Feedback Submission ─────────────────────────────────────
@@ -306,7 +396,9 @@ def end_session(request, code):
 def feedback_create(request):
     serializer = FeedbackSerializer(data=request.data)
     if serializer.is_valid():
-        serializer.save()
+        # Buffered and written in batches; see core/feedback.py.
+        participant = serializer.validated_data['participant']
+        feedback.writer.submit(Feedback(**serializer.validated_data), participant.session_id)
         return Response({'message': 'Thanks for your feedback!'}, status=201)
     return Response(serializer.errors, status=400)
 
@@ -325,87 +417,89 @@ def get_unanswered_players(session_code, question_id):
 
     return [p.name for p in unanswered]
 
-def start_question_timer(live_q):
-    def end_timer():
-        correct_option = live_q.question.correct_option
-        session = live_q.session
-        session_code = session.session_code
-
-        # Get all correct answers
-        correct_answers = ParticipantAnswer.objects.filter(
-            question=live_q.question,
-            participant__session=session,
-            is_correct=True
-        ).select_related('participant')
-
-        correct_participants = [a.participant.name for a in correct_answers]
-        total = ParticipantAnswer.objects.filter(
-            question=live_q.question,
-            participant__session=session
-        ).count()
-
-        # Broadcast correct answer + who got it right
-        channel_layer = get_channel_layer()
-        async_to_sync(channel_layer.group_send)(
-            f'session_{session_code}',
-            {
-                'type': 'reveal_answer',
-                'question_id': live_q.question.id,
-                'correct_option': correct_option,
-                'correct_participants': correct_participants,
-                'total_answers': total,
-                'correct_count': len(correct_participants)
-            }
-        )
-
-    threading.Timer(live_q.duration_seconds, end_timer).start()
-
-
-@api_view(['GET'])
-@permission_classes([permissions.AllowAny])
-def participant_summary(request, code):
-    participant_id = request.query_params.get('participant_id')
-    session = get_object_or_404(LiveSession, session_code=code)
-    participant = get_object_or_404(Participant, id=participant_id, session=session)
+@require_GET
+async def participant_summary(request, code):
+    participant_id = request.GET.get('participant_id')
+    return await results_cache.cached_json(
+        request, 'participant-summary', code, participant_id,
+        lambda: _participant_summary(code, participant_id),
+    )
 
-    total_questions = session.quiz.questions.count()
-    total_answers = ParticipantAnswer.objects.filter(participant=participant).count()
-    correct_answers = ParticipantAnswer.objects.filter(participant=participant, is_correct=True).count()
 
-    return Response({
-        'participant': participant.name,
-        'score': participant.score,
+async def _participant_summary(code, participant_id):
+    if not participant_id or not participant_id.isdigit():
+        return _not_found("No Participant matches the given query.")
+
+    # Answer counts and the quiz's question count in a single query.
+    total_questions = Question.objects.filter(
+        quiz_id=OuterRef('session__quiz_id')
+    ).values('quiz_id').annotate(n=Count('id')).values('n')
+    summary = await Participant.objects.filter(
+        id=participant_id, session__session_code=code
+    ).annotate(
+        total_answers=Count('participantanswer'),
+        correct_answers=Count('participantanswer', filter=Q(participantanswer__is_correct=True)),
+        total_questions=Coalesce(Subquery(total_questions), 0),
+    ).values('name', 'score', 'total_answers', 'correct_answers', 'total_questions').afirst()
+
+    if summary is None:
+        return _not_found("No Participant matches the given query.")
+
+    total_questions = summary['total_questions']
+    correct_answers = summary['correct_answers']
+    return JsonResponse({
+        'participant': summary['name'],
+        'score': summary['score'],
         'correct_answers': correct_answers,
         'total_questions': total_questions,
-        'total_answers': total_answers,
+        'total_answers': summary['total_answers'],
         'accuracy': round((correct_answers / total_questions) * 100 if total_questions > 0 else 0, 1)
     })
 
 
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def session_summary(request, code):
+@require_GET
+async def session_summary(request, code):
+    try:
+        user = await auth.authenticate(request)
+    except APIException as e:
+        detail = e.detail if isinstance(e.detail, dict) else {'detail': e.detail}
+        return JsonResponse(detail, status=e.status_code)
+
     try:
-        session = LiveSession.objects.get(session_code=code, host=request.user)
+        session = await LiveSession.objects.select_related('quiz').aget(session_code=code, host=user)
     except LiveSession.DoesNotExist:
-        return Response({'error': 'Session not found or unauthorized'}, status=404)
+        return JsonResponse({'error': 'Session not found or unauthorized'}, status=404)
 
     participants = Participant.objects.filter(session=session).annotate(
-        correct_count=Count(
-            'participantanswer',
-            filter=Q(participantanswer__selected_option=F('participantanswer__question__correct_option'))
-        )
+        correct_count=Count('participantanswer', filter=Q(participantanswer__is_correct=True))
     ).values('name', 'score', 'correct_count')  # include score if needed
 
-    feedback = Feedback.objects.filter(participant__session=session).values(
+    page, page_size = _page_params(request)
+    comments = Feedback.objects.filter(participant__session=session).exclude(comments='').values(
       'id', 'rating', 'participant__name', 'comments'
-    )
+    ).order_by('-id')[(page - 1) * page_size:page * page_size + 1]
+    comments = [c async for c in comments]
 
-    return Response({
+    ratings = await database_sync_to_async(feedback.writer.session_stats)(session.id)
+
+    return JsonResponse({
         'session_code': session.session_code,
         'quiz_title': session.quiz.title,
-        'participants': list(participants),
-        'feedback': list(feedback)
+        'participants': [p async for p in participants],
+        'feedback': {
+            **ratings,
+            'comments': comments[:page_size],
+            'page': page,
+            'page_size': page_size,
+            'has_next': len(comments) > page_size,
+        }
     })
 
 
+def _page_params(request, default_size=50, max_size=200):
+    try:
+        page = max(int(request.GET.get('page', 1)), 1)
+        page_size = min(max(int(request.GET.get('page_size', default_size)), 1), max_size)
+    except ValueError:
+        page, page_size = 1, default_size
+    return page, page_size
@@ -0,0 +1,64 @@
+import logging
+import time
+
+from django.db import connection
+from django.urls import get_resolver
+
+from . import eventlog, frames, journal
+
+logger = logging.getLogger(__name__)
+
+
+# ─── Worker Warm-up ──────────────────────────────────────────
+#
+# A fresh worker otherwise pays for the URL resolver's pattern compilation,
+# the ORM's first query and the optional codec imports on whichever request
+# happens to arrive first. warm_up() does that work once, before the worker
+# is handed any traffic, and replays the session journal (if enabled) so no
+# answer accepted before a crash is lost. Database connections are not
+# warmed: requests run on executor threads that open their own, so the
+# startup thread closes the one it used.
+
+def _resolve_urls():
+    get_resolver().resolve('/api/quizzes/')
+
+
+def _first_query():
+    from .models import LiveSession
+
+    try:
+        LiveSession.objects.filter(is_active=True).exists()
+    finally:
+        connection.close()
+
+
+def _optional_codecs():
+    frames.load_msgpack()
+
+
+def _journal_recovery():
+    answers, sessions = journal.recover()
+    if answers or sessions:
+        eventlog.event(logger, 'journal.recovered', logging.WARNING, answers=answers, sessions=sessions)
+
+
+STAGES = (
+    ('url_resolver', _resolve_urls),
+    ('first_query', _first_query),
+    ('optional_codecs', _optional_codecs),
+    ('journal_recovery', _journal_recovery),
+)
+
+
+def warm_up():
+    """Run each warm-up stage; returns {stage: milliseconds}."""
+    timings = {}
+    for name, stage in STAGES:
+        start = time.perf_counter()
+        try:
+            stage()
+        except Exception:
+            logger.exception("Warm-up stage %s failed", name)
+        timings[name] = round((time.perf_counter() - start) * 1000, 2)
+    eventlog.event(logger, 'worker.ready', **timings)
+    return timings
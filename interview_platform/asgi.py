@@ -2,22 +2,32 @@ import os
 import django
 
 from channels.routing import ProtocolTypeRouter, URLRouter
-from channels.auth import AuthMiddlewareStack
 from django.core.asgi import get_asgi_application
+from django.urls import re_path
 
 # ✅ Set environment and initialize Django
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'interview_platform.settings')
 django.setup()
 
 # ✅ Now safe to import routing and anything that hits models
-from core.routing import websocket_urlpatterns
+from core.auth import JWTAuthMiddleware
+from core.routing import http_urlpatterns, websocket_urlpatterns
 
 # ✅ Prepare ASGI app
 django_asgi_app = get_asgi_application()
 
+# ✅ Pay first-request costs now (QUIZ_SKIP_WARMUP=1 to measure cold start)
+if not os.environ.get('QUIZ_SKIP_WARMUP'):
+    from core.warmup import warm_up
+    warm_up()
+
 application = ProtocolTypeRouter({
-    "http": django_asgi_app,
-    "websocket": AuthMiddlewareStack(
+    # Event streams (core/sse.py) first; everything else goes to Django
+    "http": URLRouter(http_urlpatterns + [
+        re_path(r'', django_asgi_app),
+    ]),
+    # SimpleJWT access tokens, the same ones the API takes (core/auth.py)
+    "websocket": JWTAuthMiddleware(
         URLRouter(websocket_urlpatterns)
     ),
 })
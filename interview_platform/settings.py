@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 from datetime import timedelta
 
@@ -67,6 +68,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.sharding.ShardViewMiddleware',
 ]
 
 ROOT_URLCONF = 'interview_platform.urls'
@@ -90,12 +92,6 @@ WSGI_APPLICATION = 'interview_platform.wsgi.application'
 
 ASGI_APPLICATION = 'interview_platform.asgi.application' 
 
-CHANNEL_LAYERS = {
-    'default': {
-        'BACKEND': 'channels.layers.InMemoryChannelLayer',
-    },
-}
-
 
 
 # Database
@@ -152,12 +148,104 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'core.auth.CachedJWTAuthentication',
     ),
 }
 
 CHANNEL_LAYERS = {
     "default": {
-        "BACKEND": "channels.layers.InMemoryChannelLayer"
+        "BACKEND": "channels.layers.InMemoryChannelLayer",
+        "CONFIG": {
+            # Consumers drain their channel into their own bounded send queue
+            # straight away, so this only has to absorb short bursts. Beyond
+            # it the layer drops messages for that channel.
+            "capacity": 500,
+            "expiry": 30,
+        },
     }
-}
\ No newline at end of file
+}
+
+# Frames queued per WebSocket before state frames are dropped and, if
+# question/reveal frames still don't fit, the client is disconnected.
+WS_SEND_QUEUE_LIMIT = 64
+
+# Polled results endpoints: rendered responses are reused for this many
+# seconds while the session's version is unchanged.
+RESULTS_CACHE_TTL = 2
+RESULTS_CACHE_MAX_ENTRIES = 10000
+
+# Feedback is buffered in memory and bulk-inserted in batches.
+FEEDBACK_BATCH_SIZE = 500
+FEEDBACK_FLUSH_INTERVAL = 1.0
+# Failed flushes before a batch is written row by row and bad rows set aside
+FEEDBACK_MAX_ATTEMPTS = 3
+
+# Structured logging: core events go through core.eventlog, are sampled per
+# event name and written from a background thread.
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'structured': {'()': 'core.eventlog.JSONFormatter'},
+    },
+    'handlers': {
+        'background': {
+            'class': 'core.eventlog.BackgroundHandler',
+            'formatter': 'structured',
+        },
+    },
+    'loggers': {
+        'core': {
+            'handlers': ['background'],
+            'level': os.environ.get('QUIZ_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+
+# Fraction of each event that is actually logged (default 1.0).
+EVENT_LOG_SAMPLING = {
+    'answer.accepted': 0.01,
+    'answer.rejected': 0.1,
+    'answer.invalid': 0.1,
+    'ws.connect': 0.01,
+    'ws.receive': 0.01,
+}
+
+# Import + warm-up time budget (ms) checked by `manage.py startup_report`
+STARTUP_BUDGET_MS = int(os.environ.get('QUIZ_STARTUP_BUDGET_MS', 2000))
+
+# Sharded mode (`manage.py runshards`): this worker's shard, set per process
+SHARD_INDEX = int(os.environ['QUIZ_SHARD_INDEX']) if os.environ.get('QUIZ_SHARD_INDEX') else None
+
+# Session journal (core/journal.py): when set, accepted answers are fsynced
+# here with group commit and written to the database in the background
+LIVE_JOURNAL_DIR = os.environ.get('QUIZ_JOURNAL_DIR') or None
+ANSWER_BATCH_SIZE = 1000
+ANSWER_FLUSH_INTERVAL = 0.25
+# Failed flushes before a batch is written row by row and bad rows set aside
+ANSWER_MAX_ATTEMPTS = 3
+# Answers are accepted this long past a question's deadline, for network
+# latency between the player's tap and the server (core/deadlines.py)
+LIVE_ANSWER_GRACE_MS = int(os.environ.get('QUIZ_ANSWER_GRACE_MS', 500))
+
+# Quiz/session purges (core/purge.py): rows per DELETE, and the pause
+# between chunks that lets live writes in
+PURGE_CHUNK_SIZE = 2000
+PURGE_CHUNK_PAUSE = 0.05
+
+# Verified access tokens kept in memory (core/auth.py). The TTL bounds how
+# long another worker process keeps honouring a deactivated user's token.
+JWT_CACHE_SIZE = 10000
+JWT_CACHE_TTL = 30
+
+# Event-stream fallback (core/sse.py): keep-alive comment interval on idle streams
+SSE_HEARTBEAT_SECONDS = 15
+
+# Session playlists (core/playlist.py): default time a reveal stays up before
+# the next question, and the most questions one playlist may hold
+PLAYLIST_REVEAL_SECONDS = 5
+PLAYLIST_MAX_ITEMS = 500
+
+# Score reconciliation (core/reconcile.py, `manage.py reconcile_scores`): rows per UPDATE
+RECONCILE_CHUNK_SIZE = 2000